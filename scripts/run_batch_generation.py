@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Offline Batch Generation Runner for La Factoria
+===============================================
+
+Generates every topic x content type in a JSONL manifest through provider
+batch APIs (cheaper and outside interactive rate limits), then parses,
+quality-assesses, caches and stores the results.
+
+Progress is checkpointed next to the manifest; re-running the same command
+after an interruption resumes polling submitted batches and skips completed
+items.
+
+Usage:
+    python scripts/run_batch_generation.py MANIFEST [options]
+
+Options:
+    --provider NAME        openai, anthropic or local (default: first available)
+    --checkpoint PATH      Checkpoint file (default: MANIFEST.checkpoint.json)
+    --chunk-size N         Requests per provider batch
+    --poll-interval SEC    Seconds between batch status checks
+"""
+
+import sys
+import asyncio
+import argparse
+import json
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.config import settings
+from src.services.educational_content_service import EducationalContentService
+from src.services.batch_provider_service import create_batch_backend
+from src.services.batch_generation_service import BatchGenerationPipeline
+
+
+async def run(args) -> int:
+    service = EducationalContentService()
+    try:
+        backend = create_batch_backend(
+            service.ai_provider,
+            provider=args.provider or settings.BATCH_GENERATION_PROVIDER,
+            local_concurrency=settings.BATCH_LOCAL_CONCURRENCY
+        )
+        pipeline = BatchGenerationPipeline(
+            service,
+            backend,
+            checkpoint_path=args.checkpoint or f"{args.manifest}.checkpoint.json",
+            chunk_size=args.chunk_size,
+            poll_interval=args.poll_interval
+        )
+        report = await pipeline.run(args.manifest)
+    finally:
+        await service.close()
+
+    print(json.dumps(report, indent=2))
+    return 1 if report["errors"] else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run offline batch generation for a La Factoria manifest")
+    parser.add_argument("manifest", help="JSONL manifest of topics and content types")
+    parser.add_argument("--provider", choices=["openai", "anthropic", "local"], help="Batch backend")
+    parser.add_argument("--checkpoint", help="Checkpoint file path")
+    parser.add_argument("--chunk-size", type=int, help="Requests per provider batch")
+    parser.add_argument("--poll-interval", type=float, help="Seconds between batch status checks")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
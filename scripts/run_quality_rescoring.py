@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Stored Content Quality Re-scoring for La Factoria
+=================================================
+
+Re-assesses every stored educational_content row with the current scoring
+and QUALITY_THRESHOLD_* settings. Rows are streamed from the database in
+chunks and scored in vectorized batches; rows whose quality score or
+cognitive load metrics changed are updated, one transaction per chunk.
+
+Usage:
+    python scripts/run_quality_rescoring.py [options]
+
+Options:
+    --content-type TYPE    Only re-score one content type
+    --chunk-size N         Rows per chunk (default: QUALITY_RESCORE_CHUNK_SIZE)
+    --dry-run              Report changes without writing them
+"""
+
+import sys
+import argparse
+import json
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.models.educational import LaFactoriaContentType
+from src.services.quality_rescoring_service import QualityRescoringJob
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score stored La Factoria content with the current quality assessor")
+    parser.add_argument("--content-type", choices=[ct.value for ct in LaFactoriaContentType], help="Content type to re-score")
+    parser.add_argument("--chunk-size", type=int, help="Rows per chunk")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing them")
+    args = parser.parse_args()
+
+    job = QualityRescoringJob(chunk_size=args.chunk_size, dry_run=args.dry_run)
+    report = job.run(
+        args.content_type,
+        progress_callback=lambda stats: print(
+            f"chunk {stats['chunks']}: {stats['rows']} rows, {stats['changed']} changed", file=sys.stderr
+        )
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ Admin API Routes for La Factoria
 Administrative endpoints for system management
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from typing import Dict, Any, List
 import logging
 from datetime import datetime, timezone
@@ -68,13 +68,17 @@ async def get_system_info(api_key: str = Depends(verify_admin_api_key)):
         )
 
 @router.get("/content/stats")
-async def get_content_stats(api_key: str = Depends(verify_admin_api_key)):
+async def get_content_stats(request: Request, api_key: str = Depends(verify_admin_api_key)):
     """
     Get content generation statistics
 
     Returns metrics about content generation performance and usage
     """
     try:
+        from .content_generation import get_content_service
+
+        content_service = await get_content_service(request)
+
         # Placeholder implementation - would connect to actual database/analytics
         return {
             "content_generation": {
@@ -103,6 +107,8 @@ async def get_content_stats(api_key: str = Depends(verify_admin_api_key)):
                 "successful_generations": 0,
                 "failed_generations": 0
             },
+            "cache": content_service.cache_service.get_tier_stats(),
+            "request_coalescing": content_service.cache_service.single_flight.get_stats(),
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
 
@@ -114,15 +120,15 @@ async def get_content_stats(api_key: str = Depends(verify_admin_api_key)):
         )
 
 @router.get("/ai-providers/stats")
-async def get_ai_provider_stats(api_key: str = Depends(verify_admin_api_key)):
+async def get_ai_provider_stats(request: Request, api_key: str = Depends(verify_admin_api_key)):
     """
     Get AI provider usage statistics and performance metrics
     """
     try:
-        from ...services.ai_providers import AIProviderManager
+        from .content_generation import get_content_service
 
-        provider_manager = AIProviderManager()
-        stats = provider_manager.get_provider_stats()
+        content_service = await get_content_service(request)
+        stats = content_service.ai_provider.get_provider_stats()
 
         return {
             "provider_stats": stats,
@@ -137,7 +143,7 @@ async def get_ai_provider_stats(api_key: str = Depends(verify_admin_api_key)):
         )
 
 @router.post("/cache/clear")
-async def clear_cache(api_key: str = Depends(verify_admin_api_key)):
+async def clear_cache(request: Request, api_key: str = Depends(verify_admin_api_key)):
     """
     Clear application caches
 
@@ -147,17 +153,27 @@ async def clear_cache(api_key: str = Depends(verify_admin_api_key)):
     - Any other application caches
     """
     try:
-        from ...services.prompt_loader import PromptTemplateLoader
+        from .content_generation import get_content_service
+
+        from ...services.cache_service import CACHE_NAMESPACES
 
-        # Clear prompt template cache
-        prompt_loader = PromptTemplateLoader()
-        await prompt_loader.reload_all_templates()
+        # Clear the live service's prompt template cache
+        content_service = await get_content_service(request)
+        await content_service.prompt_loader.reload_all_templates()
 
-        logger.info("Application caches cleared by admin")
+        # Clear Redis-backed caches (batched SCAN/UNLINK, no blocking KEYS)
+        cleared_entries = {}
+        for namespace in CACHE_NAMESPACES:
+            cleared_entries[namespace] = await content_service.cache_service.clear_content_cache(
+                f"{namespace}:*"
+            )
+
+        logger.info(f"Application caches cleared by admin: {cleared_entries}")
 
         return {
             "status": "success",
             "message": "All caches cleared successfully",
+            "cleared_entries": cleared_entries,
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
 
@@ -169,26 +185,36 @@ async def clear_cache(api_key: str = Depends(verify_admin_api_key)):
         )
 
 @router.post("/prompts/reload")
-async def reload_prompts(api_key: str = Depends(verify_admin_api_key)):
+async def reload_prompts(
+    request: Request,
+    full: bool = False,
+    api_key: str = Depends(verify_admin_api_key)
+):
     """
     Reload prompt templates from disk
 
-    Forces reload of all prompt templates from the prompts directory
+    Reloads only the templates that changed on disk since the last check.
+    Pass full=true to drop all caches and reread every template.
     """
     try:
-        from ...services.prompt_loader import PromptTemplateLoader
+        from .content_generation import get_content_service
 
-        prompt_loader = PromptTemplateLoader()
-        await prompt_loader.initialize()
-        await prompt_loader.reload_all_templates()
+        content_service = await get_content_service(request)
+        prompt_loader = content_service.prompt_loader
+        if full:
+            await prompt_loader.reload_all_templates()
+            changes = None
+        else:
+            changes = await prompt_loader.reload_changed_templates()
 
         template_stats = prompt_loader.get_template_stats()
 
-        logger.info("Prompt templates reloaded by admin")
+        logger.info(f"Prompt templates reloaded by admin (full={full})")
 
         return {
             "status": "success",
             "message": "Prompt templates reloaded successfully",
+            "changes": changes,
             "template_stats": template_stats,
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
@@ -201,15 +227,15 @@ async def reload_prompts(api_key: str = Depends(verify_admin_api_key)):
         )
 
 @router.get("/prompts/info")
-async def get_prompt_info(api_key: str = Depends(verify_admin_api_key)):
+async def get_prompt_info(request: Request, api_key: str = Depends(verify_admin_api_key)):
     """
     Get information about loaded prompt templates
     """
     try:
-        from ...services.prompt_loader import PromptTemplateLoader
+        from .content_generation import get_content_service
 
-        prompt_loader = PromptTemplateLoader()
-        await prompt_loader.initialize()
+        content_service = await get_content_service(request)
+        prompt_loader = content_service.prompt_loader
 
         # Get info for each content type
         prompt_info = {}
@@ -5,7 +5,9 @@ Following patterns from FastAPI context and educational requirements
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Dict, Any
+import json
 import logging
 import time
 
@@ -23,6 +25,8 @@ from ...models.content import (
 )
 from ...models.educational import LaFactoriaContentType, LearningObjectiveModel
 from ...services.educational_content_service import EducationalContentService
+from ...services.provider_admission_service import AdmissionRejected
+from ...services.token_counting_service import PromptTooLarge
 
 logger = logging.getLogger(__name__)
 
@@ -31,13 +35,43 @@ limiter = Limiter(key_func=get_remote_address)
 
 router = APIRouter()
 
-# Initialize content service (will be done per request for now)
-async def get_content_service() -> EducationalContentService:
-    """Dependency to get initialized content service"""
-    service = EducationalContentService()
-    await service.initialize()
+async def get_content_service(request: Request) -> EducationalContentService:
+    """
+    Dependency returning the process-wide content service
+
+    The service is created, warmed and closed by main.lifespan and stored on
+    app.state. When the app runs without lifespan (e.g. a TestClient used
+    outside a context manager) it is created lazily on first use.
+    """
+    service = getattr(request.app.state, "content_service", None)
+    if service is None:
+        service = EducationalContentService()
+        await service.initialize()
+        # Another request may have won the race while we were initializing
+        existing = getattr(request.app.state, "content_service", None)
+        if existing is not None:
+            await service.close()
+            return existing
+        request.app.state.content_service = service
     return service
 
+def _overloaded(e: AdmissionRejected) -> HTTPException:
+    """503 for requests shed by provider admission control (or with every provider circuit open), telling the client when to retry"""
+    logger.warning(f"Content generation rejected by admission control: {e}")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=f"Content generation capacity exhausted: {str(e)}",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+def _too_large(e: PromptTooLarge) -> HTTPException:
+    """413 for requests whose prompt does not fit any available model's context window"""
+    logger.warning(f"Content generation rejected as oversize: {e}")
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Request too large for the AI model context: {str(e)}"
+    )
+
 @router.get("/content-types", response_model=ContentTypesResponse)
 async def get_content_types():
     """
@@ -90,6 +124,10 @@ async def generate_master_content_outline(
 
         return ContentResponse(**result)
 
+    except AdmissionRejected as e:
+        raise _overloaded(e)
+    except PromptTooLarge as e:
+        raise _too_large(e)
     except Exception as e:
         logger.error(f"Master content outline generation failed: {e}")
         raise HTTPException(
@@ -122,6 +160,10 @@ async def generate_podcast_script(
 
         return ContentResponse(**result)
 
+    except AdmissionRejected as e:
+        raise _overloaded(e)
+    except PromptTooLarge as e:
+        raise _too_large(e)
     except Exception as e:
         logger.error(f"Podcast script generation failed: {e}")
         raise HTTPException(
@@ -154,6 +196,10 @@ async def generate_study_guide(
 
         return ContentResponse(**result)
 
+    except AdmissionRejected as e:
+        raise _overloaded(e)
+    except PromptTooLarge as e:
+        raise _too_large(e)
     except Exception as e:
         logger.error(f"Study guide generation failed: {e}")
         raise HTTPException(
@@ -186,6 +232,10 @@ async def generate_one_pager_summary(
 
         return ContentResponse(**result)
 
+    except AdmissionRejected as e:
+        raise _overloaded(e)
+    except PromptTooLarge as e:
+        raise _too_large(e)
     except Exception as e:
         logger.error(f"One-pager summary generation failed: {e}")
         raise HTTPException(
@@ -218,6 +268,10 @@ async def generate_detailed_reading_material(
 
         return ContentResponse(**result)
 
+    except AdmissionRejected as e:
+        raise _overloaded(e)
+    except PromptTooLarge as e:
+        raise _too_large(e)
     except Exception as e:
         logger.error(f"Detailed reading material generation failed: {e}")
         raise HTTPException(
@@ -250,6 +304,10 @@ async def generate_faq_collection(
 
         return ContentResponse(**result)
 
+    except AdmissionRejected as e:
+        raise _overloaded(e)
+    except PromptTooLarge as e:
+        raise _too_large(e)
     except Exception as e:
         logger.error(f"FAQ collection generation failed: {e}")
         raise HTTPException(
@@ -282,6 +340,10 @@ async def generate_flashcards(
 
         return ContentResponse(**result)
 
+    except AdmissionRejected as e:
+        raise _overloaded(e)
+    except PromptTooLarge as e:
+        raise _too_large(e)
     except Exception as e:
         logger.error(f"Flashcards generation failed: {e}")
         raise HTTPException(
@@ -314,6 +376,10 @@ async def generate_reading_guide_questions(
 
         return ContentResponse(**result)
 
+    except AdmissionRejected as e:
+        raise _overloaded(e)
+    except PromptTooLarge as e:
+        raise _too_large(e)
     except Exception as e:
         logger.error(f"Reading guide questions generation failed: {e}")
         raise HTTPException(
@@ -321,6 +387,72 @@ async def generate_reading_guide_questions(
             detail=f"Content generation failed: {str(e)}"
         )
 
+def _sse_event(event: str, data: str) -> str:
+    """Format one Server-Sent Events frame"""
+    return f"event: {event}\ndata: {data}\n\n"
+
+@router.post("/generate/{content_type}/stream")
+@limiter.limit("10/minute")  # Same budget as the blocking generation endpoints
+async def stream_content(
+    request: Request,
+    content_type: str,
+    content_request: ContentRequest,
+    api_key: str = Depends(verify_api_key),
+    content_service: EducationalContentService = Depends(get_content_service)
+):
+    """
+    Stream content generation as Server-Sent Events
+
+    Emits a "start" event, then "token" events with raw text deltas as the AI
+    provider produces them, then a single "complete" event whose data is the
+    ContentResponse (parsed and quality-assessed). Failures after the stream
+    has started are reported as an "error" event.
+    """
+    supported_types = [ct.value for ct in LaFactoriaContentType]
+    if content_type not in supported_types:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported content type: {content_type}"
+        )
+
+    async def event_stream():
+        yield _sse_event("start", json.dumps({"content_type": content_type, "topic": content_request.topic}))
+        try:
+            async for event in content_service.generate_content_stream(
+                content_type=content_type,
+                topic=content_request.topic,
+                age_group=content_request.age_group.value,
+                learning_objectives=[obj.to_learning_objective() for obj in content_request.learning_objectives] if content_request.learning_objectives else None,
+                additional_requirements=content_request.additional_requirements
+            ):
+                if event["event"] == "token":
+                    yield _sse_event("token", json.dumps({"text": event["text"]}))
+                else:
+                    yield _sse_event("complete", ContentResponse(**event["result"]).model_dump_json())
+
+        except AdmissionRejected as e:
+            logger.warning(f"Streaming generation rejected by admission control: {e}")
+            yield _sse_event("error", json.dumps({
+                "status_code": status.HTTP_503_SERVICE_UNAVAILABLE,
+                "detail": f"Content generation capacity exhausted: {str(e)}",
+                "retry_after": e.retry_after
+            }))
+        except PromptTooLarge as e:
+            logger.warning(f"Streaming generation rejected as oversize: {e}")
+            yield _sse_event("error", json.dumps({
+                "status_code": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                "detail": f"Request too large for the AI model context: {str(e)}"
+            }))
+        except Exception as e:
+            logger.error(f"Streaming generation failed for {content_type}: {e}")
+            yield _sse_event("error", json.dumps({"detail": f"Content generation failed: {str(e)}"}))
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/generate/batch", response_model=Dict[str, Any])
 async def generate_batch_content(
     request: ContentRequest,
@@ -391,14 +523,14 @@ async def get_service_info(
         )
 
 @router.get("/service/health")
-async def get_service_health():
+async def get_service_health(request: Request):
     """
     Health check for the educational content generation service
 
     Returns detailed health status for all service components.
     """
     try:
-        content_service = EducationalContentService()
+        content_service = await get_content_service(request)
         return await content_service.health_check()
 
     except Exception as e:
@@ -3,7 +3,7 @@ Health Check API Routes for La Factoria
 System health monitoring and status endpoints
 """
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Request, status
 from typing import Dict, Any
 import time
 import psutil
@@ -110,6 +110,10 @@ async def detailed_health_check():
         from ...middleware.rate_limiting import enhanced_limiter
         service_health["rate_limiting"] = await enhanced_limiter.health_check()
 
+        # Shared Redis connection pool utilisation
+        from ...core.redis_manager import redis_pool
+        service_health["redis_pool"] = redis_pool.get_pool_stats()
+
         # Configuration health
         service_health["configuration"] = {
             "environment": settings.ENVIRONMENT,
@@ -163,24 +167,29 @@ async def detailed_health_check():
         }
 
 @router.get("/health/ai-providers")
-async def ai_providers_health():
+async def ai_providers_health(request: Request):
     """
     Specific health check for AI providers
 
     Tests connectivity and availability of all configured AI services
     """
     try:
-        from ...services.ai_providers import AIProviderManager
+        from .content_generation import get_content_service
 
-        provider_manager = AIProviderManager()
+        content_service = await get_content_service(request)
+        provider_manager = content_service.ai_provider
         health_status = await provider_manager.health_check()
+        circuit_breakers = provider_manager.get_circuit_states()
 
         return {
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "providers": health_status,
+            "circuit_breakers": circuit_breakers,
             "provider_stats": provider_manager.get_provider_stats(),
             "overall_status": "healthy" if all(
                 "healthy" in status for status in health_status.values()
+            ) and all(
+                breaker["state"] == "closed" for breaker in circuit_breakers.values()
             ) else "degraded"
         }
 
@@ -193,14 +202,14 @@ async def ai_providers_health():
         }
 
 @router.get("/health/content-service")
-async def content_service_health():
+async def content_service_health(request: Request):
     """
     Health check for the educational content generation service
     """
     try:
-        from ...services.educational_content_service import EducationalContentService
+        from .content_generation import get_content_service
 
-        content_service = EducationalContentService()
+        content_service = await get_content_service(request)
         health_status = await content_service.health_check()
 
         return health_status
@@ -438,8 +438,11 @@ async def _get_performance_metrics(db: AsyncSession) -> Dict[str, Any]:
             } for row in perf_metrics
         }
 
+        from ...services.content_parsing_service import get_parse_stats
+
         return {
             "generation_performance_by_type": performance_by_type,
+            "content_parsing": get_parse_stats(),
             "targets": {
                 "max_generation_time_ms": 30000,  # 30 seconds
                 "max_quality_assessment_ms": 5000  # 5 seconds
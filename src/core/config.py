@@ -39,6 +39,23 @@ class Settings(BaseSettings):
     # Redis settings (for caching and sessions)
     REDIS_URL: Optional[str] = Field(default=None)
     CACHE_TTL: int = Field(default=3600)  # 1 hour default
+    CACHE_L1_ENABLED: bool = Field(default=True)  # In-process cache in front of Redis
+    CACHE_L1_MAX_ENTRIES: int = Field(default=256)
+    CACHE_L1_MAX_BYTES: int = Field(default=64 * 1024 * 1024)  # 64MB of serialized content
+    CACHE_SIMILARITY_ENABLED: bool = Field(default=False)  # Serve near-duplicate topics from cache
+    CACHE_SIMILARITY_THRESHOLD: float = Field(default=0.8)  # Minimum topic Jaccard similarity
+    CACHE_SIMILARITY_MAX_ENTRIES: int = Field(default=100_000)  # Topics kept in the similarity index
+    SINGLE_FLIGHT_ENABLED: bool = Field(default=True)  # Coalesce identical concurrent generations
+    SINGLE_FLIGHT_DISTRIBUTED: bool = Field(default=False)  # Also coalesce across workers via Redis lock
+    SINGLE_FLIGHT_LOCK_TIMEOUT: int = Field(default=120)  # seconds a worker may hold the generation lock
+    REDIS_MAX_CONNECTIONS: int = Field(default=50)  # Shared pool size across all Redis users
+    REDIS_SOCKET_TIMEOUT: int = Field(default=5)  # seconds
+    REDIS_HEALTH_CHECK_INTERVAL: int = Field(default=30)  # Ping idle connections before reuse (seconds)
+    REDIS_RETRY_ATTEMPTS: int = Field(default=1)  # Per-command retries on connection errors/timeouts
+    REDIS_RETRY_BACKOFF_BASE: float = Field(default=0.05)  # seconds
+    REDIS_RETRY_BACKOFF_CAP: float = Field(default=1.0)  # seconds; callers degrade to fallbacks after this
+    REDIS_RECONNECT_BACKOFF_BASE: float = Field(default=0.5)  # seconds
+    REDIS_RECONNECT_BACKOFF_CAP: float = Field(default=30.0)  # seconds
 
     # AI Provider settings
     OPENAI_API_KEY: Optional[str] = Field(default=None)
@@ -46,6 +63,20 @@ class Settings(BaseSettings):
     ELEVENLABS_API_KEY: Optional[str] = Field(default=None)
     GOOGLE_CLOUD_PROJECT: Optional[str] = Field(default=None)
     GOOGLE_CLOUD_REGION: str = Field(default="us-central1")
+    AI_ROUTING_STRATEGY: str = Field(default="static")  # "static" (configured order) or "adaptive" (live metrics)
+    AI_ROUTING_EWMA_ALPHA: float = Field(default=0.2)  # Weight of the newest sample in provider metrics
+    AI_ROUTING_ERROR_PENALTY: float = Field(default=30.0)  # Seconds added to a provider's score at 100% errors
+    AI_ROUTING_COST_WEIGHT: float = Field(default=10.0)  # Seconds of latency traded per USD of expected cost
+    AI_ROUTING_ERROR_HALF_LIFE: float = Field(default=60.0)  # Seconds for an idle provider's error rate to halve
+    AI_HEDGING_ENABLED: bool = Field(default=False)  # Send slow requests to a second provider as well
+    AI_HEDGE_PERCENTILE: float = Field(default=0.95)  # Hedge once the primary exceeds this latency percentile
+    AI_HEDGE_MIN_SAMPLES: int = Field(default=20)  # Latency samples needed before a content type is hedged
+    AI_HEDGE_MAX_FRACTION: float = Field(default=0.1)  # Max share of requests that may be hedged
+    AI_HEDGE_MAX_EXTRA_COST: float = Field(default=0.10)  # Max expected USD cost of one hedge request
+    AI_CIRCUIT_FAILURE_THRESHOLD: int = Field(default=5)  # Consecutive failures that open a provider's circuit
+    AI_CIRCUIT_COOLDOWN: float = Field(default=30.0)  # Seconds an open circuit waits before probing
+    AI_CIRCUIT_PROBE_TIMEOUT: float = Field(default=10.0)  # Seconds allowed for a circuit probe request
+    AI_SYNC_EXECUTOR_WORKERS: int = Field(default=8)  # Threads for blocking provider SDK calls (Vertex AI)
 
     # Langfuse settings (for prompt management and observability)
     LANGFUSE_SECRET_KEY: Optional[str] = Field(default=None)
@@ -54,13 +85,49 @@ class Settings(BaseSettings):
 
     # Content generation settings
     DEFAULT_MAX_TOKENS: int = Field(default=3000)
-    CONTENT_GENERATION_TIMEOUT: int = Field(default=120)  # seconds
-    MAX_CONCURRENT_GENERATIONS: int = Field(default=10)
+    AI_MIN_COMPLETION_TOKENS: int = Field(default=256)  # Reject prompts leaving less completion room in the model context
+    TIKTOKEN_CACHE_DIR: Optional[str] = Field(default=None)  # Where tokenizer files are cached (seeded at build time)
+    AI_STRUCTURED_OUTPUT: bool = Field(default=True)  # Request native JSON output constrained to each content type's schema
+    CONTENT_GENERATION_TIMEOUT: int = Field(default=120)  # seconds; overall deadline across retries and fallbacks
+    AI_ATTEMPT_TIMEOUT: float = Field(default=60.0)  # Seconds for a single provider call (idle timeout for streams)
+    AI_MAX_RETRIES: int = Field(default=2)  # Retries of retryable errors on one provider before falling back
+    AI_RETRY_BACKOFF_BASE: float = Field(default=0.5)  # seconds, doubled per retry (full jitter)
+    AI_RETRY_BACKOFF_CAP: float = Field(default=8.0)  # seconds
+    # Overrides keyed by "provider", "content_type" or "provider:content_type",
+    # e.g. {"detailed_reading_material": {"deadline": 180, "attempt_timeout": 90}}
+    AI_TIMEOUT_OVERRIDES: Dict[str, Dict[str, float]] = Field(default={})
+    MAX_CONCURRENT_GENERATIONS: int = Field(default=10)  # Provider calls in flight across all providers
+    AI_ADMISSION_QUEUE_SIZE: int = Field(default=100)  # Calls allowed to wait per provider before shedding load
+    AI_ADMISSION_MAX_WAIT: float = Field(default=10.0)  # Seconds a call may queue before a 503
+    # Per-provider limits: set to your account quotas
+    AI_PROVIDER_LIMITS: Dict[str, Dict[str, int]] = Field(default={
+        "openai": {"max_concurrency": 8, "requests_per_minute": 500, "tokens_per_minute": 300_000},
+        "anthropic": {"max_concurrency": 8, "requests_per_minute": 1000, "tokens_per_minute": 400_000},
+        "vertex_ai": {"max_concurrency": 8, "requests_per_minute": 300, "tokens_per_minute": 1_000_000}
+    })
+
+    # Offline batch generation (scripts/run_batch_generation.py)
+    BATCH_GENERATION_PROVIDER: Optional[str] = Field(default=None)  # "openai", "anthropic", "local" (None = first available)
+    BATCH_GENERATION_CHUNK_SIZE: int = Field(default=1000)  # Requests per submitted provider batch
+    BATCH_GENERATION_POLL_INTERVAL: float = Field(default=60.0)  # Seconds between batch status checks
+    BATCH_LOCAL_CONCURRENCY: int = Field(default=4)  # Concurrent calls for the local stand-in backend
+
+    # Prompt template settings
+    PROMPT_COMPILED_CACHE_SIZE: int = Field(default=64)  # Max ad-hoc compiled templates kept
+    PROMPT_PRECOMPILE_ON_STARTUP: bool = Field(default=False)  # Precompile all templates and variants at startup
+    PROMPT_PRECOMPILE_WORKERS: int = Field(default=0)  # Threads for precompilation (0 = inline)
+    PROMPT_HOT_RELOAD_INTERVAL: float = Field(default=0)  # Seconds between prompt change checks (0 = disabled)
 
     # Quality assessment thresholds (from la-factoria-railway-deployment.md)
     QUALITY_THRESHOLD_OVERALL: float = Field(default=0.70)
     QUALITY_THRESHOLD_EDUCATIONAL: float = Field(default=0.75)
     QUALITY_THRESHOLD_FACTUAL: float = Field(default=0.85)
+    QUALITY_ASSESSMENT_MODE: str = Field(default="inline")  # "inline" on the event loop, or "process" for a worker pool
+    QUALITY_ASSESSMENT_WORKERS: int = Field(default=2)  # Worker processes in "process" mode (warmed up at startup)
+    QUALITY_ASSESSMENT_CACHE_ENABLED: bool = Field(default=True)  # Reuse scores of identical content (L1 + Redis)
+    QUALITY_ASSESSMENT_CACHE_TTL_HOURS: int = Field(default=48)
+    QUALITY_RESCORE_CHUNK_SIZE: int = Field(default=500)  # Rows per chunk when re-scoring stored content
+    EVENT_LOOP_LAG_INTERVAL: float = Field(default=0.1)  # Seconds between event-loop lag samples (0 disables)
 
     # Enhanced rate limiting settings
     RATE_LIMIT_REQUESTS_PER_MINUTE: int = Field(default=60)
@@ -0,0 +1,132 @@
+"""
+Shared Redis connection pool for La Factoria
+One pooled redis.asyncio client for caching, rate limiting and other Redis users
+"""
+
+import logging
+import time
+from typing import Dict, Any, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis.asyncio as redis
+    from redis.asyncio.retry import Retry
+    from redis.backoff import ExponentialBackoff
+    from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+
+class RedisPoolManager:
+    """Process-wide redis.asyncio connection pool with health checks and reconnect backoff"""
+
+    def __init__(self):
+        self.pool = None
+        self.pool_url: Optional[str] = None
+        self.client = None
+        self.reconnect_failures = 0
+        self._next_reconnect_at = 0.0
+
+    def get_client(self, redis_url: Optional[str] = None):
+        """
+        Get a Redis client backed by the shared connection pool
+
+        Args:
+            redis_url: Redis URL (defaults to settings.REDIS_URL)
+
+        Returns:
+            redis.asyncio.Redis client, or None when Redis is unavailable or not configured
+        """
+        redis_url = redis_url or settings.REDIS_URL
+        if not REDIS_AVAILABLE or not redis_url:
+            return None
+
+        if self.pool is None or self.pool_url != redis_url:
+            self.pool = redis.ConnectionPool.from_url(
+                redis_url,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                encoding="utf-8",
+                decode_responses=True,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+                retry=Retry(
+                    ExponentialBackoff(
+                        cap=settings.REDIS_RETRY_BACKOFF_CAP,
+                        base=settings.REDIS_RETRY_BACKOFF_BASE
+                    ),
+                    settings.REDIS_RETRY_ATTEMPTS
+                ),
+                retry_on_error=[RedisConnectionError, RedisTimeoutError]
+            )
+            self.pool_url = redis_url
+            self.client = redis.Redis(connection_pool=self.pool)
+            logger.info(f"Redis connection pool created (max {settings.REDIS_MAX_CONNECTIONS} connections)")
+
+        return self.client
+
+    async def reconnect(self) -> bool:
+        """
+        Try to reach Redis again, backing off exponentially between failed attempts
+
+        Returns:
+            True when Redis answered a ping, False when unreachable or still backing off
+        """
+        client = self.client or self.get_client()
+        if client is None:
+            return False
+
+        now = time.monotonic()
+        if now < self._next_reconnect_at:
+            return False
+
+        try:
+            await client.ping()
+            if self.reconnect_failures:
+                logger.info("Redis connection re-established")
+            self.reconnect_failures = 0
+            self._next_reconnect_at = 0.0
+            return True
+        except Exception as e:
+            self.reconnect_failures += 1
+            delay = min(
+                settings.REDIS_RECONNECT_BACKOFF_CAP,
+                settings.REDIS_RECONNECT_BACKOFF_BASE * (2 ** (self.reconnect_failures - 1))
+            )
+            self._next_reconnect_at = now + delay
+            logger.warning(f"Redis reconnect failed ({self.reconnect_failures}), retrying in {delay:.1f}s: {e}")
+            return False
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool utilisation for health endpoints"""
+        if self.pool is None:
+            return {"status": "disabled", "reason": "Redis not configured or unavailable"}
+
+        in_use = len(getattr(self.pool, "_in_use_connections", ()))
+        idle = len(getattr(self.pool, "_available_connections", ()))
+        max_connections = self.pool.max_connections
+
+        return {
+            "status": "reconnecting" if self.reconnect_failures else "healthy",
+            "max_connections": max_connections,
+            "in_use_connections": in_use,
+            "idle_connections": idle,
+            "created_connections": in_use + idle,
+            "utilization": round(in_use / max_connections, 3) if max_connections else 0.0,
+            "reconnect_failures": self.reconnect_failures
+        }
+
+    async def close(self):
+        """Disconnect all pooled connections (the pool reconnects lazily if used again)"""
+        if self.pool is not None:
+            await self.pool.disconnect()
+            logger.info("Redis connection pool closed")
+
+
+# Global shared pool
+redis_pool = RedisPoolManager()
@@ -22,6 +22,10 @@ from .middleware.rate_limiting import enhanced_limiter, RateLimitingMiddleware
 
 # Core configuration
 from .core.config import settings
+from .core.redis_manager import redis_pool
+
+# Shared educational content service (created once per process in lifespan)
+from .services.educational_content_service import EducationalContentService
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -38,9 +42,26 @@ async def lifespan(app: FastAPI):
     # Initialize enhanced rate limiter
     health = await enhanced_limiter.health_check()
     logger.info(f"Rate limiter status: {health}")
+
+    # Create and warm the shared content service (AI clients, cache, prompts)
+    content_service = EducationalContentService()
+    try:
+        await content_service.initialize()
+        await content_service.warm_up()
+        if settings.PROMPT_HOT_RELOAD_INTERVAL > 0:
+            content_service.prompt_loader.start_watching()
+    except Exception as e:
+        # Routes retry initialization lazily, so a failed warm-up is not fatal
+        logger.error(f"Content service warm-up failed: {e}")
+    app.state.content_service = content_service
+
     yield
+
     # Shutdown
     logger.info("Shutting down La Factoria platform")
+    await content_service.close()
+    app.state.content_service = None
+    await redis_pool.close()
 
 # Rate limiter for AI cost protection (backward compatibility)
 limiter = Limiter(key_func=get_remote_address)
@@ -23,6 +23,7 @@ from slowapi.errors import RateLimitExceeded
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from ..core.config import settings
+from ..core.redis_manager import redis_pool
 
 logger = logging.getLogger(__name__)
 
@@ -54,14 +55,9 @@ class EnhancedRateLimiter:
             return
             
         try:
-            self.redis_client = redis.from_url(
-                settings.REDIS_URL,
-                encoding="utf-8", 
-                decode_responses=True,
-                socket_timeout=2,  # Short timeout for rate limiting
-                socket_connect_timeout=2
-            )
-            self.redis_available = True
+            # Shared connection pool (also used by the cache service)
+            self.redis_client = redis_pool.get_client(settings.REDIS_URL)
+            self.redis_available = self.redis_client is not None
             logger.info("Enhanced Redis rate limiter initialized")
         except Exception as e:
             logger.warning(f"Failed to initialize Redis for rate limiting: {e}")
@@ -79,6 +75,10 @@ class EnhancedRateLimiter:
         Returns:
             (allowed: bool, headers: dict)
         """
+        if not self.redis_available and self.redis_client is not None:
+            # Back on Redis once it is reachable again (attempts are backed off)
+            self.redis_available = await redis_pool.reconnect()
+
         if self.redis_available:
             return await self._check_redis_rate_limit(key, limit, window_seconds)
         else:
@@ -110,7 +110,8 @@ class EnhancedRateLimiter:
             # Set expiration
             pipe.expire(key, window_seconds + 1)
             
-            results = await pipe.execute()
+            # Short timeout for rate limiting so a slow Redis cannot stall requests
+            results = await asyncio.wait_for(pipe.execute(), timeout=settings.RATE_LIMIT_REDIS_TIMEOUT)
             current_count = results[1]  # Count before adding current request
             
             # Calculate headers
@@ -194,7 +195,8 @@ class EnhancedRateLimiter:
             return {
                 "status": "healthy",
                 "backend": "redis", 
-                "latency_ms": round(latency, 2)
+                "latency_ms": round(latency, 2),
+                "connection_pool": redis_pool.get_pool_stats()
             }
         except Exception as e:
             return {
@@ -133,6 +133,9 @@ class EducationalContentMetadata(BaseModel):
     educational_effectiveness_score: Optional[float] = None
     cognitive_load_metrics: Optional[CognitiveLoadMetricsModel] = None
     readability_score: Optional[float] = None
+    time_to_first_token_ms: Optional[int] = None  # Set for streamed generations
+    cached_tokens: Optional[int] = None  # Prompt tokens served from the provider's prompt cache
+    cost_estimate: Optional[float] = None  # USD, with cached tokens at the discounted rate
 
 class QualityMetrics(BaseModel):
     """Quality assessment metrics for educational content"""
@@ -7,15 +7,27 @@ Following patterns from la-factoria-prompt-integration.md
 import asyncio
 import logging
 import time
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator, Iterator, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 import json
 
 from ..core.config import settings
+from .provider_routing_service import ProviderRouter
+from .provider_hedging_service import HedgingPolicy
+from .provider_circuit_breaker_service import CircuitBreaker, CircuitState, AllCircuitsOpen
+from .provider_admission_service import ProviderAdmissionController
+from .provider_retry_service import RetryPolicy, RetryPolicyResolver, Deadline, AttemptTimeout, is_retryable
+from .provider_executor_service import SyncProviderExecutor
+from .token_counting_service import token_counter, vertex_token_usage
+from .structured_output_service import (
+    openai_structured_params, anthropic_structured_params, anthropic_response_text, vertex_structured_config
+)
 
 logger = logging.getLogger(__name__)
 
+EDUCATIONAL_SYSTEM_PROMPT = "You are an expert educational content creator specializing in pedagogically sound, engaging educational materials. Always respond with well-structured, age-appropriate content that follows learning science principles."
+
 class AIProviderType(str, Enum):
     """Supported AI providers for content generation"""
     OPENAI = "openai"
@@ -23,6 +35,13 @@ class AIProviderType(str, Enum):
     VERTEX_AI = "vertex_ai"
     ELEVENLABS = "elevenlabs"  # For audio generation
 
+# Fallback hierarchy for text generation (also the tie-break order for adaptive routing)
+FALLBACK_ORDER = [
+    AIProviderType.OPENAI,
+    AIProviderType.ANTHROPIC,
+    AIProviderType.VERTEX_AI
+]
+
 @dataclass
 class AIResponse:
     """Standardized AI response structure"""
@@ -33,6 +52,43 @@ class AIResponse:
     generation_time: float
     metadata: Dict[str, Any]
 
+@dataclass
+class AIStreamChunk:
+    """Incremental piece of a streamed generation; the final chunk carries the full AIResponse"""
+    text: str
+    done: bool = False
+    response: Optional[AIResponse] = None
+
+def cacheable_prompt_content(prompt: str) -> Union[str, List[Dict[str, Any]]]:
+    """Anthropic user content: a segmented prompt's static prefix as a cache breakpoint, then its dynamic tail"""
+    static = getattr(prompt, "static", "")
+    if not static:
+        return prompt
+    blocks = [{"type": "text", "text": static, "cache_control": {"type": "ephemeral"}}]
+    if prompt.dynamic:
+        blocks.append({"type": "text", "text": prompt.dynamic})
+    return blocks
+
+def cached_token_usage(usage) -> Dict[str, int]:
+    """Prompt-cache token counts from OpenAI (prompt_tokens_details) or Anthropic (cache read/creation) usage"""
+    def count(value):
+        return value if isinstance(value, int) else 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "cached_tokens": count(getattr(details, "cached_tokens", None)) or count(getattr(usage, "cache_read_input_tokens", None)),
+        "cache_creation_tokens": count(getattr(usage, "cache_creation_input_tokens", None))
+    }
+
+def vertex_model(executor: SyncProviderExecutor, model_name: str):
+    """Vertex AI GenerativeModel for model_name, constructed once per executor"""
+    from vertexai.generative_models import GenerativeModel
+    return executor.model(model_name, GenerativeModel)
+
+def vertex_generation_config(**config):
+    """Vertex AI GenerationConfig; only this class converts a response_schema dict, a raw dict is rejected"""
+    from vertexai.generative_models import GenerationConfig
+    return GenerationConfig(**config)
+
 class AIProviderManager:
     """Manage multiple AI providers with fallback support"""
 
@@ -40,6 +96,38 @@ class AIProviderManager:
         self.providers = {}
         self.current_provider = None
         self.provider_stats = {}
+        self.circuit_breakers: Dict[AIProviderType, CircuitBreaker] = {}
+        self._probe_tasks = set()
+        self.router = ProviderRouter(
+            alpha=settings.AI_ROUTING_EWMA_ALPHA,
+            error_penalty=settings.AI_ROUTING_ERROR_PENALTY,
+            cost_weight=settings.AI_ROUTING_COST_WEIGHT,
+            error_half_life=settings.AI_ROUTING_ERROR_HALF_LIFE
+        )
+        self.hedging = HedgingPolicy(
+            percentile=settings.AI_HEDGE_PERCENTILE,
+            min_samples=settings.AI_HEDGE_MIN_SAMPLES,
+            max_hedge_fraction=settings.AI_HEDGE_MAX_FRACTION,
+            max_extra_cost=settings.AI_HEDGE_MAX_EXTRA_COST
+        )
+        self.admission = ProviderAdmissionController(
+            max_concurrent=settings.MAX_CONCURRENT_GENERATIONS,
+            provider_limits=settings.AI_PROVIDER_LIMITS,
+            queue_size=settings.AI_ADMISSION_QUEUE_SIZE,
+            max_wait=settings.AI_ADMISSION_MAX_WAIT
+        )
+        self.retry_policies = RetryPolicyResolver(
+            RetryPolicy(
+                deadline=settings.CONTENT_GENERATION_TIMEOUT,
+                attempt_timeout=settings.AI_ATTEMPT_TIMEOUT,
+                max_retries=settings.AI_MAX_RETRIES,
+                backoff_base=settings.AI_RETRY_BACKOFF_BASE,
+                backoff_cap=settings.AI_RETRY_BACKOFF_CAP
+            ),
+            overrides=settings.AI_TIMEOUT_OVERRIDES
+        )
+        self.retry_stats = {"retries": 0, "attempt_timeouts": 0, "deadline_exceeded": 0}
+        self.sync_executor = SyncProviderExecutor(max_workers=settings.AI_SYNC_EXECUTOR_WORKERS)
         self._initialize_providers()
 
     def _initialize_providers(self):
@@ -81,6 +169,11 @@ class AIProviderManager:
                     "total_tokens": 0,
                     "avg_response_time": 0.0
                 }
+                self.circuit_breakers[provider] = CircuitBreaker(
+                    provider.value,
+                    failure_threshold=settings.AI_CIRCUIT_FAILURE_THRESHOLD,
+                    cooldown=settings.AI_CIRCUIT_COOLDOWN
+                )
 
         except Exception as e:
             logger.error(f"Failed to initialize AI providers: {e}")
@@ -90,7 +183,8 @@ class AIProviderManager:
         """Initialize OpenAI client"""
         try:
             import openai
-            return openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+            # Retries are owned by RetryPolicy so they stay within the request deadline
+            return openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
         except ImportError:
             logger.error("OpenAI package not installed. Run: pip install openai")
             return None
@@ -102,7 +196,8 @@ class AIProviderManager:
         """Initialize Anthropic client"""
         try:
             import anthropic
-            return anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+            # Retries are owned by RetryPolicy so they stay within the request deadline
+            return anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY, max_retries=0)
         except ImportError:
             logger.error("Anthropic package not installed. Run: pip install anthropic")
             return None
@@ -155,52 +250,186 @@ class AIProviderManager:
         Returns:
             AIResponse with generated content and metadata
         """
-        provider = provider or self.current_provider
+        hedge = provider is None and settings.AI_HEDGING_ENABLED
+        provider = provider or self._route_provider(content_type)
         max_tokens = max_tokens or settings.DEFAULT_MAX_TOKENS
 
         if not provider or provider not in self.providers:
             raise ValueError(f"Provider {provider} not available")
 
-        # Record request
-        self.provider_stats[provider]["requests"] += 1
-        start_time = time.time()
-
-        try:
-            # Generate content with selected provider
-            if provider == AIProviderType.OPENAI:
-                response = await self._generate_with_openai(prompt, max_tokens)
-            elif provider == AIProviderType.ANTHROPIC:
-                response = await self._generate_with_anthropic(prompt, max_tokens)
-            elif provider == AIProviderType.VERTEX_AI:
-                response = await self._generate_with_vertex_ai(prompt, max_tokens)
-            else:
-                raise ValueError(f"Content generation not supported for provider: {provider}")
+        # One deadline bounds retries and fallbacks together
+        deadline = Deadline(self.retry_policies.resolve(provider, content_type).deadline)
 
-            # Record success
-            generation_time = time.time() - start_time
-            self.provider_stats[provider]["successes"] += 1
-            self.provider_stats[provider]["total_tokens"] += response.tokens_used
-            self._update_avg_response_time(provider, generation_time)
-
-            logger.info(f"Content generated successfully with {provider} in {generation_time:.2f}s")
-            return response
+        # Each provider is tried at most once; open circuits are skipped without waiting
+        last_error = None
+        for attempt_provider in self._attempt_order(provider, content_type):
+            if deadline.expired():
+                break
+            if last_error is not None:
+                logger.info(f"Attempting fallback to {attempt_provider} ({deadline.remaining():.1f}s left)")
+            try:
+                if hedge and attempt_provider == provider:
+                    return await self._generate_hedged(prompt, content_type, max_tokens, attempt_provider, deadline)
+                return await self._generate_with_retries(prompt, content_type, max_tokens, attempt_provider, deadline)
+            except Exception as e:
+                logger.error(f"Content generation failed with {attempt_provider}: {e}")
+                last_error = e
 
-        except Exception as e:
-            # Record failure
-            self.provider_stats[provider]["failures"] += 1
+        if deadline.expired():
+            self.retry_stats["deadline_exceeded"] += 1
+            raise asyncio.TimeoutError(f"Content generation deadline exceeded for {content_type}") from last_error
+        raise last_error or self._all_circuits_open()
 
-            logger.error(f"Content generation failed with {provider}: {e}")
+    def _attempt_order(self, provider: AIProviderType, content_type: str) -> Iterator[AIProviderType]:
+        """
+        The chosen provider followed by its fallbacks, without providers whose circuit is open
 
-            # Try fallback if available
-            fallback_provider = await self._get_fallback_provider(provider)
-            if fallback_provider:
-                logger.info(f"Attempting fallback to {fallback_provider}")
-                return await self.generate_content(prompt, content_type, max_tokens, fallback_provider)
+        Lazy, so a circuit is only consulted (and a rejection counted) when the
+        request actually reaches that provider.
+        """
+        self._start_due_probes()
+        for attempt_provider in [provider] + self._fallback_providers(provider, content_type):
+            if self.circuit_breakers[attempt_provider].allow_request():
+                yield attempt_provider
+
+    def _all_circuits_open(self) -> AllCircuitsOpen:
+        """503-able error for a request that every provider's open circuit skipped"""
+        retry_in = [
+            breaker.retry_in() or 0.0
+            for provider, breaker in self.circuit_breakers.items()
+            if provider in self.providers and breaker.state != CircuitState.CLOSED
+        ]
+        return AllCircuitsOpen("All AI providers unavailable: circuits open", min(retry_in, default=0.0))
 
-            raise
+    async def _generate_with_retries(
+        self,
+        prompt: str,
+        content_type: str,
+        max_tokens: int,
+        provider: AIProviderType,
+        deadline: Deadline
+    ) -> AIResponse:
+        """Call one provider, retrying retryable errors with jittered backoff while the deadline allows"""
+        policy = self.retry_policies.resolve(provider, content_type)
+        retry = 0
+        while True:
+            try:
+                return await self._generate_once(prompt, content_type, max_tokens, provider, deadline)
+            except AttemptTimeout:
+                # A hung provider would spend the whole deadline on retries: fall back instead
+                raise
+            except Exception as e:
+                if retry >= policy.max_retries or not is_retryable(e):
+                    raise
+                delay = policy.backoff(retry)
+                if delay >= deadline.remaining():
+                    raise
+                retry += 1
+                self.retry_stats["retries"] += 1
+                logger.warning(f"Retrying {provider} ({retry}/{policy.max_retries}) in {delay:.2f}s after: {e}")
+                await asyncio.sleep(delay)
+
+    async def _generate_once(
+        self,
+        prompt: str,
+        content_type: str,
+        max_tokens: int,
+        provider: AIProviderType,
+        deadline: Optional[Deadline] = None
+    ) -> AIResponse:
+        """Single generation attempt against one provider, bounded by the attempt timeout and deadline"""
+        policy = self.retry_policies.resolve(provider, content_type)
+        deadline = deadline or Deadline(policy.deadline)
+        max_tokens, estimated_tokens = self._plan_tokens(prompt, max_tokens, provider)
+        async with self.admission.admit(provider, estimated_tokens, max_wait=deadline.remaining()):
+            # Record request
+            self.provider_stats[provider]["requests"] += 1
+            start_time = time.time()
 
-    async def _generate_with_openai(self, prompt: str, max_tokens: int) -> AIResponse:
-        """Generate content using OpenAI GPT models"""
+            try:
+                # Generate content with selected provider
+                with self.router.track(provider):
+                    timeout = min(policy.attempt_timeout, deadline.remaining())
+                    try:
+                        async with asyncio.timeout(timeout) as attempt:
+                            response = await self._call_provider(provider, prompt, max_tokens, content_type)
+                    except asyncio.TimeoutError as e:
+                        if attempt.expired():
+                            raise AttemptTimeout(f"{provider.value} attempt timed out after {timeout:.1f}s") from e
+                        raise
+
+            except asyncio.CancelledError:
+                # Hedged away or abandoned: the call took at least this long (censored latency sample)
+                self.router.record_censored_latency(provider, content_type, time.time() - start_time)
+                raise
+            except Exception as e:
+                if isinstance(e, AttemptTimeout):
+                    self.retry_stats["attempt_timeouts"] += 1
+                    self.router.record_censored_latency(provider, content_type, time.time() - start_time)
+                # Record failure
+                self.provider_stats[provider]["failures"] += 1
+                self.router.record_failure(provider)
+                self.circuit_breakers[provider].record_failure()
+                raise
+
+        self.admission.settle(provider, estimated_tokens, response.tokens_used)
+
+        # Record success
+        generation_time = time.time() - start_time
+        self.provider_stats[provider]["successes"] += 1
+        self.provider_stats[provider]["total_tokens"] += response.tokens_used
+        self._update_avg_response_time(provider, generation_time)
+        self.router.record_success(provider, content_type, generation_time, response.tokens_used)
+        self.circuit_breakers[provider].record_success()
+
+        logger.info(f"Content generated successfully with {provider} in {generation_time:.2f}s")
+        return response
+
+    def _plan_tokens(self, prompt: str, max_tokens: int, provider: AIProviderType) -> Tuple[int, int]:
+        """Completion budget fitted to the model's context and the admission token estimate (raises PromptTooLarge)"""
+        prompt_tokens = token_counter.count_prompt(prompt, provider)
+        if provider == AIProviderType.OPENAI:
+            prompt_tokens += token_counter.count(EDUCATIONAL_SYSTEM_PROMPT, provider)
+        max_tokens = token_counter.fit_max_tokens(prompt_tokens, max_tokens, provider)
+        return max_tokens, prompt_tokens + max_tokens
+
+    async def _call_provider(
+        self, provider: AIProviderType, prompt: str, max_tokens: int, content_type: Optional[str] = None
+    ) -> AIResponse:
+        """Dispatch a generation request to the provider-specific implementation"""
+        if provider == AIProviderType.OPENAI:
+            return await self._generate_with_openai(prompt, max_tokens, content_type=content_type)
+        elif provider == AIProviderType.ANTHROPIC:
+            return await self._generate_with_anthropic(prompt, max_tokens, content_type=content_type)
+        elif provider == AIProviderType.VERTEX_AI:
+            return await self._generate_with_vertex_ai(prompt, max_tokens, content_type=content_type)
+        raise ValueError(f"Content generation not supported for provider: {provider}")
+
+    async def _generate_hedged(
+        self,
+        prompt: str,
+        content_type: str,
+        max_tokens: int,
+        provider: AIProviderType,
+        deadline: Deadline
+    ) -> AIResponse:
+        """Generate with the primary provider, hedging to the next one past its latency percentile"""
+        delay = self.hedging.hedge_delay(self.router, provider, content_type)
+        if delay is None:
+            return await self._generate_with_retries(prompt, content_type, max_tokens, provider, deadline)
+
+        hedge_provider = await self._get_fallback_provider(provider, content_type)
+        return await self.hedging.run(
+            self.router,
+            content_type,
+            primary=lambda: self._generate_once(prompt, content_type, max_tokens, provider, deadline),
+            hedge_provider=hedge_provider,
+            hedge=lambda: self._generate_once(prompt, content_type, max_tokens, hedge_provider, deadline),
+            delay=delay
+        )
+
+    async def _generate_with_openai(self, prompt: str, max_tokens: int, content_type: Optional[str] = None) -> AIResponse:
+        """Generate content using OpenAI GPT models, in JSON mode where the model supports it"""
         client = self.providers[AIProviderType.OPENAI]
         if not client:
             raise RuntimeError("OpenAI client not available")
@@ -211,7 +440,7 @@ class AIProviderManager:
                 messages=[
                     {
                         "role": "system",
-                        "content": "You are an expert educational content creator specializing in pedagogically sound, engaging educational materials. Always respond with well-structured, age-appropriate content that follows learning science principles."
+                        "content": EDUCATIONAL_SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -220,7 +449,8 @@ class AIProviderManager:
                 ],
                 temperature=0.7,
                 max_tokens=max_tokens,
-                top_p=0.9
+                top_p=0.9,
+                **openai_structured_params(content_type, "gpt-4")
             )
 
             content = response.choices[0].message.content
@@ -235,7 +465,8 @@ class AIProviderManager:
                 metadata={
                     "finish_reason": response.choices[0].finish_reason,
                     "prompt_tokens": response.usage.prompt_tokens if response.usage else 0,
-                    "completion_tokens": response.usage.completion_tokens if response.usage else 0
+                    "completion_tokens": response.usage.completion_tokens if response.usage else 0,
+                    **cached_token_usage(response.usage)
                 }
             )
 
@@ -243,8 +474,8 @@ class AIProviderManager:
             logger.error(f"OpenAI generation failed: {e}")
             raise
 
-    async def _generate_with_anthropic(self, prompt: str, max_tokens: int) -> AIResponse:
-        """Generate content using Anthropic Claude models"""
+    async def _generate_with_anthropic(self, prompt: str, max_tokens: int, content_type: Optional[str] = None) -> AIResponse:
+        """Generate content using Anthropic Claude models, as schema-constrained tool input for known content types"""
         client = self.providers[AIProviderType.ANTHROPIC]
         if not client:
             raise RuntimeError("Anthropic client not available")
@@ -257,13 +488,18 @@ class AIProviderManager:
                 messages=[
                     {
                         "role": "user",
-                        "content": prompt
+                        "content": cacheable_prompt_content(prompt)
                     }
-                ]
+                ],
+                **anthropic_structured_params(content_type)
             )
 
-            content = response.content[0].text
-            tokens_used = response.usage.input_tokens + response.usage.output_tokens
+            content = anthropic_response_text(response)
+            cache_usage = cached_token_usage(response.usage)
+            tokens_used = (
+                response.usage.input_tokens + response.usage.output_tokens
+                + cache_usage["cached_tokens"] + cache_usage["cache_creation_tokens"]
+            )
 
             return AIResponse(
                 content=content,
@@ -274,7 +510,8 @@ class AIProviderManager:
                 metadata={
                     "input_tokens": response.usage.input_tokens,
                     "output_tokens": response.usage.output_tokens,
-                    "stop_reason": response.stop_reason
+                    "stop_reason": response.stop_reason,
+                    **cache_usage
                 }
             )
 
@@ -282,30 +519,29 @@ class AIProviderManager:
             logger.error(f"Anthropic generation failed: {e}")
             raise
 
-    async def _generate_with_vertex_ai(self, prompt: str, max_tokens: int) -> AIResponse:
-        """Generate content using Google Vertex AI"""
+    async def _generate_with_vertex_ai(self, prompt: str, max_tokens: int, content_type: Optional[str] = None) -> AIResponse:
+        """Generate content using Google Vertex AI, as schema-constrained JSON for known content types"""
         try:
-            from vertexai.generative_models import GenerativeModel
-
-            model = GenerativeModel("gemini-1.5-flash")
+            model = vertex_model(self.sync_executor, "gemini-1.5-flash")
 
-            # Run in executor to avoid blocking
-            response = await asyncio.get_event_loop().run_in_executor(
-                None,
+            # Blocking SDK call runs on the dedicated provider pool, not the loop's default executor
+            response = await self.sync_executor.run(
                 lambda: model.generate_content(
                     prompt,
-                    generation_config={
-                        "temperature": 0.7,
-                        "max_output_tokens": max_tokens,
-                        "top_k": 40,
-                        "top_p": 0.8
-                    }
+                    generation_config=vertex_generation_config(
+                        temperature=0.7,
+                        max_output_tokens=max_tokens,
+                        top_k=40,
+                        top_p=0.8,
+                        **vertex_structured_config(content_type)
+                    )
                 )
             )
 
             content = response.text
-            # Gemini provides usage metadata
-            tokens_used = getattr(response, 'usage_metadata', {}).get('total_token_count', len(prompt.split()) + len(content.split()))
+            # Gemini usage metadata, or local token counts when it is missing
+            usage = vertex_token_usage(getattr(response, "usage_metadata", None), prompt, content)
+            tokens_used = usage["prompt_tokens"] + usage["completion_tokens"]
 
             return AIResponse(
                 content=content,
@@ -314,7 +550,7 @@ class AIProviderManager:
                 tokens_used=tokens_used,
                 generation_time=0.0,  # Will be set by caller
                 metadata={
-                    "usage_metadata": getattr(response, 'usage_metadata', {}).__dict__ if hasattr(response, 'usage_metadata') else {},
+                    **usage,
                     "safety_ratings": [rating.__dict__ for rating in getattr(response, 'candidates', [{}])[0].get('safety_ratings', [])] if getattr(response, 'candidates', None) else []
                 }
             )
@@ -323,20 +559,178 @@ class AIProviderManager:
             logger.error(f"Vertex AI generation failed: {e}")
             raise
 
-    async def _get_fallback_provider(self, failed_provider: AIProviderType) -> Optional[AIProviderType]:
-        """Get fallback provider when primary fails"""
-        # Define fallback hierarchy
-        fallback_order = [
-            AIProviderType.OPENAI,
-            AIProviderType.ANTHROPIC,
-            AIProviderType.VERTEX_AI
+    async def stream_content(
+        self,
+        prompt: str,
+        content_type: str,
+        max_tokens: int = None,
+        provider: Optional[AIProviderType] = None
+    ) -> AsyncIterator[AIStreamChunk]:
+        """
+        Stream content from the specified or default AI provider as it is generated
+
+        Falls back to another provider only if the failure happens before any
+        text has been emitted; a mid-stream failure is re-raised to the caller.
+
+        Yields:
+            AIStreamChunk text deltas, then a final chunk with done=True and the
+            assembled AIResponse
+        """
+        provider = provider or self._route_provider(content_type)
+        max_tokens = max_tokens or settings.DEFAULT_MAX_TOKENS
+
+        if not provider or provider not in self.providers:
+            raise ValueError(f"Provider {provider} not available")
+
+        # The deadline bounds the wait for a first token (fallbacks included)
+        deadline = Deadline(self.retry_policies.resolve(provider, content_type).deadline)
+
+        last_error = None
+        for attempt_provider in self._attempt_order(provider, content_type):
+            if deadline.expired():
+                self.retry_stats["deadline_exceeded"] += 1
+                raise asyncio.TimeoutError(f"Content streaming deadline exceeded for {content_type}") from last_error
+            if last_error is not None:
+                logger.info(f"Attempting streaming fallback to {attempt_provider}")
+            emitted = False
+            try:
+                async for chunk in self._stream_once(prompt, content_type, max_tokens, attempt_provider, deadline):
+                    emitted = emitted or bool(chunk.text)
+                    yield chunk
+                return
+            except Exception as e:
+                logger.error(f"Content streaming failed with {attempt_provider}: {e}")
+                if emitted:
+                    raise
+                last_error = e
+
+        raise last_error or self._all_circuits_open()
+
+    async def _stream_once(
+        self,
+        prompt: str,
+        content_type: str,
+        max_tokens: int,
+        provider: AIProviderType,
+        deadline: Deadline
+    ) -> AsyncIterator[AIStreamChunk]:
+        """Single streaming attempt against one provider, recording its stats"""
+        max_tokens, estimated_tokens = self._plan_tokens(prompt, max_tokens, provider)
+        async with self.admission.admit(provider, estimated_tokens, max_wait=deadline.remaining()):
+            async for chunk in self._stream_admitted(prompt, content_type, max_tokens, provider):
+                if chunk.done:
+                    self.admission.settle(provider, estimated_tokens, chunk.response.tokens_used)
+                yield chunk
+
+    async def _stream_admitted(
+        self,
+        prompt: str,
+        content_type: str,
+        max_tokens: int,
+        provider: AIProviderType
+    ) -> AsyncIterator[AIStreamChunk]:
+        """Provider stream for an admitted call, recording its stats"""
+        self.provider_stats[provider]["requests"] += 1
+        start_time = time.time()
+
+        try:
+            from . import provider_streaming_service as streaming
+
+            client = self.providers[provider]
+            if provider in (AIProviderType.OPENAI, AIProviderType.ANTHROPIC) and not client:
+                raise RuntimeError(f"{provider.value} client not available")
+
+            if provider == AIProviderType.OPENAI:
+                stream = streaming.stream_openai(client, prompt, max_tokens)
+            elif provider == AIProviderType.ANTHROPIC:
+                stream = streaming.stream_anthropic(client, prompt, max_tokens)
+            elif provider == AIProviderType.VERTEX_AI:
+                stream = streaming.stream_vertex_ai(self.sync_executor, prompt, max_tokens)
+            else:
+                raise ValueError(f"Content streaming not supported for provider: {provider}")
+
+            # A stream that goes quiet for longer than the attempt timeout is abandoned
+            idle_timeout = self.retry_policies.resolve(provider, content_type).attempt_timeout
+            with self.router.track(provider):
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(stream.__anext__(), timeout=idle_timeout)
+                    except StopAsyncIteration:
+                        break
+                    if chunk.done:
+                        generation_time = time.time() - start_time
+                        chunk.response.generation_time = generation_time
+                        self.provider_stats[provider]["successes"] += 1
+                        self.provider_stats[provider]["total_tokens"] += chunk.response.tokens_used
+                        self._update_avg_response_time(provider, generation_time)
+                        self.router.record_success(provider, content_type, generation_time, chunk.response.tokens_used)
+                        self.circuit_breakers[provider].record_success()
+                        logger.info(f"Content streamed successfully with {provider} in {generation_time:.2f}s")
+                    yield chunk
+
+        except Exception:
+            self.provider_stats[provider]["failures"] += 1
+            self.router.record_failure(provider)
+            self.circuit_breakers[provider].record_failure()
+            raise
+
+    def _route_provider(self, content_type: str) -> Optional[AIProviderType]:
+        """Pick the provider for a request: the default one, or the best-scoring one in adaptive routing"""
+        if settings.AI_ROUTING_STRATEGY != "adaptive":
+            return self.current_provider
+
+        candidates = [
+            p for p in FALLBACK_ORDER
+            if self.providers.get(p) and self.circuit_breakers[p].state == CircuitState.CLOSED
         ]
+        return self.router.select(candidates, content_type) or self.current_provider
+
+    def _fallback_providers(
+        self,
+        failed_provider: AIProviderType,
+        content_type: Optional[str] = None
+    ) -> List[AIProviderType]:
+        """Other text-generation providers in fallback order (ranked by live metrics in adaptive routing)"""
+        fallbacks = [p for p in FALLBACK_ORDER if p != failed_provider and p in self.providers]
+
+        if content_type and settings.AI_ROUTING_STRATEGY == "adaptive":
+            fallbacks = self.router.rank(fallbacks, content_type)
 
-        # Remove failed provider and return next available
-        available_fallbacks = [p for p in fallback_order if p != failed_provider and p in self.providers]
+        return fallbacks
 
+    async def _get_fallback_provider(
+        self,
+        failed_provider: AIProviderType,
+        content_type: Optional[str] = None
+    ) -> Optional[AIProviderType]:
+        """Get fallback provider when primary fails (skipping providers whose circuit is open)"""
+        available_fallbacks = [
+            p for p in self._fallback_providers(failed_provider, content_type)
+            if self.circuit_breakers[p].state == CircuitState.CLOSED
+        ]
         return available_fallbacks[0] if available_fallbacks else None
 
+    def _start_due_probes(self):
+        """Launch a background probe for every circuit whose cool-down has elapsed"""
+        for provider, breaker in self.circuit_breakers.items():
+            if breaker.should_probe():
+                task = asyncio.create_task(self._probe_provider(provider))
+                self._probe_tasks.add(task)
+                task.add_done_callback(self._probe_tasks.discard)
+
+    async def _probe_provider(self, provider: AIProviderType):
+        """Send a minimal request to a half-open provider; its outcome closes or re-opens the circuit"""
+        breaker = self.circuit_breakers[provider]
+        try:
+            await asyncio.wait_for(
+                self._call_provider(provider, "Reply with OK.", 5),
+                timeout=settings.AI_CIRCUIT_PROBE_TIMEOUT
+            )
+            breaker.record_success()
+        except Exception as e:
+            logger.warning(f"Circuit probe failed for {provider}: {e}")
+            breaker.record_failure()
+
     def _update_avg_response_time(self, provider: AIProviderType, response_time: float):
         """Update average response time for provider"""
         stats = self.provider_stats[provider]
@@ -355,9 +749,26 @@ class AIProviderManager:
         return {
             "current_provider": self.current_provider.value if self.current_provider else None,
             "available_providers": [p.value for p in self.providers.keys()],
-            "stats": {p.value: stats for p, stats in self.provider_stats.items()}
+            "stats": {p.value: stats for p, stats in self.provider_stats.items()},
+            "routing": {
+                "strategy": settings.AI_ROUTING_STRATEGY,
+                "providers": self.router.get_stats()
+            },
+            "hedging": {
+                "enabled": settings.AI_HEDGING_ENABLED,
+                **self.hedging.get_stats()
+            },
+            "circuit_breakers": self.get_circuit_states(),
+            "admission": self.admission.get_stats(),
+            "retries": dict(self.retry_stats),
+            "tokens": token_counter.get_stats(),
+            "sync_executor": self.sync_executor.get_stats()
         }
 
+    def get_circuit_states(self) -> Dict[str, Any]:
+        """Get circuit breaker state per provider"""
+        return {p.value: breaker.get_stats() for p, breaker in self.circuit_breakers.items()}
+
     def set_default_provider(self, provider: AIProviderType):
         """Set the default provider for content generation"""
         if provider not in self.providers:
@@ -392,3 +803,20 @@ class AIProviderManager:
                 logger.warning(f"Health check failed for {provider_type}: {e}")
 
         return health_status
+
+    async def close(self):
+        """Close provider SDK clients and their HTTP connection pools"""
+        for task in list(self._probe_tasks):
+            task.cancel()
+
+        for provider_type in (AIProviderType.OPENAI, AIProviderType.ANTHROPIC):
+            client = self.providers.get(provider_type)
+            if not client:
+                continue
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close {provider_type.value} client: {e}")
+
+        self.sync_executor.shutdown()
+        logger.info("AI provider clients closed")
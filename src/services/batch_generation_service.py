@@ -0,0 +1,312 @@
+"""
+Batch Generation Pipeline for La Factoria
+Offline generation of topic x content type manifests through provider batch
+APIs: submit, poll, parse and assess in bulk, write to cache and database,
+checkpointing progress so an interrupted run resumes where it stopped
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from ..core.config import settings
+from ..models.educational import LaFactoriaContentType
+from .ai_providers import AIResponse
+from .batch_provider_service import BatchRequest
+from .educational_content_service import EducationalContentService
+
+logger = logging.getLogger(__name__)
+
+# Namespace for deterministic database ids, so re-running a batch upserts instead of duplicating
+BATCH_CONTENT_NAMESPACE = uuid.UUID("6f2c3a7e-0b7d-4f4e-9a51-2d8c1e5b9f10")
+
+
+@dataclass
+class BatchItem:
+    """One topic x content type from the manifest"""
+    custom_id: str
+    topic: str
+    content_type: str
+    age_group: str = "general"
+    additional_requirements: Optional[str] = None
+
+
+def load_manifest(path: str) -> List[BatchItem]:
+    """
+    Read a JSONL manifest, one topic per line:
+
+        {"topic": "Photosynthesis", "content_types": ["flashcards", "study_guide"], "age_group": "high_school"}
+
+    Each line expands to one item per content type (as generate_multiple_content_types does);
+    duplicates are dropped.
+    """
+    supported_types = [ct.value for ct in LaFactoriaContentType]
+    items: Dict[str, BatchItem] = {}
+
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            content_types = entry.get("content_types") or []
+            if not entry.get("topic") or not content_types:
+                raise ValueError(f"Manifest line {line_number}: topic and content_types are required")
+            invalid_types = [ct for ct in content_types if ct not in supported_types]
+            if invalid_types:
+                raise ValueError(f"Manifest line {line_number}: unsupported content types: {invalid_types}")
+
+            for content_type in content_types:
+                item = BatchItem(
+                    custom_id="",
+                    topic=entry["topic"],
+                    content_type=content_type,
+                    age_group=entry.get("age_group", "general"),
+                    additional_requirements=entry.get("additional_requirements")
+                )
+                item.custom_id = _custom_id(item)
+                items.setdefault(item.custom_id, item)
+
+    return list(items.values())
+
+
+def _custom_id(item: BatchItem) -> str:
+    """Stable id for an item (valid as an OpenAI and Anthropic batch custom_id)"""
+    key = json.dumps([item.topic, item.content_type, item.age_group, item.additional_requirements])
+    return f"{item.content_type}-{hashlib.sha256(key.encode()).hexdigest()[:24]}"
+
+
+class BatchCheckpoint:
+    """
+    Progress of a batch run, persisted as JSON after every change
+
+    Records submitted batches (so a restarted run polls them instead of
+    resubmitting), completed items and failed items (retried on the next run).
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.batches: Dict[str, List[str]] = {}
+        self.completed: Dict[str, str] = {}  # custom_id -> database id
+        self.failed: Dict[str, str] = {}     # custom_id -> error
+        if self.path.exists():
+            data = json.loads(self.path.read_text())
+            self.batches = data.get("batches", {})
+            self.completed = data.get("completed", {})
+            self.failed = data.get("failed", {})
+
+    def in_flight(self) -> set:
+        return {custom_id for custom_ids in self.batches.values() for custom_id in custom_ids}
+
+    def save(self):
+        """Write atomically so a crash mid-write never corrupts the checkpoint"""
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps({
+            "batches": self.batches,
+            "completed": self.completed,
+            "failed": self.failed
+        }))
+        os.replace(tmp_path, self.path)
+
+
+class BatchGenerationPipeline:
+    """
+    Offline generation through a provider batch backend
+
+    Items already completed in the checkpoint are skipped and batches submitted
+    by an interrupted run are polled rather than resubmitted. Results are
+    parsed, quality-assessed and cached through EducationalContentService, then
+    written to the database one batch per transaction.
+    """
+
+    def __init__(
+        self,
+        service: EducationalContentService,
+        backend,
+        checkpoint_path: str,
+        chunk_size: int = None,
+        poll_interval: float = None,
+        session_factory: Optional[Callable[[], Any]] = None
+    ):
+        self.service = service
+        self.backend = backend
+        self.checkpoint = BatchCheckpoint(checkpoint_path)
+        self.chunk_size = chunk_size or settings.BATCH_GENERATION_CHUNK_SIZE
+        self.poll_interval = settings.BATCH_GENERATION_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.session_factory = session_factory
+        self.stats = {"submitted_batches": 0, "resumed_batches": 0, "completed": 0, "failed": 0, "skipped": 0}
+
+    async def run(self, manifest_path: str) -> Dict[str, Any]:
+        """Generate every manifest item not already completed; returns a run summary"""
+        if not self.service._initialized:
+            await self.service.initialize()
+
+        items = {item.custom_id: item for item in load_manifest(manifest_path)}
+        self.stats["skipped"] = sum(1 for custom_id in items if custom_id in self.checkpoint.completed)
+
+        collectors = []
+        for batch_id in list(self.checkpoint.batches):
+            logger.info(f"Resuming batch {batch_id}")
+            self.stats["resumed_batches"] += 1
+            collectors.append(self._collect(batch_id, items, time.time()))
+
+        in_flight = self.checkpoint.in_flight()
+        remaining = [
+            item for custom_id, item in items.items()
+            if custom_id not in self.checkpoint.completed and custom_id not in in_flight
+        ]
+        for start in range(0, len(remaining), self.chunk_size):
+            chunk = remaining[start:start + self.chunk_size]
+            batch_id = await self._submit(chunk)
+            collectors.append(self._collect(batch_id, items, time.time()))
+
+        await asyncio.gather(*collectors)
+
+        errors = {custom_id: error for custom_id, error in self.checkpoint.failed.items() if custom_id in items}
+        return {
+            "manifest": str(manifest_path),
+            "backend": self.backend.name,
+            "total_items": len(items),
+            "errors": errors,
+            "summary": {
+                "successful_generations": sum(1 for custom_id in items if custom_id in self.checkpoint.completed),
+                "failed_generations": len(errors),
+                **self.stats
+            }
+        }
+
+    async def _submit(self, chunk: List[BatchItem]) -> str:
+        requests = []
+        for item in chunk:
+            _, prompt = await self.service._build_prompt(
+                item.content_type, item.topic, item.age_group, None, item.additional_requirements
+            )
+            requests.append(BatchRequest(
+                custom_id=item.custom_id,
+                prompt=prompt,
+                content_type=item.content_type,
+                max_tokens=self.service._get_max_tokens_for_type(item.content_type)
+            ))
+
+        batch_id = await self.backend.submit(requests)
+        self.checkpoint.batches[batch_id] = [item.custom_id for item in chunk]
+        self.checkpoint.save()
+        self.stats["submitted_batches"] += 1
+        logger.info(f"Submitted batch {batch_id} with {len(chunk)} requests to {self.backend.name}")
+        return batch_id
+
+    async def _collect(self, batch_id: str, items: Dict[str, BatchItem], start_time: float):
+        """Poll a batch to completion, then process its results"""
+        try:
+            while True:
+                status = await self.backend.poll(batch_id)
+                if status.done:
+                    break
+                logger.info(
+                    f"Batch {batch_id}: {status.completed + status.failed}/{status.total} requests finished"
+                )
+                await asyncio.sleep(self.poll_interval)
+            results = await self.backend.results(batch_id)
+        except KeyError:
+            # The backend no longer knows this batch (e.g. a local batch from a previous process)
+            logger.warning(f"Batch {batch_id} cannot be collected; its items will be resubmitted on the next run")
+            self.checkpoint.batches.pop(batch_id, None)
+            self.checkpoint.save()
+            return
+
+        await self._process_results(batch_id, results, items, start_time)
+
+    async def _process_results(
+        self,
+        batch_id: str,
+        results: Dict[str, Any],
+        items: Dict[str, BatchItem],
+        start_time: float
+    ):
+        """Parse, assess and cache all successes concurrently, then write them in one transaction"""
+        custom_ids = self.checkpoint.batches.get(batch_id, list(results))
+        succeeded = [
+            (items[custom_id], results[custom_id]) for custom_id in custom_ids
+            if custom_id in items and isinstance(results.get(custom_id), AIResponse)
+        ]
+
+        finalized = await asyncio.gather(*(
+            self._finalize(item, response, batch_id, start_time) for item, response in succeeded
+        ), return_exceptions=True)
+
+        rows = []
+        for (item, _), result in zip(succeeded, finalized):
+            if isinstance(result, Exception):
+                results[item.custom_id] = f"post-processing failed: {result}"
+            else:
+                rows.append((item, result))
+
+        await asyncio.to_thread(self._write_rows, rows)
+
+        for item, result in rows:
+            self.checkpoint.completed[item.custom_id] = str(result["id"])
+            self.checkpoint.failed.pop(item.custom_id, None)
+        self.stats["completed"] += len(rows)
+
+        completed_ids = {item.custom_id for item, _ in rows}
+        for custom_id in custom_ids:
+            if custom_id not in completed_ids:
+                error = results.get(custom_id)
+                self.checkpoint.failed[custom_id] = error if isinstance(error, str) else "missing from batch results"
+                self.stats["failed"] += 1
+
+        self.checkpoint.batches.pop(batch_id, None)
+        self.checkpoint.save()
+        logger.info(f"Batch {batch_id} processed: {len(rows)} stored, {len(custom_ids) - len(rows)} failed")
+
+    async def _finalize(self, item: BatchItem, response: AIResponse, batch_id: str, start_time: float) -> Dict[str, Any]:
+        variables, _ = await self.service._build_prompt(
+            item.content_type, item.topic, item.age_group, None, item.additional_requirements
+        )
+        return await self.service._finalize_generation(
+            item.content_type, item.topic, item.age_group, None, item.additional_requirements,
+            variables, response, start_time,
+            extra_metadata={"batch_id": batch_id, "batch_backend": self.backend.name},
+            wait_for_cache=True,
+            content_id=str(uuid.uuid5(BATCH_CONTENT_NAMESPACE, item.custom_id))
+        )
+
+    def _write_rows(self, rows: List[tuple]):
+        """Upsert generated content rows in a single transaction"""
+        if not rows:
+            return
+        from ..models.educational import EducationalContentDB
+
+        session_factory = self.session_factory
+        if session_factory is None:
+            from ..core.database import SessionLocal
+            session_factory = SessionLocal
+
+        db = session_factory()
+        try:
+            for item, result in rows:
+                metadata = result.get("metadata", {})
+                db.merge(EducationalContentDB(
+                    id=uuid.UUID(result["id"]),
+                    content_type=item.content_type,
+                    topic=item.topic,
+                    age_group=item.age_group,
+                    learning_objectives=[],
+                    cognitive_load_metrics=metadata.get("cognitive_load_metrics", {}),
+                    generated_content=result["generated_content"],
+                    quality_score=round(result["quality_metrics"].get("overall_quality_score", 0.0), 2),
+                    generation_duration_ms=metadata.get("generation_duration_ms"),
+                    ai_provider=metadata.get("ai_provider")
+                ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
@@ -0,0 +1,284 @@
+"""
+Provider Batch APIs for La Factoria
+Submit, poll and collect offline generation batches through provider batch
+endpoints (OpenAI, Anthropic), with a local stand-in for other providers and tests
+"""
+
+import asyncio
+import io
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+
+from .ai_providers import (
+    AIProviderManager, AIProviderType, AIResponse, EDUCATIONAL_SYSTEM_PROMPT,
+    cacheable_prompt_content, cached_token_usage
+)
+from .structured_output_service import (
+    anthropic_response_text, anthropic_structured_params, openai_structured_params
+)
+
+logger = logging.getLogger(__name__)
+
+OPENAI_BATCH_MODEL = "gpt-4"
+ANTHROPIC_BATCH_MODEL = "claude-3-5-sonnet-20241022"
+
+
+@dataclass
+class BatchRequest:
+    """One prompt in a provider batch, addressed by custom_id"""
+    custom_id: str
+    prompt: str
+    content_type: str
+    max_tokens: int
+
+
+@dataclass
+class BatchStatus:
+    """Progress of a submitted batch"""
+    batch_id: str
+    done: bool
+    completed: int = 0
+    failed: int = 0
+    total: int = 0
+
+
+# custom_id -> AIResponse on success, or the provider's error message
+BatchResults = Dict[str, Union[AIResponse, str]]
+
+
+class OpenAIBatchBackend:
+    """OpenAI Batch API: JSONL upload to /v1/chat/completions with a 24h completion window"""
+
+    name = AIProviderType.OPENAI.value
+
+    def __init__(self, client):
+        self.client = client
+
+    async def submit(self, requests: List[BatchRequest]) -> str:
+        lines = [
+            json.dumps({
+                "custom_id": request.custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": OPENAI_BATCH_MODEL,
+                    "messages": [
+                        {"role": "system", "content": EDUCATIONAL_SYSTEM_PROMPT},
+                        {"role": "user", "content": request.prompt}
+                    ],
+                    "temperature": 0.7,
+                    "max_tokens": request.max_tokens,
+                    "top_p": 0.9,
+                    **openai_structured_params(request.content_type, OPENAI_BATCH_MODEL)
+                }
+            })
+            for request in requests
+        ]
+        batch_file = await self.client.files.create(
+            file=("batch.jsonl", io.BytesIO("\n".join(lines).encode())),
+            purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        return batch.id
+
+    async def poll(self, batch_id: str) -> BatchStatus:
+        batch = await self.client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        return BatchStatus(
+            batch_id=batch_id,
+            done=batch.status in ("completed", "failed", "expired", "cancelled"),
+            completed=getattr(counts, "completed", 0),
+            failed=getattr(counts, "failed", 0),
+            total=getattr(counts, "total", 0)
+        )
+
+    async def results(self, batch_id: str) -> BatchResults:
+        batch = await self.client.batches.retrieve(batch_id)
+        results: BatchResults = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await self.client.files.content(file_id)
+            for line in content.text.splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    results[entry["custom_id"]] = self._parse_entry(entry)
+        return results
+
+    def _parse_entry(self, entry: Dict[str, Any]) -> Union[AIResponse, str]:
+        response = entry.get("response") or {}
+        if entry.get("error") or response.get("status_code") != 200:
+            return str(entry.get("error") or response.get("body", {}).get("error") or "batch request failed")
+        body = response["body"]
+        usage = body.get("usage") or {}
+        return AIResponse(
+            content=body["choices"][0]["message"]["content"],
+            provider=self.name,
+            model=body.get("model", OPENAI_BATCH_MODEL),
+            tokens_used=usage.get("total_tokens", 0),
+            generation_time=0.0,
+            metadata={
+                "finish_reason": body["choices"][0].get("finish_reason"),
+                "prompt_tokens": usage.get("prompt_tokens", 0),
+                "completion_tokens": usage.get("completion_tokens", 0),
+                "cached_tokens": (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0),
+                "cache_creation_tokens": 0,
+                "batch": True
+            }
+        )
+
+
+class AnthropicBatchBackend:
+    """Anthropic Message Batches API"""
+
+    name = AIProviderType.ANTHROPIC.value
+
+    def __init__(self, client):
+        self.client = client
+
+    async def submit(self, requests: List[BatchRequest]) -> str:
+        batch = await self.client.messages.batches.create(requests=[
+            {
+                "custom_id": request.custom_id,
+                "params": {
+                    "model": ANTHROPIC_BATCH_MODEL,
+                    "max_tokens": request.max_tokens,
+                    "temperature": 0.7,
+                    "messages": [{"role": "user", "content": cacheable_prompt_content(request.prompt)}],
+                    **anthropic_structured_params(request.content_type)
+                }
+            }
+            for request in requests
+        ])
+        return batch.id
+
+    async def poll(self, batch_id: str) -> BatchStatus:
+        batch = await self.client.messages.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        failed = counts.errored + counts.canceled + counts.expired
+        return BatchStatus(
+            batch_id=batch_id,
+            done=batch.processing_status == "ended",
+            completed=counts.succeeded,
+            failed=failed,
+            total=counts.processing + counts.succeeded + failed
+        )
+
+    async def results(self, batch_id: str) -> BatchResults:
+        results: BatchResults = {}
+        async for entry in await self.client.messages.batches.results(batch_id):
+            result = entry.result
+            if result.type != "succeeded":
+                results[entry.custom_id] = str(getattr(result, "error", None) or result.type)
+                continue
+            message = result.message
+            cache_usage = cached_token_usage(message.usage)
+            results[entry.custom_id] = AIResponse(
+                content=anthropic_response_text(message),
+                provider=self.name,
+                model=message.model,
+                tokens_used=(
+                    message.usage.input_tokens + message.usage.output_tokens
+                    + cache_usage["cached_tokens"] + cache_usage["cache_creation_tokens"]
+                ),
+                generation_time=0.0,
+                metadata={
+                    "input_tokens": message.usage.input_tokens,
+                    "output_tokens": message.usage.output_tokens,
+                    "stop_reason": message.stop_reason,
+                    **cache_usage,
+                    "batch": True
+                }
+            )
+        return results
+
+
+class LocalBatchBackend:
+    """
+    Stand-in batch API over the interactive provider path
+
+    Used for providers without a batch endpoint and in tests. Requests run in the
+    background with bounded concurrency and are collected like a provider batch.
+    """
+
+    name = "local"
+
+    def __init__(self, ai_provider: AIProviderManager, concurrency: int = 4):
+        self.ai_provider = ai_provider
+        self.concurrency = concurrency
+        self._batches: Dict[str, Dict[str, Any]] = {}
+
+    async def submit(self, requests: List[BatchRequest]) -> str:
+        batch_id = f"local-{uuid.uuid4().hex[:12]}"
+        results: BatchResults = {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(request: BatchRequest):
+            async with semaphore:
+                try:
+                    results[request.custom_id] = await self.ai_provider.generate_content(
+                        prompt=request.prompt,
+                        content_type=request.content_type,
+                        max_tokens=request.max_tokens
+                    )
+                except Exception as e:
+                    results[request.custom_id] = str(e) or type(e).__name__
+
+        self._batches[batch_id] = {
+            "results": results,
+            "total": len(requests),
+            "task": asyncio.ensure_future(asyncio.gather(*(run(r) for r in requests)))
+        }
+        return batch_id
+
+    def _batch(self, batch_id: str) -> Dict[str, Any]:
+        batch = self._batches.get(batch_id)
+        if batch is None:
+            # Local batches live in memory; a resumed run cannot collect them
+            raise KeyError(f"Unknown local batch {batch_id}")
+        return batch
+
+    async def poll(self, batch_id: str) -> BatchStatus:
+        batch = self._batch(batch_id)
+        results = batch["results"]
+        failed = sum(1 for r in results.values() if isinstance(r, str))
+        return BatchStatus(
+            batch_id=batch_id,
+            done=batch["task"].done(),
+            completed=len(results) - failed,
+            failed=failed,
+            total=batch["total"]
+        )
+
+    async def results(self, batch_id: str) -> BatchResults:
+        batch = self._batch(batch_id)
+        await batch["task"]
+        return dict(batch["results"])
+
+
+def create_batch_backend(
+    ai_provider: AIProviderManager,
+    provider: Optional[str] = None,
+    local_concurrency: int = 4
+):
+    """Batch backend for the named provider ("openai", "anthropic" or "local"), or the first available"""
+    clients = {p.value: client for p, client in ai_provider.providers.items() if client}
+    if provider is None:
+        provider = next((p for p in ("openai", "anthropic") if p in clients), "local")
+
+    if provider == "local":
+        return LocalBatchBackend(ai_provider, concurrency=local_concurrency)
+    if provider not in clients:
+        raise ValueError(f"Provider {provider} not available")
+    if provider == AIProviderType.OPENAI.value:
+        return OpenAIBatchBackend(clients[provider])
+    if provider == AIProviderType.ANTHROPIC.value:
+        return AnthropicBatchBackend(clients[provider])
+    raise ValueError(f"Provider {provider} has no batch API; use 'local'")
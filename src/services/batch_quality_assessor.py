@@ -0,0 +1,366 @@
+"""
+Batch Quality Assessor for La Factoria
+Score many documents at once: per-document features (word and sentence
+lengths, syllables, keyword counts, structure flags) are collected into NumPy
+arrays and every assessment dimension is computed over the whole batch
+"""
+
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from ..models.educational import LearningObjective
+from .quality_assessor import (
+    ASSESSMENT_KEYWORDS,
+    ASSESSMENT_VERSION,
+    BLOOMS_AGE_EXPECTATIONS,
+    BLOOMS_KEYWORDS,
+    CITATION_INDICATORS,
+    COGNITIVE_LOAD_THRESHOLDS,
+    DEFAULT_BLOOMS_LEVELS,
+    EDUCATIONAL_INDICATORS,
+    ENGAGEMENT_PATTERNS,
+    HEADING_PATTERN,
+    INTERACTIVE_INDICATORS,
+    LEARNING_INDICATORS,
+    LIST_PATTERNS,
+    NUMBER_PATTERN,
+    OVERCONFIDENT_PHRASES,
+    QUALITY_WEIGHTS,
+    READABILITY_THRESHOLDS,
+    RED_FLAGS,
+    TECHNICAL_INDICATORS,
+    UNCERTAINTY_INDICATORS,
+    EducationalQualityAssessor,
+)
+from .text_analysis_service import count_syllables
+
+logger = logging.getLogger(__name__)
+
+BLOOMS_LEVELS = list(BLOOMS_KEYWORDS)
+MAX_EXPECTED_LEVELS = max(len(levels) for levels in BLOOMS_AGE_EXPECTATIONS.values())
+
+# Keyword lists counted per document; a document's counts are its keyword
+# presence row times the keyword x group matrix
+KEYWORD_GROUPS = {
+    "technical": TECHNICAL_INDICATORS,
+    "learning": LEARNING_INDICATORS,
+    "interactive": INTERACTIVE_INDICATORS,
+    "educational": EDUCATIONAL_INDICATORS,
+    "red_flags": RED_FLAGS,
+    "uncertainty": UNCERTAINTY_INDICATORS,
+    "overconfident": OVERCONFIDENT_PHRASES,
+    "citations": CITATION_INDICATORS,
+    **{f"blooms_{level}": keywords for level, keywords in BLOOMS_KEYWORDS.items()}
+}
+_KEYWORD_INDEX = {keyword: i for i, keyword in enumerate(sorted(ASSESSMENT_KEYWORDS.keywords))}
+_GROUP_MATRIX = np.zeros((len(_KEYWORD_INDEX), len(KEYWORD_GROUPS)))
+for _group, _keywords in enumerate(KEYWORD_GROUPS.values()):
+    for _keyword in _keywords:
+        _GROUP_MATRIX[_KEYWORD_INDEX[_keyword], _group] += 1  # Repeats in a list count repeatedly, as in count_present
+
+
+def _per_document(value, count: int, name: str) -> List[Any]:
+    """Broadcast a single value to every document, or check a per-document sequence"""
+    if isinstance(value, str) or value is None:
+        return [value] * count
+    values = list(value)
+    if len(values) != count:
+        raise ValueError(f"{name} has {len(values)} entries for {count} documents")
+    return values
+
+
+def _round(values: np.ndarray, digits: int) -> List[float]:
+    """Python round() per element (np.round rounds some ties differently from the scalar path)"""
+    return [round(value, digits) for value in values.tolist()]
+
+
+def _clip(values: np.ndarray) -> np.ndarray:
+    return np.maximum(0.0, np.minimum(1.0, values))
+
+
+def _add_steps(values: np.ndarray, counts: np.ndarray, limit: int, step: float) -> np.ndarray:
+    """Add step once per counted item, in sequence, as the scalar path's per-keyword loop does"""
+    for i in range(limit):
+        values = values + np.where(counts > i, step, 0.0)
+    return values
+
+
+class _FeatureTable:
+    """Per-document feature columns, appended one document at a time"""
+
+    def __init__(self, assessor: EducationalQualityAssessor):
+        self.assessor = assessor
+        self.columns: Dict[str, list] = {}
+        self.expected_levels: List[List[int]] = []
+        self.keyword_rows: List[int] = []
+        self.keyword_columns: List[int] = []
+        self._syllables: Dict[str, int] = {}  # Shared across the batch: vocabularies overlap heavily
+
+    def _append(self, **features):
+        for name, value in features.items():
+            self.columns.setdefault(name, []).append(value)
+
+    def _syllable_count(self, words: List[str]) -> int:
+        cache = self._syllables
+        total = 0
+        for word, n in Counter(words).items():
+            syllables = cache.get(word)
+            if syllables is None:
+                syllables = cache[word] = count_syllables(word)
+            total += syllables * n
+        return total
+
+    def add(self, content, text: str, content_type: str, age_group: str, objectives):
+        assessor = self.assessor
+        analysis = assessor._analyze(text)
+        lengths = np.fromiter(map(len, analysis.words), dtype=np.int64, count=analysis.word_count)
+        self.add_row(
+            content_type,
+            age_group,
+            analysis.keywords,
+            text_length=len(text),
+            word_count=analysis.word_count,
+            word_length=int(lengths.sum()),
+            complex_words=int((lengths > 6).sum()),
+            sentence_count=len(analysis.sentences),
+            sentence_words=analysis.sentence_word_count,
+            paragraph_breaks=text.count('\n\n'),
+            syllables=self._syllable_count(analysis.words),
+            content_points=assessor._content_structure_score(content, content_type),
+            alignment=assessor._objective_alignment(analysis, objectives),
+            engagement_hits=sum(1 for pattern in ENGAGEMENT_PATTERNS.values() if pattern.search(analysis.lower)),
+            heading=bool(HEADING_PATTERN.search(text)),
+            has_list=any(pattern.search(text) for pattern in LIST_PATTERNS),
+            math=bool(NUMBER_PATTERN.search(text)) and '=' in text and any(op in text for op in '+-*/')
+        )
+
+    def add_row(self, content_type: str, age_group: str, keywords, **features):
+        """
+        Add one document from its text features and the set of assessment
+        keywords it contains (also fed by the incremental assessor's running
+        aggregates)
+        """
+        expected = BLOOMS_AGE_EXPECTATIONS.get(age_group, DEFAULT_BLOOMS_LEVELS)
+        qa = 'question' in keywords and 'answer' in keywords
+
+        row = len(self.expected_levels)
+        self.keyword_columns.extend(_KEYWORD_INDEX[keyword] for keyword in keywords)
+        self.keyword_rows.extend([row] * (len(self.keyword_columns) - len(self.keyword_rows)))
+
+        paragraphs = features["paragraph_breaks"] + 1  # len(text.split('\n\n'))
+        if content_type == 'flashcards':
+            type_structure = qa
+        elif content_type == 'study_guide':
+            type_structure = paragraphs >= 3
+        else:
+            type_structure = False
+
+        self._append(
+            **features,
+            paragraphs=paragraphs > 1,
+            type_structure=type_structure,
+            qa_bonus=content_type in ('flashcards', 'faq_collection') and qa,
+            cognitive_threshold=COGNITIVE_LOAD_THRESHOLDS.get(age_group.lower(), 2.3),
+            readability_threshold=READABILITY_THRESHOLDS.get(age_group.lower(), 60),
+            elementary=age_group == 'elementary',
+            blooms_count=len(expected)
+        )
+        self.expected_levels.append(
+            [BLOOMS_LEVELS.index(level) for level in expected] + [-1] * (MAX_EXPECTED_LEVELS - len(expected))
+        )
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        arrays = {name: np.asarray(values, dtype=float) for name, values in self.columns.items()}
+        present = np.zeros((len(self.expected_levels), len(_KEYWORD_INDEX)))
+        present[self.keyword_rows, self.keyword_columns] = 1.0
+        counts = present @ _GROUP_MATRIX
+        for group, name in enumerate(KEYWORD_GROUPS):
+            arrays[name] = counts[:, group]
+        arrays["blooms"] = counts[:, -len(BLOOMS_LEVELS):]
+        arrays["expected_levels"] = np.asarray(self.expected_levels, dtype=np.int64).reshape(-1, MAX_EXPECTED_LEVELS)
+        return arrays
+
+
+def _score(f: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Every assessment dimension over the batch (same formulas and operation order as the scalar path)"""
+    word_count, sentence_count = f["word_count"], f["sentence_count"]
+    words = np.maximum(word_count, 1)
+    sentences = np.maximum(sentence_count, 1)
+    has_words, has_sentences = word_count > 0, sentence_count > 0
+
+    # Cognitive load
+    technical_density = f["technical"] / words * 1000
+    intrinsic = np.where(has_words, _clip(
+        (f["word_length"] / words - 4) / 6 * 0.3 +
+        f["complex_words"] / words * 0.4 +
+        np.minimum(technical_density / 10, 1) * 0.3
+    ), 0.0)
+    long_sentence_penalty = np.maximum(0, (f["sentence_words"] / sentences - 20) / 30)
+    structure = np.where(has_words, np.minimum(1.0, f["paragraph_breaks"] / (words / 100)), 0)
+    extraneous = np.where(has_sentences, _clip(long_sentence_penalty * 0.6 + (1 - structure) * 0.4), 0.0)
+    germane = _clip(
+        np.minimum(f["learning"] / words * 1000 / 20, 1) * 0.6 +
+        np.minimum(f["interactive"] / words * 1000 / 10, 1) * 0.4
+    )
+    total_load = (intrinsic * 0.4) + (extraneous * 0.3) + (germane * 0.3)
+
+    # Readability
+    words_per_sentence = word_count / sentences
+    syllables_per_word = f["syllables"] / words
+    flesch = np.maximum(0, np.minimum(100, 206.835 - (1.015 * words_per_sentence) - (84.6 * syllables_per_word)))
+    readable = has_words & has_sentences
+    appropriateness = np.minimum(1.0, flesch / f["readability_threshold"])
+
+    # Educational effectiveness, engagement and structure
+    effectiveness = _clip(f["content_points"] + np.where(
+        has_words, np.minimum(0.4, f["educational"] / words * 100 / 5), 0.0
+    ))
+    engagement = np.minimum(1.0, _add_steps(np.zeros_like(word_count), f["engagement_hits"], len(ENGAGEMENT_PATTERNS), 0.2))
+    structural = np.zeros_like(word_count)
+    for flag, points in (("heading", 0.3), ("has_list", 0.2), ("paragraphs", 0.2), ("type_structure", 0.3)):
+        structural = structural + np.where(f[flag] > 0, points, 0.0)
+    structural = np.minimum(1.0, structural)
+
+    # Factual accuracy
+    accuracy = _add_steps(np.full_like(word_count, 0.8), f["red_flags"], len(RED_FLAGS), -0.2)
+    accuracy = accuracy + np.where(f["uncertainty"] > 0, np.minimum(0.1, f["uncertainty"] * 0.02), 0.0)
+    accuracy = _add_steps(accuracy, f["overconfident"], len(OVERCONFIDENT_PHRASES), -0.1)
+    accuracy = accuracy + np.where(f["citations"] > 0, np.minimum(0.15, f["citations"] * 0.05), 0.0)
+    accuracy = accuracy + np.where(f["qa_bonus"] > 0, 0.05, 0.0)
+    accuracy = _clip(accuracy + np.where(f["math"] > 0, 0.05, 0.0))
+
+    # Bloom's taxonomy: expected levels present, diversity bonus, elementary penalties
+    present = f["blooms"] > 0
+    rows = np.arange(len(word_count))
+    blooms = np.zeros_like(word_count)
+    for j in range(MAX_EXPECTED_LEVELS):
+        level = f["expected_levels"][:, j]
+        hit = (level >= 0) & present[rows, np.maximum(level, 0)]
+        blooms = blooms + np.where(hit, 1.0 / f["blooms_count"], 0.0)
+    blooms = blooms + np.where(present.sum(axis=1) >= 2, 0.1, 0.0)
+    elementary = f["elementary"] > 0
+    inappropriate = (
+        (elementary & present[:, BLOOMS_LEVELS.index('evaluate')]).astype(float) +
+        (elementary & present[:, BLOOMS_LEVELS.index('create')]).astype(float)
+    )
+    blooms = np.minimum(1.0, np.maximum(0.0, blooms - inappropriate * 0.1))
+
+    # Overall score from the rounded readability score, as reported
+    readability_score = np.where(readable, np.asarray(_round(appropriateness, 2)), 0.5)
+    weights = QUALITY_WEIGHTS
+    overall = (
+        effectiveness * weights['educational_effectiveness'] +
+        accuracy * weights['factual_accuracy'] +
+        readability_score * weights['readability'] +
+        f["alignment"] * weights['learning_alignment'] +
+        np.where(total_load <= f["cognitive_threshold"], 1.0, 0.5) * weights['cognitive_load'] +
+        structural * weights['structural_quality'] +
+        engagement * weights['engagement']
+    )
+
+    return {
+        "intrinsic": intrinsic, "extraneous": extraneous, "germane": germane, "total_load": total_load,
+        "flesch": flesch, "words_per_sentence": words_per_sentence, "syllables_per_word": syllables_per_word,
+        "appropriateness": appropriateness, "effectiveness": effectiveness, "engagement": engagement,
+        "structural": structural, "accuracy": accuracy, "blooms": blooms, "overall": overall
+    }
+
+
+def score_rows(table: _FeatureTable) -> List[Dict[str, Any]]:
+    """Per-document dimension scores of a feature table, rounded and shaped as in the scalar assessment"""
+    s = _score(table.arrays())
+    columns = {name: values.tolist() for name, values in s.items()}
+    rounded = {name: _round(s[name], digits) for name, digits in (
+        ("intrinsic", 2), ("extraneous", 2), ("germane", 2), ("total_load", 2), ("flesch", 1),
+        ("words_per_sentence", 1), ("syllables_per_word", 1), ("appropriateness", 2), ("overall", 3)
+    )}
+    f = table.columns
+
+    rows = []
+    for row in range(len(table.expected_levels)):
+        if f["word_count"][row] and f["sentence_count"][row]:
+            readability = {
+                "flesch_reading_ease": rounded["flesch"][row],
+                "avg_words_per_sentence": rounded["words_per_sentence"][row],
+                "avg_syllables_per_word": rounded["syllables_per_word"][row],
+                "age_appropriateness_score": rounded["appropriateness"][row]
+            }
+        else:
+            readability = {"age_appropriateness_score": 0.5}
+
+        rows.append({
+            "overall_quality_score": rounded["overall"][row],
+            "cognitive_load_metrics": {
+                "intrinsic_load": rounded["intrinsic"][row],
+                "extraneous_load": rounded["extraneous"][row],
+                "germane_load": rounded["germane"][row],
+                "total_cognitive_load": rounded["total_load"][row],
+                "appropriate_for_age": columns["total_load"][row] <= f["cognitive_threshold"][row]
+            },
+            "readability_score": readability,
+            "educational_effectiveness": columns["effectiveness"][row],
+            "learning_objective_alignment": f["alignment"][row],
+            "engagement_score": columns["engagement"][row],
+            "structural_quality": columns["structural"][row],
+            "factual_accuracy": columns["accuracy"][row],
+            "blooms_taxonomy_alignment": columns["blooms"][row]
+        })
+    return rows
+
+
+def assess_many(
+    assessor: EducationalQualityAssessor,
+    contents: Sequence[Dict[str, Any]],
+    content_type: Union[str, Sequence[str]],
+    age_group: Union[str, Sequence[str]],
+    learning_objectives: Optional[Sequence[Optional[List[LearningObjective]]]] = None
+) -> List[Dict[str, Any]]:
+    """Quality metrics for each document, in input order (see EducationalQualityAssessor.assess_many)"""
+    count = len(contents)
+    content_types = _per_document(content_type, count, "content_type")
+    age_groups = _per_document(age_group, count, "age_group")
+    objectives = _per_document(learning_objectives, count, "learning_objectives")
+
+    table = _FeatureTable(assessor)
+    scored = []  # Indexes of documents with text; the rest get default metrics, as in the scalar path
+    for i, content in enumerate(contents):
+        text = assessor._extract_text_content(content)
+        if text:
+            table.add(content, text, content_types[i], age_groups[i], objectives[i])
+            scored.append(i)
+
+    results: List[Dict[str, Any]] = [None] * count
+    if scored:
+        f = table.columns
+        assessed_at = str(datetime.now(timezone.utc))
+        for row, dimensions in enumerate(score_rows(table)):
+            i = scored[row]
+            quality_score = dimensions["overall_quality_score"]
+            effectiveness, accuracy = dimensions["educational_effectiveness"], dimensions["factual_accuracy"]
+            structural, engagement = dimensions["structural_quality"], dimensions["engagement_score"]
+            results[i] = {
+                **dimensions,
+                "meets_quality_threshold": quality_score >= assessor.min_quality_threshold,
+                "meets_educational_threshold": effectiveness >= assessor.min_educational_threshold,
+                "meets_factual_threshold": accuracy >= assessor.min_factual_threshold,
+                "quality_improvement_suggestions": assessor._generate_improvement_suggestions(
+                    effectiveness, accuracy, structural, engagement
+                ),
+                "assessment_metadata": {
+                    "content_type": content_types[i],
+                    "age_group": age_groups[i],
+                    "text_length": f["text_length"][row],
+                    "has_learning_objectives": objectives[i] is not None,
+                    "assessment_version": ASSESSMENT_VERSION,
+                    "assessed_at": assessed_at
+                }
+            }
+
+    for i in range(count):
+        if results[i] is None:
+            results[i] = assessor._default_quality_metrics()
+    return results
@@ -11,14 +11,20 @@ through strategic caching of:
 """
 
 import asyncio
+import fnmatch
 import hashlib
 import json
 import logging
 import time
-from typing import Dict, Any, Optional, Union
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Union, Callable, Tuple
 from datetime import datetime, timedelta, timezone
 
 from ..core.config import settings
+from ..core.redis_manager import redis_pool
+from .quality_assessor import ASSESSMENT_VERSION
+from .single_flight_service import SingleFlight
+from .topic_similarity_service import TopicSimilarityIndex
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +36,77 @@ except ImportError:
     REDIS_AVAILABLE = False
 
 
+# Cache key namespaces tracked in per-namespace sorted-set indexes (member=key, score=expiry)
+CACHE_NAMESPACES = ("content", "quality", "prompt")
+CACHE_INDEX_PREFIX = "cache_index"
+
+
+class LocalCache:
+    """In-process LRU cache with per-entry TTL, bounded by entry count and total bytes"""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a live entry and mark it most recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return value
+
+    def set(self, key: str, value: Any, size_bytes: int, ttl_seconds: int):
+        """Store an entry, evicting least recently used entries to stay within bounds"""
+        if size_bytes > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (time.monotonic() + ttl_seconds, value, size_bytes)
+        self.total_bytes += size_bytes
+
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.stats["evictions"] += 1
+
+    def delete_matching(self, pattern: str) -> int:
+        """Remove entries whose key matches a glob pattern"""
+        keys = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def _remove(self, key: str):
+        _, _, size_bytes = self._entries.pop(key)
+        self.total_bytes -= size_bytes
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get entry/byte usage and hit/miss/eviction counters"""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            **self.stats
+        }
+
+
 class CacheService:
     """Redis-based caching service for educational content generation optimization"""
 
@@ -38,6 +115,28 @@ class CacheService:
         self.cache_enabled = False
         self._initialize_redis()
 
+        # L1: in-process cache for generated content (works without Redis)
+        self.local_cache = LocalCache(
+            settings.CACHE_L1_MAX_ENTRIES, settings.CACHE_L1_MAX_BYTES
+        ) if settings.CACHE_L1_ENABLED else None
+        # L2: Redis tier counters
+        self.redis_stats = {"hits": 0, "misses": 0}
+        # Quality assessment lookups (either tier)
+        self.quality_stats = {"hits": 0, "misses": 0}
+
+        # Optional near-duplicate topic tier (offline MinHash/LSH index)
+        self.similarity_index = TopicSimilarityIndex(
+            threshold=settings.CACHE_SIMILARITY_THRESHOLD,
+            max_entries=settings.CACHE_SIMILARITY_MAX_ENTRIES
+        ) if settings.CACHE_SIMILARITY_ENABLED else None
+        self.similarity_stats = {"hits": 0, "misses": 0, "stale": 0}
+
+        # Coalescing of identical concurrent generations
+        self.single_flight = SingleFlight(
+            self.redis_client if self.cache_enabled and settings.SINGLE_FLIGHT_DISTRIBUTED else None,
+            lock_timeout=settings.SINGLE_FLIGHT_LOCK_TIMEOUT
+        )
+
     def _initialize_redis(self):
         """Initialize Redis connection if available and configured"""
         if not REDIS_AVAILABLE:
@@ -49,14 +148,9 @@ class CacheService:
             return
 
         try:
-            self.redis_client = redis.from_url(
-                settings.REDIS_URL,
-                encoding="utf-8",
-                decode_responses=True,
-                socket_timeout=5,
-                socket_connect_timeout=5
-            )
-            self.cache_enabled = True
+            # Shared connection pool (also used by the rate limiter)
+            self.redis_client = redis_pool.get_client(settings.REDIS_URL)
+            self.cache_enabled = self.redis_client is not None
             logger.info("Redis cache service initialized successfully")
 
         except Exception as e:
@@ -79,7 +173,8 @@ class CacheService:
                 return {
                     "status": "healthy",
                     "response_time_ms": await self._measure_redis_latency(),
-                    "memory_usage": await self._get_redis_memory_info()
+                    "memory_usage": await self._get_redis_memory_info(),
+                    "connection_pool": redis_pool.get_pool_stats()
                 }
             else:
                 return {"status": "unhealthy", "reason": "Redis read/write test failed"}
@@ -97,9 +192,11 @@ class CacheService:
         """
         Get cached content for identical generation parameters
         
-        Cache key includes all parameters that affect content generation
+        Cache key includes all parameters that affect content generation.
+        The in-process L1 is checked first, then Redis (L2); L2 hits populate L1.
+        When enabled, a near-duplicate topic is served as a last resort.
         """
-        if not self.cache_enabled:
+        if not self.cache_enabled and self.local_cache is None:
             return None
 
         try:
@@ -107,17 +204,17 @@ class CacheService:
                 content_type, topic, age_group, additional_requirements
             )
 
-            cached_data = await self.redis_client.get(cache_key)
-            if cached_data:
-                content = json.loads(cached_data)
-                
-                # Add cache metadata
-                content["metadata"]["from_cache"] = True
-                content["metadata"]["cache_key"] = cache_key
-                content["metadata"]["cached_at"] = content["metadata"].get("cached_at")
-                
-                logger.info(f"Cache HIT for {content_type}:{topic[:30]}")
-                return content
+            content, tier = await self._get_cached_payload(cache_key)
+            if content is not None:
+                logger.info(f"Cache HIT ({tier.upper()}) for {content_type}:{topic[:30]}")
+                return self._with_cache_metadata(content, cache_key, tier)
+
+            if self.similarity_index is not None:
+                similar = await self._get_similar_content(
+                    content_type, topic, age_group, additional_requirements
+                )
+                if similar is not None:
+                    return similar
 
             logger.debug(f"Cache MISS for {content_type}:{topic[:30]}")
             return None
@@ -138,7 +235,7 @@ class CacheService:
         """
         Cache generated content with intelligent TTL based on content type
         """
-        if not self.cache_enabled:
+        if not self.cache_enabled and self.local_cache is None:
             return
 
         try:
@@ -155,11 +252,19 @@ class CacheService:
             content_quality = content.get("quality_metrics", {}).get("overall_quality_score", 0)
             actual_ttl = self._calculate_cache_ttl(content_type, content_quality, ttl_hours)
 
-            await self.redis_client.set(
-                cache_key,
-                json.dumps(cache_content, default=str),
-                ex=actual_ttl
-            )
+            serialized = json.dumps(cache_content, default=str)
+
+            if self.local_cache is not None:
+                # Store the decoded payload so L1 hits match L2 hits exactly
+                self.local_cache.set(cache_key, json.loads(serialized), len(serialized), actual_ttl)
+
+            if self.cache_enabled:
+                await self._set_indexed(cache_key, serialized, actual_ttl)
+
+            if self.similarity_index is not None:
+                self.similarity_index.add(
+                    self._similarity_partition(content_type, age_group, additional_requirements), topic
+                )
 
             logger.info(f"Cached content: {content_type}:{topic[:30]} (TTL: {actual_ttl/3600:.1f}h)")
 
@@ -170,21 +275,31 @@ class CacheService:
         self,
         content_hash: str,
         content_type: str,
-        age_group: str
+        age_group: str,
+        assessment_version: str = ASSESSMENT_VERSION
     ) -> Optional[Dict[str, Any]]:
-        """Get cached quality assessment results"""
-        if not self.cache_enabled:
+        """
+        Get cached quality assessment results
+
+        Checked in L1 then Redis, like generated content. The key includes the
+        assessor version, so scores cached before a scoring change are never served.
+        """
+        if not self.cache_enabled and self.local_cache is None:
             return None
 
         try:
-            cache_key = f"quality:{content_hash}:{content_type}:{age_group}"
-            cached_quality = await self.redis_client.get(cache_key)
-            
-            if cached_quality:
-                logger.debug("Quality assessment cache HIT")
-                return json.loads(cached_quality)
+            cache_key = self._quality_cache_key(content_hash, content_type, age_group, assessment_version)
+            quality_metrics, tier = await self._get_cached_payload(cache_key)
 
-            return None
+            if quality_metrics is None:
+                self.quality_stats["misses"] += 1
+                return None
+
+            self.quality_stats["hits"] += 1
+            logger.debug(f"Quality assessment cache HIT ({tier.upper()})")
+            # Copy so callers never mutate the cached payload
+            metadata = dict(quality_metrics.get("assessment_metadata", {}), cache_tier=tier)
+            return {**quality_metrics, "assessment_metadata": metadata}
 
         except Exception as e:
             logger.warning(f"Quality cache retrieval failed: {e}")
@@ -196,25 +311,37 @@ class CacheService:
         content_type: str,
         age_group: str,
         quality_metrics: Dict[str, Any],
-        ttl_hours: int = 48
+        ttl_hours: int = 48,
+        assessment_version: str = ASSESSMENT_VERSION
     ):
         """Cache quality assessment results (longer TTL since quality is stable)"""
-        if not self.cache_enabled:
+        if not self.cache_enabled and self.local_cache is None:
             return
 
         try:
-            cache_key = f"quality:{content_hash}:{content_type}:{age_group}"
-            await self.redis_client.set(
-                cache_key,
-                json.dumps(quality_metrics, default=str),
-                ex=ttl_hours * 3600
-            )
+            cache_key = self._quality_cache_key(content_hash, content_type, age_group, assessment_version)
+            serialized = json.dumps(quality_metrics, default=str)
+
+            if self.local_cache is not None:
+                self.local_cache.set(cache_key, json.loads(serialized), len(serialized), ttl_hours * 3600)
+
+            if self.cache_enabled:
+                await self._set_indexed(cache_key, serialized, ttl_hours * 3600)
 
             logger.debug("Quality assessment cached successfully")
 
         except Exception as e:
             logger.warning(f"Quality cache storage failed: {e}")
 
+    def _quality_cache_key(
+        self,
+        content_hash: str,
+        content_type: str,
+        age_group: str,
+        assessment_version: str
+    ) -> str:
+        return f"quality:{content_hash}:{content_type}:{age_group}:v{assessment_version}"
+
     async def get_prompt_compilation_cache(
         self,
         template_hash: str,
@@ -251,10 +378,10 @@ class CacheService:
 
         try:
             cache_key = f"prompt:{template_hash}:{variables_hash}"
-            await self.redis_client.set(
+            await self._set_indexed(
                 cache_key,
                 compiled_prompt,
-                ex=ttl_hours * 3600
+                ttl_hours * 3600
             )
 
             logger.debug("Compiled prompt cached successfully")
@@ -262,6 +389,108 @@ class CacheService:
         except Exception as e:
             logger.warning(f"Prompt cache storage failed: {e}")
 
+    async def _get_cached_payload(self, cache_key: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Look up a content key in L1 then Redis, returning (content, tier)"""
+        if self.local_cache is not None:
+            local_content = self.local_cache.get(cache_key)
+            if local_content is not None:
+                return local_content, "l1"
+
+        if not self.cache_enabled:
+            return None, None
+
+        cached_data = await self.redis_client.get(cache_key)
+        if not cached_data:
+            self.redis_stats["misses"] += 1
+            return None, None
+
+        self.redis_stats["hits"] += 1
+        content = json.loads(cached_data)
+
+        if self.local_cache is not None:
+            ttl = await self.redis_client.ttl(cache_key)
+            self.local_cache.set(
+                cache_key, content, len(cached_data), ttl if ttl and ttl > 0 else settings.CACHE_TTL
+            )
+
+        return content, "l2"
+
+    def _similarity_partition(
+        self,
+        content_type: str,
+        age_group: str,
+        additional_requirements: Optional[str]
+    ) -> str:
+        """Topics are only compared within the same content type, age group and requirements"""
+        requirements = additional_requirements.lower().strip() if additional_requirements else ""
+        return f"{content_type.lower()}:{age_group.lower()}:{requirements}"
+
+    async def _get_similar_content(
+        self,
+        content_type: str,
+        topic: str,
+        age_group: str,
+        additional_requirements: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Serve cached content generated for a near-duplicate topic"""
+        partition = self._similarity_partition(content_type, age_group, additional_requirements)
+        match = self.similarity_index.lookup(partition, topic)
+        if match is None:
+            self.similarity_stats["misses"] += 1
+            return None
+
+        similar_topic, similarity = match
+        similar_key = self._generate_content_cache_key(
+            content_type, similar_topic, age_group, additional_requirements
+        )
+        content, tier = await self._get_cached_payload(similar_key)
+        if content is None:
+            # Cached entry expired or was cleared: stop matching against it
+            self.similarity_index.remove(partition, similar_topic)
+            self.similarity_stats["stale"] += 1
+            self.similarity_stats["misses"] += 1
+            return None
+
+        self.similarity_stats["hits"] += 1
+        logger.info(
+            f"Cache HIT (similar topic {similarity:.2f}) for {content_type}:{topic[:30]} "
+            f"-> {similar_topic[:30]}"
+        )
+        result = self._with_cache_metadata(content, similar_key, "similarity")
+        result["metadata"]["similar_topic"] = similar_topic
+        result["metadata"]["topic_similarity"] = round(similarity, 3)
+        return result
+
+    def _with_cache_metadata(self, content: Dict[str, Any], cache_key: str, tier: str) -> Dict[str, Any]:
+        """
+        Cached content with cache hit metadata
+
+        Only the metadata dict is copied: the cached payload is shared by every hit
+        and must be treated as read-only (a deep copy costs more than the L2 decode).
+        """
+        metadata = dict(content.get("metadata") or {})
+        result = {**content, "metadata": metadata}
+        metadata["from_cache"] = True
+        metadata["cache_key"] = cache_key
+        metadata["cache_tier"] = tier
+        metadata["cached_at"] = metadata.get("cached_at")
+        return result
+
+    def _index_key(self, cache_key: str) -> str:
+        """Sorted-set index tracking the keys of a cache namespace"""
+        return f"{CACHE_INDEX_PREFIX}:{cache_key.split(':', 1)[0]}"
+
+    async def _set_indexed(self, cache_key: str, value: str, ttl_seconds: int):
+        """Store a cache entry and record it (scored by expiry time) in its namespace index"""
+        index_key = self._index_key(cache_key)
+        now = time.time()
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.set(cache_key, value, ex=ttl_seconds)
+        pipe.zadd(index_key, {cache_key: now + ttl_seconds})
+        # Prune members whose keys have already expired so the index stays bounded without stats calls
+        pipe.zremrangebyscore(index_key, "-inf", now)
+        await pipe.execute()
+
     def _generate_content_cache_key(
         self,
         content_type: str,
@@ -336,33 +565,88 @@ class CacheService:
         except Exception as e:
             return {"error": str(e)}
 
-    async def clear_content_cache(self, pattern: str = "content:*") -> int:
-        """Clear cached content by pattern"""
+    async def clear_content_cache(
+        self,
+        pattern: str = "content:*",
+        batch_size: int = 500,
+        progress_callback: Optional[Callable[[int], Any]] = None
+    ) -> int:
+        """
+        Clear cached content by pattern
+
+        Walks the keyspace incrementally with SCAN and removes keys in batches with
+        UNLINK (non-blocking delete), so large caches never stall Redis.
+
+        Args:
+            pattern: Key pattern to clear (e.g. "content:*", "quality:*")
+            batch_size: Keys per SCAN page and UNLINK call
+            progress_callback: Called with the running deleted count after each batch
+
+        Returns:
+            Number of keys deleted
+        """
+        if self.local_cache is not None:
+            self.local_cache.delete_matching(pattern)
+
         if not self.cache_enabled:
             return 0
 
+        deleted_count = 0
         try:
-            keys = await self.redis_client.keys(pattern)
-            if keys:
-                deleted_count = await self.redis_client.delete(*keys)
-                logger.info(f"Cleared {deleted_count} cache entries with pattern: {pattern}")
-                return deleted_count
-            return 0
+            batch = []
+            async for key in self.redis_client.scan_iter(match=pattern, count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    deleted_count += await self._unlink_batch(batch)
+                    batch = []
+                    logger.info(f"Clearing cache {pattern}: {deleted_count} entries removed so far")
+                    if progress_callback:
+                        progress_callback(deleted_count)
+
+            if batch:
+                deleted_count += await self._unlink_batch(batch)
+                if progress_callback:
+                    progress_callback(deleted_count)
+
+            logger.info(f"Cleared {deleted_count} cache entries with pattern: {pattern}")
+            return deleted_count
 
         except Exception as e:
-            logger.warning(f"Cache clearing failed: {e}")
-            return 0
+            logger.warning(f"Cache clearing failed after {deleted_count} entries: {e}")
+            return deleted_count
+
+    async def _unlink_batch(self, keys: list) -> int:
+        """Unlink a batch of keys and drop them from their namespace indexes"""
+        by_index: Dict[str, list] = {}
+        for key in keys:
+            by_index.setdefault(self._index_key(key), []).append(key)
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.unlink(*keys)
+        for index_key, index_members in by_index.items():
+            pipe.zrem(index_key, *index_members)
+        results = await pipe.execute()
+        return results[0]
 
     async def get_cache_stats(self) -> Dict[str, Any]:
         """Get comprehensive cache statistics"""
         if not self.cache_enabled:
-            return {"status": "disabled", "reason": "Redis not configured"}
+            return {
+                "status": "disabled",
+                "reason": "Redis not configured",
+                "tiers": self.get_tier_stats()
+            }
 
         try:
-            # Get key counts by type
-            content_keys = await self.redis_client.keys("content:*")
-            quality_keys = await self.redis_client.keys("quality:*")
-            prompt_keys = await self.redis_client.keys("prompt:*")
+            # Key counts come from the namespace indexes: drop expired members, then count
+            now = time.time()
+            pipe = self.redis_client.pipeline(transaction=False)
+            for namespace in CACHE_NAMESPACES:
+                index_key = f"{CACHE_INDEX_PREFIX}:{namespace}"
+                pipe.zremrangebyscore(index_key, "-inf", now)
+                pipe.zcard(index_key)
+            results = await pipe.execute()
+            content_count, quality_count, prompt_count = results[1::2]
 
             # Get Redis info
             info = await self.redis_client.info()
@@ -370,11 +654,12 @@ class CacheService:
             return {
                 "status": "enabled",
                 "key_counts": {
-                    "content_cache": len(content_keys),
-                    "quality_cache": len(quality_keys), 
-                    "prompt_cache": len(prompt_keys),
+                    "content_cache": content_count,
+                    "quality_cache": quality_count,
+                    "prompt_cache": prompt_count,
                     "total_keys": info.get("db0", {}).get("keys", 0)
                 },
+                "tiers": self.get_tier_stats(),
                 "memory": await self._get_redis_memory_info(),
                 "performance": {
                     "latency_ms": await self._measure_redis_latency(),
@@ -386,6 +671,17 @@ class CacheService:
         except Exception as e:
             return {"status": "error", "error": str(e)}
 
+    def get_tier_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters for the L1 (in-process) and L2 (Redis) tiers"""
+        return {
+            "l1": self.local_cache.get_stats() if self.local_cache is not None else {"status": "disabled"},
+            "l2": dict(self.redis_stats, status="enabled" if self.cache_enabled else "disabled"),
+            "quality_assessment": dict(self.quality_stats),
+            "similarity": dict(
+                self.similarity_stats, **self.similarity_index.get_stats()
+            ) if self.similarity_index is not None else {"status": "disabled"}
+        }
+
     def generate_content_hash(self, content: str) -> str:
         """Generate consistent hash for content caching"""
         return hashlib.sha256(content.encode()).hexdigest()[:16]
@@ -397,7 +693,8 @@ class CacheService:
         return hashlib.md5(normalized.encode()).hexdigest()[:12]
 
     async def close(self):
-        """Close Redis connection"""
+        """Release the Redis client (the shared pool is closed at application shutdown)"""
         if self.redis_client:
-            await self.redis_client.close()
-            logger.info("Redis connection closed")
\ No newline at end of file
+            self.redis_client = None
+            self.cache_enabled = False
+            logger.info("Redis cache client released")
\ No newline at end of file
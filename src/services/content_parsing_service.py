@@ -0,0 +1,190 @@
+"""
+Content Parsing for La Factoria
+Turns raw AI provider output into structured content dictionaries
+"""
+
+import json
+import logging
+import re
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Characters that change brace depth or string state; everything else is skipped in bulk
+_JSON_STRUCTURE = re.compile(r'[{}"\\]')
+_STRING_STRUCTURE = re.compile(r'["\\]')
+
+# Process-wide parse outcomes: "native" (the response was a JSON object), "extracted"
+# (found inside surrounding text) or "failed" (structured fallback used)
+parse_stats: Dict[str, Any] = {"parsed": 0, "native": 0, "extracted": 0, "failed": 0, "failed_by_type": {}}
+
+
+class IncrementalJSONParser:
+    """
+    Single-pass extractor of the first complete JSON object in text
+
+    Text can be fed in chunks as it arrives. Each character is scanned once,
+    tracking brace depth and string/escape state, and a candidate object is
+    decoded only when its braces balance; prose, markdown fences and stray
+    braces around the object are skipped without rescanning.
+    """
+
+    def __init__(self):
+        self.result: Optional[Dict[str, Any]] = None
+        self._text = ""
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> Optional[Dict[str, Any]]:
+        """Add text; returns the first complete JSON object once one has been seen"""
+        if self.result is not None:
+            return self.result
+        self._text += chunk
+        text, pos = self._text, self._pos
+
+        if self._escape and pos < len(text):
+            pos += 1
+            self._escape = False
+
+        while True:
+            pattern = _STRING_STRUCTURE if self._in_string else _JSON_STRUCTURE
+            match = pattern.search(text, pos)
+            if match is None:
+                break
+            char, pos = match.group(), match.end()
+
+            if self._in_string:
+                if char == '"':
+                    self._in_string = False
+                elif pos < len(text):
+                    pos += 1  # Skip the escaped character
+                else:
+                    self._escape = True
+            elif self._depth == 0:
+                if char == '{':
+                    self._start, self._depth = match.start(), 1
+            elif char == '"':
+                self._in_string = True
+            elif char == '{':
+                self._depth += 1
+            elif char == '}':
+                self._depth -= 1
+                if self._depth == 0 and self._decode(text[self._start:pos]):
+                    break
+
+        self._pos = pos
+        return self.result
+
+    def _decode(self, candidate: str) -> bool:
+        try:
+            value = json.loads(candidate)
+        except json.JSONDecodeError:
+            return False  # Balanced braces in prose; keep scanning after them
+        if isinstance(value, dict):
+            self.result = value
+            # Release the buffer; later chunks are ignored
+            self._text = ""
+            return True
+        return False
+
+
+def parse_generated_content(raw_content: str, content_type: str) -> Dict[str, Any]:
+    """
+    Parse AI-generated content based on expected structure
+
+    Providers return JSON natively for known content types (see
+    structured_output_service); otherwise the JSON object is extracted from
+    the surrounding text in a single pass, with a structured text fallback.
+    """
+    parse_stats["parsed"] += 1
+    stripped = raw_content.strip()
+
+    # Native JSON output decodes directly
+    if stripped.startswith('{'):
+        try:
+            parsed = json.loads(stripped)
+            if isinstance(parsed, dict):
+                parse_stats["native"] += 1
+                return parsed
+        except json.JSONDecodeError:
+            pass
+
+    parsed = IncrementalJSONParser().feed(raw_content)
+    if parsed is not None:
+        parse_stats["extracted"] += 1
+        return parsed
+
+    parse_stats["failed"] += 1
+    parse_stats["failed_by_type"][content_type] = parse_stats["failed_by_type"].get(content_type, 0) + 1
+    logger.warning(f"Could not parse JSON for {content_type}, creating structured fallback")
+    return create_structured_fallback(raw_content, content_type)
+
+
+def get_parse_stats() -> Dict[str, Any]:
+    """Parse outcome counts and the fraction of responses that needed the text fallback"""
+    parsed = parse_stats["parsed"]
+    return {
+        **parse_stats,
+        "failed_by_type": dict(parse_stats["failed_by_type"]),
+        "failure_rate": round(parse_stats["failed"] / parsed, 4) if parsed else 0.0
+    }
+
+
+def create_structured_fallback(raw_content: str, content_type: str) -> Dict[str, Any]:
+    """Create structured content when JSON parsing fails"""
+
+    # Basic structure based on content type
+    base_structure = {
+        "title": f"Generated {content_type.replace('_', ' ').title()}",
+        "content": raw_content,
+        "raw_output": True,
+        "parsing_note": "Content was generated as text and structured automatically"
+    }
+
+    # Content type specific enhancements
+    if content_type == "flashcards":
+        # Try to extract Q&A pairs
+        lines = raw_content.split('\n')
+        cards = []
+        current_card = {}
+
+        for line in lines:
+            line = line.strip()
+            if line.startswith('Q:') or line.startswith('Question:'):
+                if current_card:
+                    cards.append(current_card)
+                current_card = {"question": line.replace('Q:', '').replace('Question:', '').strip()}
+            elif line.startswith('A:') or line.startswith('Answer:'):
+                if current_card:
+                    current_card["answer"] = line.replace('A:', '').replace('Answer:', '').strip()
+
+        if current_card:
+            cards.append(current_card)
+
+        if cards:
+            base_structure["flashcards"] = cards
+
+    elif content_type == "faq_collection":
+        # Try to extract FAQ pairs
+        faq_pattern = r'(?:Q|Question):\s*(.*?)\n(?:A|Answer):\s*(.*?)(?=\n(?:Q|Question):|$)'
+        faqs = re.findall(faq_pattern, raw_content, re.DOTALL | re.IGNORECASE)
+
+        if faqs:
+            base_structure["faqs"] = [
+                {"question": q.strip(), "answer": a.strip()}
+                for q, a in faqs
+            ]
+
+    elif content_type in ["study_guide", "detailed_reading_material"]:
+        # Try to extract sections
+        sections = raw_content.split('\n\n')
+        if len(sections) > 1:
+            base_structure["sections"] = [
+                {"title": f"Section {i+1}", "content": section.strip()}
+                for i, section in enumerate(sections) if section.strip()
+            ]
+
+    return base_structure
@@ -0,0 +1,67 @@
+"""
+Event Loop Monitor for La Factoria
+Measures event-loop lag: how late a periodic timer fires shows how long
+synchronous work (such as CPU-bound assessment) blocked every other request
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopLagMonitor:
+    """
+    Background task that sleeps for interval seconds and records how late it wakes up
+
+    Lag is kept for the last window samples; p99 and max lag are the figures
+    to watch under concurrent load.
+    """
+
+    def __init__(self, interval: float = 0.1, window: int = 1000):
+        self.interval = interval
+        self._lags: deque = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+        self.max_lag = 0.0
+
+    def start(self):
+        """Start sampling on the running loop (no-op if already running)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop sampling"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def reset(self):
+        """Clear recorded samples"""
+        self._lags.clear()
+        self.max_lag = 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lag statistics in milliseconds over the sample window"""
+        lags = sorted(self._lags)
+        return {
+            "running": self._task is not None,
+            "samples": len(lags),
+            "avg_lag_ms": round(sum(lags) / len(lags) * 1000, 2) if lags else 0.0,
+            "p99_lag_ms": round(lags[int(0.99 * (len(lags) - 1))] * 1000, 2) if lags else 0.0,
+            "max_lag_ms": round(self.max_lag * 1000, 2)
+        }
@@ -0,0 +1,382 @@
+"""
+Incremental Quality Assessor for La Factoria
+Keep running text aggregates (word, sentence and syllable counts, keyword
+presence, heading/list/paragraph flags) for content that grows in chunks or is
+edited one section at a time, and score readability, cognitive load,
+engagement and structure from them without re-reading the whole document
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Set, Tuple
+
+from .batch_quality_assessor import _FeatureTable, score_rows
+from .quality_assessor import (
+    ASSESSMENT_KEYWORDS,
+    ENGAGEMENT_PATTERNS,
+    HEADING_PATTERN,
+    LIST_PATTERNS,
+    NUMBER_PATTERN,
+    EducationalQualityAssessor,
+)
+from .text_analysis_service import count_syllables
+
+logger = logging.getLogger(__name__)
+
+# Characters of neighbouring text re-read around an edit boundary. Longer than
+# any keyword or pattern match, so a match spanning the boundary falls inside
+# one window (list items indented by more than this are the exception)
+WINDOW = 64
+SCAN_BATCH = 4 * WINDOW  # Settled text re-scanned on each append until this much has accumulated
+
+_STRUCTURE_PATTERNS = (("heading", HEADING_PATTERN),) + tuple(("list", pattern) for pattern in LIST_PATTERNS)
+_MATH_OPERATORS = "+-*/"
+
+
+def _search(pattern, text: str, start: int, end_is_real: bool) -> bool:
+    """
+    Whether pattern matches text at or after start
+
+    Unless the window ends where the document or section does, a match
+    touching its last character is ignored: the next character could undo a
+    trailing \\b.
+    """
+    match = pattern.search(text, start)
+    while match is not None and not end_is_real and match.end() == len(text):
+        match = pattern.search(text, match.start() + 1)
+    return match is not None
+
+
+def _matches(text: str, start: int, end_is_real: bool) -> Set[Hashable]:
+    """
+    Keywords and pattern markers found in a window of document text
+
+    Characters before start are context only: \\b and ^ look at them, but no
+    match may begin there. Keywords are plain strings; engagement, structure
+    and math markers are tuples.
+    """
+    lower = text.lower()
+    found: Set[Hashable] = set(ASSESSMENT_KEYWORDS.find(lower))
+    found.update(
+        ("engagement", name) for name, pattern in ENGAGEMENT_PATTERNS.items()
+        if _search(pattern, lower, start, end_is_real)
+    )
+    found.update(
+        ("structure", name) for name, pattern in _STRUCTURE_PATTERNS
+        if _search(pattern, text, start, end_is_real)
+    )
+    if NUMBER_PATTERN.search(text):
+        found.add(("math", "number"))
+    found.update(("math", char) for char in "=" + _MATH_OPERATORS if char in text)
+    return found
+
+
+@dataclass
+class _Stats:
+    """
+    Counts over a span of text that add up across spans split at whitespace
+
+    Sentences (text between dots) can run across spans, so the span's first
+    and last pieces are kept open and joined when spans are concatenated.
+    """
+    words: int = 0
+    word_length: int = 0
+    complex_words: int = 0
+    syllables: int = 0
+    sentence_words: int = 0
+    paragraph_breaks: int = 0
+    dots: int = 0
+    first_piece: bool = False  # Non-blank text before the first dot (the whole span when there is none)
+    last_piece: bool = False  # Non-blank text after the last dot
+    inner_sentences: int = 0  # Non-blank pieces between dots
+
+    @classmethod
+    def of(cls, text: str, syllable_cache: Dict[str, int]) -> "_Stats":
+        words = text.split()
+        syllables = 0
+        for word in words:
+            count = syllable_cache.get(word)
+            if count is None:
+                count = syllable_cache[word] = count_syllables(word)
+            syllables += count
+        pieces = text.split('.')
+        return cls(
+            words=len(words),
+            word_length=sum(map(len, words)),
+            complex_words=sum(1 for word in words if len(word) > 6),
+            syllables=syllables,
+            sentence_words=len(text.replace('.', ' ').split()),
+            paragraph_breaks=text.count('\n\n'),
+            dots=len(pieces) - 1,
+            first_piece=bool(pieces[0].strip()),
+            last_piece=bool(pieces[-1].strip()),
+            inner_sentences=sum(1 for piece in pieces[1:-1] if piece.strip())
+        )
+
+    @property
+    def sentences(self) -> int:
+        """Non-blank dot-separated pieces, as TextAnalysis.sentences counts them"""
+        if not self.dots:
+            return int(self.first_piece)
+        return self.first_piece + self.inner_sentences + self.last_piece
+
+    def then(self, other: "_Stats") -> "_Stats":
+        """Counts of this span followed by other (joined at whitespace)"""
+        joined = self.last_piece or other.first_piece
+        if not self.dots:
+            first, inner = joined, other.inner_sentences
+        elif not other.dots:
+            first, inner = self.first_piece, self.inner_sentences
+        else:
+            first, inner = self.first_piece, self.inner_sentences + joined + other.inner_sentences
+        return _Stats(
+            words=self.words + other.words,
+            word_length=self.word_length + other.word_length,
+            complex_words=self.complex_words + other.complex_words,
+            syllables=self.syllables + other.syllables,
+            sentence_words=self.sentence_words + other.sentence_words,
+            paragraph_breaks=self.paragraph_breaks + other.paragraph_breaks,
+            dots=self.dots + other.dots,
+            first_piece=first,
+            last_piece=joined if not other.dots else other.last_piece,
+            inner_sentences=inner
+        )
+
+
+class _Section:
+    """
+    One text part of the document
+
+    Text up to the last space is settled and counted once. Keyword and
+    pattern scans run over the text not yet scanned (settled text in batches
+    of SCAN_BATCH characters, plus the open tail after the last space), with
+    WINDOW characters of scanned text before it as context; only the open
+    part is re-scanned on the next append.
+    """
+
+    def __init__(self, first: bool):
+        self.context = '' if first else ' '  # Joining space before the section; nothing at the document start
+        self.pieces: List[str] = []
+        self.settled_length = 0
+        self.head = ''  # First WINDOW characters of the section
+        self.end = ''  # Last WINDOW characters of the settled text
+        self.stats = _Stats()
+        self.tail = ''
+        self.tail_stats = _Stats()
+        self.scanned_length = 0
+        self.scanned_end = ''  # Last WINDOW characters of the scanned text
+        self.unscanned = ''  # Settled text after the scanned text
+        self.found: Set[Hashable] = set()  # Matches in the scanned text
+        self.open_found: Set[Hashable] = set()  # Matches reaching into the unscanned text and tail
+        self.join_found: Set[Hashable] = set()  # Matches spanning the join with the previous section
+
+    @property
+    def size(self) -> int:
+        return self.settled_length + len(self.tail)
+
+    @property
+    def text(self) -> str:
+        return ''.join(self.pieces) + self.tail
+
+    def last(self, count: int) -> str:
+        """Last count characters of the section (fewer if it is shorter)"""
+        if count <= 0:
+            return ''
+        return (self.end + self.tail)[-count:]
+
+    def _scan(self, text: str) -> Set[Hashable]:
+        """Matches in text following the scanned text"""
+        context = (self.context + self.scanned_end)[-WINDOW:]
+        start = 0 if not self.context and self.scanned_length <= WINDOW else 1
+        return _matches(context + text, start, True)
+
+    def extend(self, chunk: str, syllable_cache: Dict[str, int]) -> int:
+        """Append chunk; returns the number of characters scanned"""
+        if len(self.head) < WINDOW:
+            self.head = (self.head + chunk)[:WINDOW]
+        text = self.tail + chunk
+        cut = text.rfind(' ') + 1
+        scanned = 0
+        if cut:
+            piece = text[:cut]
+            self.stats = self.stats.then(_Stats.of(piece, syllable_cache))
+            self.pieces.append(piece)
+            self.settled_length += len(piece)
+            self.end = (self.end + piece)[-WINDOW:]
+            self.unscanned += piece
+            text = text[cut:]
+
+        if len(self.unscanned) >= SCAN_BATCH:
+            # Settled text ends in a space, so no match can reach past it
+            self.found |= self._scan(self.unscanned)
+            scanned += WINDOW + len(self.unscanned)
+            self.scanned_length += len(self.unscanned)
+            self.scanned_end = (self.scanned_end + self.unscanned)[-WINDOW:]
+            self.unscanned = ''
+
+        self.tail = text
+        self.tail_stats = _Stats.of(text, syllable_cache)
+        open_text = self.unscanned + text
+        self.open_found = self._scan(open_text) if open_text else set()
+        return scanned + WINDOW + len(open_text)
+
+    def summary(self) -> _Stats:
+        return self.stats.then(self.tail_stats)
+
+
+class IncrementalQualityAssessor:
+    """
+    Quality scores of content that changes a little at a time
+
+    The document is a list of text sections joined with spaces, as
+    EducationalQualityAssessor reads structured content. append() adds a
+    streamed chunk to the last section (or starts a new one) and
+    replace_section() swaps one section's text; both re-read only the changed
+    text and WINDOW characters around it. scores() reports cognitive load,
+    readability, engagement and structural quality equal to
+    assess_content_quality on the full text, from the running aggregates plus
+    a pass over the section summaries.
+    """
+
+    def __init__(self, content_type: str, age_group: str = "general", sections: Optional[Sequence[str]] = None):
+        self.content_type = content_type
+        self.age_group = age_group
+        self._sections: List[_Section] = []
+        self._syllables: Dict[str, int] = {}
+        self.stats = {"appends": 0, "replacements": 0, "scanned_characters": 0, "scores": 0}
+        for text in sections or ():
+            self.append(text, new_section=True)
+
+    @classmethod
+    def from_content(
+        cls,
+        content: Dict[str, Any],
+        content_type: str,
+        age_group: str = "general",
+        assessor: Optional[EducationalQualityAssessor] = None
+    ) -> "IncrementalQualityAssessor":
+        """Start from structured content: one section per text field, in the assessor's reading order"""
+        assessor = assessor or EducationalQualityAssessor()
+        return cls(content_type, age_group, assessor._extract_text_parts(content))
+
+    @property
+    def section_count(self) -> int:
+        return len(self._sections)
+
+    @property
+    def text(self) -> str:
+        """Full document text (built on demand; reads the whole document)"""
+        return ' '.join(section.text for section in self._sections)
+
+    def section_text(self, index: int) -> str:
+        return self._sections[index].text
+
+    def append(self, text: str, new_section: bool = False):
+        """Append a chunk to the last section, or start a new section with it"""
+        self.stats["appends"] += 1
+        if new_section or not self._sections:
+            self._sections.append(_Section(first=not self._sections))
+            index = len(self._sections) - 1
+            self._extend(index, text)
+            self._rescan_joins(index)
+            return
+
+        index = len(self._sections) - 1
+        joined_head = self._sections[index].size <= WINDOW
+        self._extend(index, text)
+        if joined_head:  # The join window still reaches the end of this section
+            self._rescan_joins(index)
+
+    def replace_section(self, index: int, text: str):
+        """Replace one section's text"""
+        index = range(len(self._sections))[index]
+        self.stats["replacements"] += 1
+        self._sections[index] = _Section(first=index == 0)
+        self._extend(index, text)
+        self._rescan_joins(index)
+
+    def _extend(self, index: int, text: str):
+        if text:
+            self.stats["scanned_characters"] += self._sections[index].extend(text, self._syllables)
+
+    def _text_before(self, index: int) -> Tuple[str, bool]:
+        """Up to WINDOW characters before section index's joining space, and whether they reach the document start"""
+        parts, size = [], 0
+        for j in range(index - 1, -1, -1):
+            part = self._sections[j].last(WINDOW - size)
+            parts.append(part)
+            size += len(part)
+            if size >= WINDOW:
+                return ''.join(reversed(parts)), False
+            if j:
+                parts.append(' ')
+                size += 1
+        return ''.join(reversed(parts)), True
+
+    def _rescan_joins(self, index: int):
+        """Re-scan the joins whose windows include section index"""
+        sections = self._sections
+        distance = 0  # Characters between the end of section index and the joining space being scanned
+        for j in range(index, len(sections)):
+            if j > index + 1:
+                distance += sections[j - 1].size + 1
+                if distance >= WINDOW:
+                    break
+            if j == 0:
+                continue
+            before, at_start = self._text_before(j)
+            section = sections[j]
+            window = before + ' ' + section.head
+            section.join_found = _matches(window, 0 if at_start else 1, section.size <= WINDOW)
+            self.stats["scanned_characters"] += len(window)
+
+    def scores(self) -> Dict[str, Any]:
+        """Cognitive load, readability, engagement and structural quality of the current text"""
+        self.stats["scores"] += 1
+        sections = self._sections
+        text_length = sum(section.size for section in sections) + max(0, len(sections) - 1)
+        if not text_length:
+            return {"cognitive_load_metrics": {}, "readability_score": {}, "engagement_score": 0.5, "structural_quality": 0.5}
+
+        totals = _Stats()
+        found: Set[Hashable] = set()
+        for section in sections:
+            totals = totals.then(section.summary())
+            found |= section.found | section.open_found | section.join_found
+
+        table = _FeatureTable(assessor=None)
+        table.add_row(
+            self.content_type,
+            self.age_group,
+            {marker for marker in found if isinstance(marker, str)},
+            text_length=text_length,
+            word_count=totals.words,
+            word_length=totals.word_length,
+            complex_words=totals.complex_words,
+            sentence_count=totals.sentences,
+            sentence_words=totals.sentence_words,
+            paragraph_breaks=totals.paragraph_breaks,
+            syllables=totals.syllables,
+            content_points=0.0,
+            alignment=0.0,
+            engagement_hits=sum(1 for name in ENGAGEMENT_PATTERNS if ("engagement", name) in found),
+            heading=("structure", "heading") in found,
+            has_list=("structure", "list") in found,
+            math=("math", "number") in found and ("math", "=") in found
+            and any(("math", op) in found for op in _MATH_OPERATORS)
+        )
+        dimensions = score_rows(table)[0]
+        return {
+            "cognitive_load_metrics": dimensions["cognitive_load_metrics"],
+            "readability_score": dimensions["readability_score"],
+            "engagement_score": dimensions["engagement_score"],
+            "structural_quality": dimensions["structural_quality"]
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get document size and how much text the updates have re-read"""
+        return {
+            "sections": len(self._sections),
+            "text_length": sum(section.size for section in self._sections) + max(0, len(self._sections) - 1),
+            **self.stats
+        }
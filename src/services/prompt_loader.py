@@ -9,25 +9,95 @@ import logging
 import json
 from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
+from collections import OrderedDict
 import asyncio
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
+import time
+from concurrent.futures import ThreadPoolExecutor
+from jinja2 import Environment, FileSystemLoader, Template, TemplateNotFound
 import re
 from datetime import datetime
 
 from ..core.config import settings
 from ..models.educational import LaFactoriaContentType
+from .token_counting_service import token_counter
+
+# Optional filesystem watching (falls back to mtime polling)
+try:
+    from watchfiles import awatch
+    WATCHFILES_AVAILABLE = True
+except ImportError:
+    WATCHFILES_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# First line that renders request data (a Jinja variable or block) starts the dynamic segment
+DYNAMIC_LINE_PATTERN = re.compile(r"^.*(\{\$|\{%)", re.MULTILINE)
+
+# Request-specific tail appended to every prompt's dynamic segment
+REQUEST_CONTEXT_TEMPLATE = """Request Details:
+---
+Topic: {$ topic $}
+Target Audience: {$ age_group $}
+{% if learning_objectives %}
+Learning Objectives:
+{% for objective in learning_objectives %}
+- {$ objective.specific_skill $} ({$ objective.cognitive_level $}): {$ objective.measurable_outcome $}
+{% endfor %}
+{% endif %}
+{% if additional_requirements %}
+Additional Requirements: {$ additional_requirements $}
+{% endif %}
+---"""
+
+
+class SegmentedPrompt(str):
+    """
+    Compiled prompt that remembers its static prefix and dynamic tail
+
+    Behaves as the full prompt text everywhere a string is expected; providers
+    that support prompt caching send the static segment as a cacheable prefix.
+    """
+
+    def __new__(cls, static: str, dynamic: str):
+        prompt = super().__new__(cls, "\n\n".join(part for part in (static, dynamic) if part))
+        prompt.static = static
+        prompt.dynamic = dynamic
+        return prompt
+
+
+def split_template(template_content: str) -> Tuple[str, str]:
+    """Split a template into its static instruction block and the remainder that renders request data"""
+    match = DYNAMIC_LINE_PATTERN.search(template_content)
+    if match is None:
+        return template_content, ""
+    return template_content[:match.start()], template_content[match.start():]
+
 class PromptTemplateLoader:
     """Load and manage La Factoria prompt templates"""
 
-    def __init__(self, prompts_directory: str = "prompts"):
+    def __init__(self, prompts_directory: str = "prompts", compiled_cache_size: Optional[int] = None):
         self.prompts_directory = Path(prompts_directory)
         self.template_cache: Dict[str, str] = {}
         self.jinja_env: Optional[Environment] = None
         self.version_cache: Dict[str, List[str]] = {}  # Cache available versions
 
+        # Compiled Jinja templates keyed by (content_type, version) -> (mtime_ns, Template)
+        self.compiled_template_cache: Dict[Tuple[str, str], Tuple[int, Template]] = {}
+        # Bounded LRU of compiled ad-hoc templates keyed by template source
+        self.compiled_source_cache: "OrderedDict[str, Template]" = OrderedDict()
+        # Bounded LRU of (static, dynamic) segment sources keyed by template source, so each
+        # request reuses the same source strings (and their cached hashes) instead of re-splitting
+        self.segment_source_cache: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self.compiled_cache_size = compiled_cache_size or settings.PROMPT_COMPILED_CACHE_SIZE
+        self.compile_stats = {"hits": 0, "misses": 0, "evictions": 0}
+        # Per-template load/compile timings from precompile_all, keyed "content_type:version"
+        self.template_timings: Dict[str, Dict[str, float]] = {}
+
+        # Hot reload: last seen mtime per prompt file and the background watcher task
+        self.file_mtimes: Dict[str, int] = {}
+        self._watch_task: Optional[asyncio.Task] = None
+        self._reload_lock = asyncio.Lock()
+
         # Content type to file mapping
         self.template_files = {
             LaFactoriaContentType.MASTER_CONTENT_OUTLINE: "master_content_outline.md",
@@ -55,6 +125,7 @@ class PromptTemplateLoader:
 
             # Validate that all required templates exist
             await self._validate_templates()
+            self.file_mtimes = self._scan_prompt_files()
 
             logger.info(f"Prompt loader initialized with {len(self.template_files)} templates")
 
@@ -145,8 +216,8 @@ class PromptTemplateLoader:
             raise RuntimeError("Prompt loader not initialized. Call initialize() first.")
 
         try:
-            # Create template from string
-            template = self.jinja_env.from_string(template_content)
+            # Reuse the compiled template for identical source (compiled once)
+            template = self._get_compiled_source(template_content)
 
             # Render with variables
             compiled_content = template.render(**variables)
@@ -159,6 +230,190 @@ class PromptTemplateLoader:
             logger.debug(f"Variables provided: {variables}")
             raise ValueError(f"Template compilation failed: {e}")
 
+    def compile_segments(self, template_content: str, variables: Dict[str, Any]) -> SegmentedPrompt:
+        """
+        Compile a template into a static segment and a dynamic segment
+
+        The static segment is the template up to its first variable or block tag
+        and is identical for every request of the content type, so providers can
+        cache it. The dynamic segment holds the rest of the template plus the
+        request details (topic, age group, objectives, requirements).
+        """
+        static_source, dynamic_source = self._get_segment_sources(template_content)
+        static = self.compile_template(static_source, variables) if static_source.strip() else ""
+        dynamic = self.compile_template(dynamic_source, variables)
+        return SegmentedPrompt(static, dynamic)
+
+    def _get_segment_sources(self, template_content: str) -> Tuple[str, str]:
+        """Static and dynamic (with request context) sources of a template, split once per template"""
+        sources = self.segment_source_cache.get(template_content)
+        if sources is not None:
+            self.segment_source_cache.move_to_end(template_content)
+            return sources
+
+        static_source, dynamic_source = split_template(template_content)
+        sources = (static_source, f"{dynamic_source}\n{REQUEST_CONTEXT_TEMPLATE}")
+        self.segment_source_cache[template_content] = sources
+        while len(self.segment_source_cache) > self.compiled_cache_size:
+            self.segment_source_cache.popitem(last=False)
+        return sources
+
+    def _get_compiled_source(self, template_content: str) -> Template:
+        """Return compiled template for raw source, using the bounded LRU cache"""
+        # str hashes are cached on the object, so repeated lookups of the same
+        # cached template string (including cached segment sources) are O(1) after the first
+        template = self.compiled_source_cache.get(template_content)
+        if template is not None:
+            self.compiled_source_cache.move_to_end(template_content)
+            self.compile_stats["hits"] += 1
+            return template
+
+        template = self.jinja_env.from_string(template_content)
+        self.compile_stats["misses"] += 1
+        self.compiled_source_cache[template_content] = template
+
+        while len(self.compiled_source_cache) > self.compiled_cache_size:
+            self.compiled_source_cache.popitem(last=False)
+            self.compile_stats["evictions"] += 1
+
+        return template
+
+    async def get_compiled_template(self, content_type: str, version: str = "original") -> Template:
+        """
+        Get compiled Jinja2 template for a content type and prompt version
+
+        Compiled templates are cached per (content_type, version) and recompiled
+        only when the template file's modification time changes.
+
+        Args:
+            content_type: One of the 8 supported La Factoria content types
+            version: Prompt version as accepted by load_prompt_version
+
+        Returns:
+            Compiled jinja2 Template ready for rendering
+        """
+        if not self.jinja_env:
+            raise RuntimeError("Prompt loader not initialized. Call initialize() first.")
+
+        content_type_enum = self._to_content_type(content_type)
+        template_path = self._resolve_version_path(content_type_enum, version)
+        if not template_path.exists():
+            raise FileNotFoundError(f"Template version not found: {template_path}")
+
+        cache_key = (content_type_enum.value, version)
+        mtime_ns = template_path.stat().st_mtime_ns
+
+        cached = self.compiled_template_cache.get(cache_key)
+        if cached is not None and cached[0] == mtime_ns:
+            self.compile_stats["hits"] += 1
+            return cached[1]
+
+        with open(template_path, 'r', encoding='utf-8') as f:
+            template_content = f.read()
+
+        template = self.jinja_env.from_string(template_content)
+        self.compiled_template_cache[cache_key] = (mtime_ns, template)
+        self.compile_stats["misses"] += 1
+
+        logger.debug(f"Compiled template {cache_key[0]} ({version}) from {template_path.name}")
+        return template
+
+    async def render_template(
+        self,
+        content_type: str,
+        variables: Dict[str, Any],
+        version: str = "original"
+    ) -> str:
+        """Render a content type's prompt using the compiled template cache"""
+        template = await self.get_compiled_template(content_type, version)
+
+        try:
+            return template.render(**variables).strip()
+        except Exception as e:
+            logger.error(f"Template rendering failed: {e}")
+            raise ValueError(f"Template compilation failed: {e}")
+
+    async def precompile_all(
+        self,
+        include_variants: bool = True,
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Preload and precompile every template so first requests skip disk I/O and parsing
+
+        Args:
+            include_variants: Also precompile _v2/_enhanced variants found in the prompts directory
+            max_workers: Run loading and compilation in a thread pool of this size (None/0 = inline)
+
+        Returns:
+            Per-template timings keyed "content_type:version" with load_ms and compile_ms
+        """
+        if not self.jinja_env:
+            raise RuntimeError("Prompt loader not initialized. Call initialize() first.")
+
+        jobs = []
+        for content_type_enum in self.template_files.keys():
+            versions = self.get_template_variants(content_type_enum) if include_variants else ["original"]
+            for version in versions:
+                jobs.append((content_type_enum, version))
+
+        start_time = time.perf_counter()
+        if max_workers:
+            loop = asyncio.get_running_loop()
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prompt-precompile") as executor:
+                results = await asyncio.gather(*[
+                    loop.run_in_executor(executor, self._precompile_template, content_type_enum, version)
+                    for content_type_enum, version in jobs
+                ])
+        else:
+            results = [self._precompile_template(content_type_enum, version) for content_type_enum, version in jobs]
+
+        timings = {}
+        for content_type_enum, version, mtime_ns, template_content, template, load_ms, compile_ms in results:
+            cache_key = content_type_enum.value
+            self.compiled_template_cache[(cache_key, version)] = (mtime_ns, template)
+            if version == "original":
+                # Prime the paths used by load_template + compile_template
+                self.template_cache[cache_key] = template_content
+                self.compiled_source_cache[template_content] = template
+            timings[f"{cache_key}:{version}"] = {
+                "load_ms": round(load_ms, 3),
+                "compile_ms": round(compile_ms, 3)
+            }
+
+        self.template_timings.update(timings)
+        logger.info(
+            f"Precompiled {len(results)} prompt templates in "
+            f"{(time.perf_counter() - start_time) * 1000:.1f}ms"
+        )
+        return timings
+
+    def _precompile_template(self, content_type_enum: LaFactoriaContentType, version: str) -> Tuple:
+        """Load and compile a single template version (safe to run in a worker thread)"""
+        template_path = self._resolve_version_path(content_type_enum, version)
+
+        load_start = time.perf_counter()
+        mtime_ns = template_path.stat().st_mtime_ns
+        with open(template_path, 'r', encoding='utf-8') as f:
+            template_content = f.read()
+        load_ms = (time.perf_counter() - load_start) * 1000
+
+        compile_start = time.perf_counter()
+        template = self.jinja_env.from_string(template_content)
+        compile_ms = (time.perf_counter() - compile_start) * 1000
+
+        return content_type_enum, version, mtime_ns, template_content, template, load_ms, compile_ms
+
+    def get_template_variants(self, content_type) -> List[str]:
+        """Get the template versions available on disk ("original" plus suffixes like v2, enhanced)"""
+        content_type_enum = self._to_content_type(content_type)
+        base_name = self.template_files[content_type_enum].replace('.md', '')
+
+        variants = ["original"]
+        for file_path in sorted(self.prompts_directory.glob(f"{base_name}_*.md")):
+            variants.append(file_path.stem[len(base_name) + 1:])
+        return variants
+
     async def get_template_metadata(self, content_type: str) -> Dict[str, Any]:
         """
         Get metadata about a template (variables, description, etc.)
@@ -173,7 +428,7 @@ class PromptTemplateLoader:
             "content_type": content_type,
             "length": len(template_content),
             "variables_detected": self._extract_template_variables(template_content),
-            "estimated_tokens": len(template_content.split()) * 1.3  # Rough estimate
+            "estimated_tokens": token_counter.count(self._get_segment_sources(template_content)[0]),  # Static prefix, cached per template
         }
 
         return metadata
@@ -196,21 +451,180 @@ class PromptTemplateLoader:
         # Remove from cache
         if cache_key in self.template_cache:
             del self.template_cache[cache_key]
+        for compiled_key in [k for k in self.compiled_template_cache if k[0] == cache_key]:
+            del self.compiled_template_cache[compiled_key]
 
         # Reload template
         await self.load_template(content_type)
         logger.info(f"Template reloaded: {cache_key}")
 
     async def reload_all_templates(self):
-        """Reload all templates from disk (clear all cache)"""
-        self.template_cache.clear()
+        """
+        Reload all templates from disk (clear all cache)
 
-        # Preload all templates
-        for content_type in self.template_files.keys():
-            await self.load_template(content_type)
+        Every template is reread and recompiled off the event loop into new caches,
+        which then replace the old ones in one step: requests never see empty
+        caches, and a missing template file leaves the current caches in place.
+        """
+        if not self.jinja_env:
+            raise RuntimeError("Prompt loader not initialized. Call initialize() first.")
+
+        async with self._reload_lock:
+            current = await asyncio.to_thread(self._scan_prompt_files)
+            results = await asyncio.gather(*[
+                asyncio.to_thread(self._precompile_template, content_type_enum, "original")
+                for content_type_enum in self.template_files.keys()
+            ])
+
+            template_cache = {}
+            compiled_template_cache = {}
+            compiled_source_cache = OrderedDict()
+            for content_type_enum, version, mtime_ns, template_content, template, _, _ in results:
+                cache_key = content_type_enum.value
+                template_cache[cache_key] = template_content
+                compiled_template_cache[(cache_key, version)] = (mtime_ns, template)
+                compiled_source_cache[template_content] = template
+
+            # Swap: no awaits from here on, so readers never see a half-updated cache
+            self.template_cache = template_cache
+            self.compiled_template_cache = compiled_template_cache
+            self.compiled_source_cache = compiled_source_cache
+            self.segment_source_cache = OrderedDict()
+            self.version_cache = {}
+            self.file_mtimes = current
 
         logger.info("All templates reloaded")
 
+    def _scan_prompt_files(self) -> Dict[str, int]:
+        """Snapshot modification times of all prompt files"""
+        mtimes = {}
+        for file_path in self.prompts_directory.glob("*.md"):
+            try:
+                mtimes[file_path.name] = file_path.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+        return mtimes
+
+    def _content_type_for_file(self, filename: str) -> Optional[Tuple[LaFactoriaContentType, str]]:
+        """Map a prompt filename to its content type and version ("original", "v2", "enhanced")"""
+        stem = Path(filename).stem
+        best_match = None
+        for content_type_enum, base_filename in self.template_files.items():
+            base_name = base_filename.replace('.md', '')
+            if stem == base_name:
+                return content_type_enum, "original"
+            if stem.startswith(f"{base_name}_"):
+                if best_match is None or len(base_name) > len(best_match[2]):
+                    best_match = (content_type_enum, stem[len(base_name) + 1:], base_name)
+        return best_match[:2] if best_match else None
+
+    async def reload_changed_templates(self) -> Dict[str, List[str]]:
+        """
+        Incrementally reload prompt files that changed on disk since the last check
+
+        Changed templates are reread and recompiled off the event loop, then swapped
+        into the caches in one step. Generations already in flight keep the template
+        they started with; unchanged templates are left untouched.
+
+        Returns:
+            Filenames that were added, modified and removed
+        """
+        async with self._reload_lock:
+            current = await asyncio.to_thread(self._scan_prompt_files)
+            changes = {
+                "added": sorted(set(current) - set(self.file_mtimes)),
+                "modified": sorted(
+                    name for name in set(current) & set(self.file_mtimes)
+                    if current[name] != self.file_mtimes[name]
+                ),
+                "removed": sorted(set(self.file_mtimes) - set(current))
+            }
+
+            affected = set()
+            for filename in changes["added"] + changes["modified"] + changes["removed"]:
+                match = self._content_type_for_file(filename)
+                if match:
+                    affected.add(match[0])
+
+            # Recompile what was cached for each affected content type before swapping
+            jobs = []
+            for content_type_enum in affected:
+                cache_key = content_type_enum.value
+                versions = {k[1] for k in self.compiled_template_cache if k[0] == cache_key}
+                if cache_key in self.template_cache:
+                    versions.add("original")
+                for version in versions:
+                    if self._resolve_version_path(content_type_enum, version).exists():
+                        jobs.append((content_type_enum, version))
+
+            results = await asyncio.gather(*[
+                asyncio.to_thread(self._precompile_template, content_type_enum, version)
+                for content_type_enum, version in jobs
+            ])
+
+            # Swap: no awaits from here on, so readers never see a half-updated cache
+            for content_type_enum in affected:
+                cache_key = content_type_enum.value
+                old_content = self.template_cache.pop(cache_key, None)
+                if old_content is not None:
+                    self.compiled_source_cache.pop(old_content, None)
+                    self.segment_source_cache.pop(old_content, None)
+                for compiled_key in [k for k in self.compiled_template_cache if k[0] == cache_key]:
+                    del self.compiled_template_cache[compiled_key]
+                self.version_cache.pop(self.template_files[content_type_enum].replace('.md', ''), None)
+
+            for content_type_enum, version, mtime_ns, template_content, template, _, _ in results:
+                cache_key = content_type_enum.value
+                self.compiled_template_cache[(cache_key, version)] = (mtime_ns, template)
+                if version == "original":
+                    self.template_cache[cache_key] = template_content
+                    self.compiled_source_cache[template_content] = template
+
+            self.file_mtimes = current
+
+        if affected:
+            logger.info(
+                f"Hot reloaded prompt templates for {sorted(ct.value for ct in affected)}: {changes}"
+            )
+        return changes
+
+    def start_watching(self, interval: Optional[float] = None):
+        """Start background hot reload of changed prompt files"""
+        interval = interval or settings.PROMPT_HOT_RELOAD_INTERVAL
+        if self._watch_task and not self._watch_task.done():
+            return
+        self._watch_task = asyncio.create_task(self._watch_prompts(interval))
+        logger.info(
+            f"Watching {self.prompts_directory} for prompt changes "
+            f"({'watchfiles' if WATCHFILES_AVAILABLE else f'polling every {interval}s'})"
+        )
+
+    async def stop_watching(self):
+        """Stop the background hot reload task"""
+        if self._watch_task:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
+    async def _watch_prompts(self, interval: float):
+        """Reload changed templates on filesystem events, or by polling mtimes"""
+        while True:
+            try:
+                if WATCHFILES_AVAILABLE:
+                    async for _ in awatch(self.prompts_directory):
+                        await self.reload_changed_templates()
+                else:
+                    await asyncio.sleep(interval)
+                    await self.reload_changed_templates()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Prompt hot reload failed: {e}")
+                await asyncio.sleep(interval)
+
     def get_supported_content_types(self) -> list:
         """Get list of supported content types"""
         return [ct.value for ct in self.template_files.keys()]
@@ -222,7 +636,11 @@ class PromptTemplateLoader:
             "cached_templates": len(self.template_cache),
             "supported_types": self.get_supported_content_types(),
             "prompts_directory": str(self.prompts_directory),
-            "cache_hit_ratio": len(self.template_cache) / len(self.template_files) if self.template_files else 0
+            "cache_hit_ratio": len(self.template_cache) / len(self.template_files) if self.template_files else 0,
+            "compiled_templates": len(self.compiled_template_cache) + len(self.compiled_source_cache),
+            "compiled_cache_size": self.compiled_cache_size,
+            "compile_stats": dict(self.compile_stats),
+            "template_timings": dict(self.template_timings)
         }
     
     async def load_prompt_version(self, content_type: str, version: str = "latest") -> str:
@@ -236,48 +654,55 @@ class PromptTemplateLoader:
         Returns:
             Template content for the specified version
         """
-        # Convert string to enum if needed
+        content_type_enum = self._to_content_type(content_type)
+        template_path = self._resolve_version_path(content_type_enum, version)
+            
+        if not template_path.exists():
+            raise FileNotFoundError(f"Template version not found: {template_path}")
+            
+        try:
+            with open(template_path, 'r', encoding='utf-8') as f:
+                template_content = f.read()
+                
+            logger.info(f"Loaded template version {version} for {content_type_enum.value}")
+            return template_content
+            
+        except Exception as e:
+            logger.error(f"Failed to load template version {version}: {e}")
+            raise
+    
+    def _to_content_type(self, content_type) -> LaFactoriaContentType:
+        """Convert a content type string to its enum value"""
         if isinstance(content_type, str):
             try:
-                content_type_enum = LaFactoriaContentType(content_type)
+                return LaFactoriaContentType(content_type)
             except ValueError:
                 raise ValueError(f"Unsupported content type: {content_type}")
-        else:
-            content_type_enum = content_type
-            
+        return content_type
+
+    def _resolve_version_path(self, content_type_enum: LaFactoriaContentType, version: str) -> Path:
+        """Resolve the template file path for a prompt version"""
         base_filename = self.template_files.get(content_type_enum)
         if not base_filename:
             raise ValueError(f"No template file mapping for content type: {content_type_enum.value}")
-            
+
         base_name = base_filename.replace('.md', '')
-        
+
         if version == "latest":
             # Try v2 first, then fall back to original
             v2_path = self.prompts_directory / f"{base_name}_v2.md"
             if v2_path.exists():
-                template_path = v2_path
-            else:
-                template_path = self.prompts_directory / base_filename
+                return v2_path
+            return self.prompts_directory / base_filename
         elif version.startswith("v"):
             # Load specific version
-            template_path = self.prompts_directory / f"{base_name}_{version}.md"
+            return self.prompts_directory / f"{base_name}_{version}.md"
+        elif version != "original" and (self.prompts_directory / f"{base_name}_{version}.md").exists():
+            # Named variant such as "enhanced"
+            return self.prompts_directory / f"{base_name}_{version}.md"
         else:
             # Load original version
-            template_path = self.prompts_directory / base_filename
-            
-        if not template_path.exists():
-            raise FileNotFoundError(f"Template version not found: {template_path}")
-            
-        try:
-            with open(template_path, 'r', encoding='utf-8') as f:
-                template_content = f.read()
-                
-            logger.info(f"Loaded template version {version} for {content_type_enum.value}")
-            return template_content
-            
-        except Exception as e:
-            logger.error(f"Failed to load template version {version}: {e}")
-            raise
+            return self.prompts_directory / base_filename
     
     def get_prompt_versions(self, content_type: str) -> List[str]:
         """
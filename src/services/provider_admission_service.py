@@ -0,0 +1,202 @@
+"""
+Provider Admission Control for La Factoria
+Bounds concurrent AI provider calls and paces them to each provider's
+request and token per-minute quotas, shedding excess load early
+"""
+
+import asyncio
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a provider call cannot be admitted in time; callers should answer 503"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(1, math.ceil(retry_after))  # whole seconds for the Retry-After header
+
+
+class TokenBucket:
+    """Per-minute quota as a token bucket (capacity = one minute of quota)"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0  # refill per second
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount can be taken (0 if available now)"""
+        self._refill()
+        amount = min(amount, self.capacity)  # Oversized requests wait for a full bucket instead of forever
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        """Consume amount (may go negative when settling actual usage above the estimate)"""
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class ProviderLimiter:
+    """Concurrency and rate limits for one provider"""
+
+    def __init__(self, max_concurrency: int, requests_per_minute: int, tokens_per_minute: int):
+        self.max_concurrency = max_concurrency
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.waiting = 0
+        self.stats = {
+            "admitted": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+            "total_queue_ms": 0.0,
+            "max_queue_ms": 0.0
+        }
+
+
+class ProviderAdmissionController:
+    """
+    Admission control in front of AI provider calls
+
+    A call waits, in order, for room in the provider's requests/tokens per-minute
+    buckets, a per-provider slot, and a global concurrency slot
+    (MAX_CONCURRENT_GENERATIONS). Rate-limited calls hold no slots while they wait,
+    and calls queued behind a saturated provider hold no global slot, so they never
+    block calls to other providers. At most queue_size calls may wait per provider
+    for a slot and none waits longer than max_wait; anything beyond that is
+    rejected with AdmissionRejected.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        provider_limits: Dict[str, Dict[str, int]],
+        queue_size: int = 100,
+        max_wait: float = 10.0
+    ):
+        self.global_semaphore = asyncio.Semaphore(max_concurrent)
+        self.max_concurrent = max_concurrent
+        self.provider_limits = provider_limits
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.limiters: Dict[str, ProviderLimiter] = {}
+
+    def _limiter(self, provider: str) -> ProviderLimiter:
+        name = str(getattr(provider, "value", provider))
+        limiter = self.limiters.get(name)
+        if limiter is None:
+            limits = self.provider_limits.get(name, {})
+            limiter = ProviderLimiter(
+                max_concurrency=limits.get("max_concurrency", self.max_concurrent),
+                requests_per_minute=limits.get("requests_per_minute", 600),
+                tokens_per_minute=limits.get("tokens_per_minute", 1_000_000)
+            )
+            self.limiters[name] = limiter
+        return limiter
+
+    @asynccontextmanager
+    async def admit(self, provider: str, estimated_tokens: int, max_wait: Optional[float] = None):
+        """Hold a provider and a global slot for the duration of the block (max_wait caps the queue time)"""
+        limiter = self._limiter(provider)
+        name = str(getattr(provider, "value", provider))
+        start_time = time.monotonic()
+        deadline = start_time + min(self.max_wait, max_wait if max_wait is not None else self.max_wait)
+        # Pace to the quota before taking any slot, so rate-limited calls do not hold concurrency
+        while True:
+            wait = max(limiter.requests.wait_time(1), limiter.tokens.wait_time(estimated_tokens))
+            if wait == 0:
+                limiter.requests.take(1)
+                limiter.tokens.take(estimated_tokens)
+                break
+            if time.monotonic() + wait > deadline:
+                limiter.stats["rejected_timeout"] += 1
+                raise AdmissionRejected(f"{name} rate limit reached", wait)
+            await asyncio.sleep(wait)
+
+        # Provider slot first: calls queued behind a saturated provider must not hold global slots
+        acquired = []
+        try:
+            for semaphore in (limiter.semaphore, self.global_semaphore):
+                if semaphore.locked():
+                    await self._wait_for_slot(limiter, name, semaphore, deadline)
+                else:
+                    await semaphore.acquire()
+                acquired.append(semaphore)
+
+        except BaseException:
+            for semaphore in acquired:
+                semaphore.release()
+            # Not admitted: return the quota reserved above
+            limiter.requests.take(-1)
+            limiter.tokens.take(-estimated_tokens)
+            raise
+
+        queue_ms = (time.monotonic() - start_time) * 1000
+        limiter.stats["admitted"] += 1
+        limiter.stats["total_queue_ms"] += queue_ms
+        limiter.stats["max_queue_ms"] = max(limiter.stats["max_queue_ms"], queue_ms)
+        try:
+            yield
+        finally:
+            for semaphore in acquired:
+                semaphore.release()
+
+    async def _wait_for_slot(self, limiter: ProviderLimiter, name: str, semaphore: asyncio.Semaphore, deadline: float):
+        """Queue for a concurrency slot, bounded in queue length and wait time"""
+        if limiter.waiting >= self.queue_size:
+            limiter.stats["rejected_queue_full"] += 1
+            raise AdmissionRejected(f"{name} admission queue full", self._retry_after(limiter))
+
+        limiter.waiting += 1
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            limiter.stats["rejected_timeout"] += 1
+            raise AdmissionRejected(
+                f"{name} busy: no capacity within {self.max_wait:.0f}s", self._retry_after(limiter)
+            ) from None
+        finally:
+            limiter.waiting -= 1
+
+    def settle(self, provider: str, estimated_tokens: int, actual_tokens: int):
+        """Charge the difference between actual and estimated token usage to the provider's bucket"""
+        if actual_tokens:
+            self._limiter(provider).tokens.take(actual_tokens - estimated_tokens)
+
+    def _retry_after(self, limiter: ProviderLimiter) -> float:
+        """Rough seconds until capacity frees up: the average queue time, at least one second"""
+        admitted = limiter.stats["admitted"]
+        return limiter.stats["total_queue_ms"] / admitted / 1000 if admitted else 1.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, queue-time and rejection metrics per provider"""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "global_in_use": self.max_concurrent - self.global_semaphore._value,
+            "queue_size": self.queue_size,
+            "max_wait_seconds": self.max_wait,
+            "providers": {
+                name: {
+                    "in_use": limiter.max_concurrency - limiter.semaphore._value,
+                    "max_concurrency": limiter.max_concurrency,
+                    "waiting": limiter.waiting,
+                    "avg_queue_ms": round(
+                        limiter.stats["total_queue_ms"] / limiter.stats["admitted"], 2
+                    ) if limiter.stats["admitted"] else 0.0,
+                    **{k: round(v, 2) if isinstance(v, float) else v for k, v in limiter.stats.items()}
+                }
+                for name, limiter in self.limiters.items()
+            }
+        }
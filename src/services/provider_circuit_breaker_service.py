@@ -0,0 +1,112 @@
+"""
+Provider Circuit Breakers for La Factoria
+Stops sending requests to an AI provider during an outage and probes it
+in the background until it recovers
+"""
+
+import logging
+import time
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from .provider_admission_service import AdmissionRejected
+
+logger = logging.getLogger(__name__)
+
+
+class AllCircuitsOpen(AdmissionRejected):
+    """Raised when every provider for a request is skipped by an open circuit; callers should answer 503"""
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker states"""
+    CLOSED = "closed"        # Requests flow normally
+    OPEN = "open"            # Provider is skipped until the cool-down elapses
+    HALF_OPEN = "half_open"  # Cool-down elapsed; a probe decides whether to close
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one provider
+
+    After failure_threshold consecutive failures the circuit opens and requests
+    skip the provider without waiting on it. Once cooldown seconds have passed
+    the circuit goes half-open and a single probe is allowed; its outcome closes
+    the circuit or re-opens it for another cool-down.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+        self.stats = {"opened": 0, "closed": 0, "rejected": 0, "probes": 0}
+
+    def allow_request(self) -> bool:
+        """Whether a regular request may be sent to the provider (a refusal counts as a rejection)"""
+        if self.state == CircuitState.CLOSED:
+            return True
+        self.stats["rejected"] += 1
+        return False
+
+    def should_probe(self) -> bool:
+        """Claim the probe slot if the circuit is due one (moves open -> half-open after the cool-down)"""
+        if self.state == CircuitState.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = CircuitState.HALF_OPEN
+            logger.info(f"Circuit for {self.name} half-open, probing")
+        if self.state != CircuitState.HALF_OPEN or self.probe_in_flight:
+            return False
+        self.probe_in_flight = True
+        self.stats["probes"] += 1
+        return True
+
+    def record_success(self):
+        """A request or probe succeeded"""
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+        if self.state != CircuitState.CLOSED:
+            self.state = CircuitState.CLOSED
+            self.opened_at = None
+            self.stats["closed"] += 1
+            logger.info(f"Circuit for {self.name} closed")
+
+    def record_failure(self):
+        """A request or probe failed"""
+        self.consecutive_failures += 1
+        self.probe_in_flight = False
+        if self.state == CircuitState.HALF_OPEN or (
+            self.state == CircuitState.CLOSED and self.consecutive_failures >= self.failure_threshold
+        ):
+            self._open()
+
+    def _open(self):
+        if self.state == CircuitState.CLOSED:
+            self.stats["opened"] += 1
+            logger.warning(
+                f"Circuit for {self.name} opened after {self.consecutive_failures} consecutive failures"
+            )
+        self.state = CircuitState.OPEN
+        self.opened_at = time.monotonic()
+
+    def retry_in(self) -> Optional[float]:
+        """Seconds until an open circuit is due its next probe (None while not open)"""
+        if self.state != CircuitState.OPEN:
+            return None
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get breaker state and counters"""
+        retry_in = self.retry_in()
+        if retry_in is not None:
+            retry_in = round(retry_in, 2)
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "cooldown_seconds": self.cooldown,
+            "probe_in_seconds": retry_in,
+            **self.stats
+        }
@@ -0,0 +1,116 @@
+"""
+Provider Sync Executor for La Factoria
+Dedicated, bounded thread pool for blocking AI provider SDK calls (Vertex AI),
+kept apart from the event loop's default executor, with cached model objects
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class SyncProviderExecutor:
+    """
+    Thread pool for synchronous provider SDK calls
+
+    Blocking calls run on their own max_workers threads, so a burst of Vertex AI
+    traffic queues here instead of exhausting the loop's default executor used
+    by everything else. Tracks active/queued calls and queue time to show when
+    the pool is saturated.
+    """
+
+    def __init__(self, max_workers: int = 8, thread_name_prefix: str = "ai-provider-sync"):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._models: Dict[str, Any] = {}
+        self._models_lock = threading.Lock()
+        self._lock = threading.Lock()  # Counters are updated from worker threads
+        self.active = 0
+        self.queued = 0
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "saturated": 0,  # Calls that had to wait for a free worker
+            "peak_queued": 0,
+            "total_queue_ms": 0.0,
+            "max_queue_ms": 0.0
+        }
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking callable on the pool and await its result"""
+        submitted_at = time.monotonic()
+        with self._lock:
+            self.stats["submitted"] += 1
+            self.queued += 1
+            if self.active >= self.max_workers:
+                self.stats["saturated"] += 1
+            self.stats["peak_queued"] = max(self.stats["peak_queued"], self.queued - (self.max_workers - self.active))
+
+        def call():
+            queue_ms = (time.monotonic() - submitted_at) * 1000
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+                self.stats["total_queue_ms"] += queue_ms
+                self.stats["max_queue_ms"] = max(self.stats["max_queue_ms"], queue_ms)
+            try:
+                result = func(*args)
+            except BaseException:
+                with self._lock:
+                    self.active -= 1
+                    self.stats["failed"] += 1
+                raise
+            with self._lock:
+                self.active -= 1
+                self.stats["completed"] += 1
+            return result
+
+        try:
+            future = self._executor.submit(call)
+        except RuntimeError:
+            self._unqueue(None)
+            raise
+        future.add_done_callback(self._unqueue)
+        return await asyncio.wrap_future(future)
+
+    def _unqueue(self, future):
+        """Drop a call that never reached a worker (rejected after shutdown or cancelled while queued)"""
+        if future is None or future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    def model(self, name: str, factory: Callable[[str], Any]) -> Any:
+        """Model object for name, built once with factory(name) and reused across calls"""
+        model = self._models.get(name)
+        if model is None:
+            with self._models_lock:
+                model = self._models.get(name)
+                if model is None:
+                    model = factory(name)
+                    self._models[name] = model
+                    logger.info(f"Cached provider model {name}")
+        return model
+
+    def shutdown(self, wait: bool = False):
+        """Stop accepting work; queued calls that have not started are cancelled"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool size, utilization and queue metrics"""
+        with self._lock:
+            started = self.stats["submitted"] - self.queued
+            return {
+                "max_workers": self.max_workers,
+                "active": self.active,
+                "queued": self.queued,
+                "utilization": round(self.active / self.max_workers, 2) if self.max_workers else 0.0,
+                "avg_queue_ms": round(self.stats["total_queue_ms"] / started, 2) if started else 0.0,
+                "cached_models": sorted(self._models),
+                **{k: round(v, 2) if isinstance(v, float) else v for k, v in self.stats.items()}
+            }
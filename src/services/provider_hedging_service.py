@@ -0,0 +1,109 @@
+"""
+Hedged Provider Requests for La Factoria
+Cuts tail latency by sending a slow request to a second provider once the
+primary has exceeded its tracked latency percentile, keeping the first answer
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .provider_routing_service import ProviderRouter
+
+logger = logging.getLogger(__name__)
+
+
+class HedgingPolicy:
+    """
+    When and whether to hedge a provider request
+
+    A request is hedged once the primary provider has been running longer than
+    its p95 (configurable) for the content type. Hedges are capped both as a
+    fraction of eligible requests and by the expected cost of the extra call.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        min_samples: int = 20,
+        max_hedge_fraction: float = 0.1,
+        max_extra_cost: float = 0.10
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_hedge_fraction = max_hedge_fraction
+        self.max_extra_cost = max_extra_cost  # USD of expected cost per hedge
+        self.stats = {
+            "requests": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "primary_wins": 0,
+            "skipped_no_history": 0,
+            "skipped_rate_cap": 0,
+            "skipped_cost_cap": 0
+        }
+
+    def hedge_delay(self, router: ProviderRouter, provider: str, content_type: str) -> Optional[float]:
+        """Seconds to wait on the primary before hedging, or None without enough latency history"""
+        delay = router.latency_percentile(provider, content_type, self.percentile, self.min_samples)
+        if delay is None:
+            self.stats["skipped_no_history"] += 1
+        return delay
+
+    def allow(self, router: ProviderRouter, hedge_provider: str, content_type: str) -> bool:
+        """Check the hedge-rate and cost caps for one more hedge"""
+        if self.stats["hedged"] + 1 > self.max_hedge_fraction * max(self.stats["requests"], 1):
+            self.stats["skipped_rate_cap"] += 1
+            return False
+        if router.expected_cost(hedge_provider, content_type) > self.max_extra_cost:
+            self.stats["skipped_cost_cap"] += 1
+            return False
+        return True
+
+    async def run(
+        self,
+        router: ProviderRouter,
+        content_type: str,
+        primary: Callable[[], Awaitable[Any]],
+        hedge_provider: Optional[str],
+        hedge: Callable[[], Awaitable[Any]],
+        delay: float
+    ) -> Any:
+        """
+        Run the primary call, hedging after delay; the first successful result wins
+
+        The losing call is cancelled. If both fail, the primary's error is raised.
+        """
+        self.stats["requests"] += 1
+        primary_task = asyncio.ensure_future(primary())
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=delay)
+            if done or not hedge_provider or not self.allow(router, hedge_provider, content_type):
+                return await primary_task
+
+            self.stats["hedged"] += 1
+            logger.info(f"Hedging {content_type} request to {getattr(hedge_provider, 'value', hedge_provider)} after {delay:.2f}s")
+            hedge_task = asyncio.ensure_future(hedge())
+            pending = {primary_task, hedge_task}
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            self.stats["hedge_wins" if task is hedge_task else "primary_wins"] += 1
+                            return task.result()
+                # Both failed: surface the primary's error
+                return primary_task.result()
+            finally:
+                hedge_task.cancel()
+        finally:
+            primary_task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hedge counters with hedge rate and hedge win rate"""
+        hedged = self.stats["hedged"]
+        return {
+            **self.stats,
+            "hedge_rate": hedged / self.stats["requests"] if self.stats["requests"] else 0.0,
+            "hedge_win_rate": self.stats["hedge_wins"] / hedged if hedged else 0.0
+        }
@@ -0,0 +1,95 @@
+"""
+Provider Timeout and Retry Policy for La Factoria
+Per-provider and per-content-type deadlines, attempt timeouts and
+retry-with-jitter for transient AI provider failures
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+
+# SDK exception class names that signal transient failures (OpenAI, Anthropic, Google API core)
+RETRYABLE_ERROR_NAMES = frozenset({
+    "APITimeoutError", "APIConnectionError", "RateLimitError", "InternalServerError",
+    "OverloadedError", "ServiceUnavailable", "DeadlineExceeded", "ResourceExhausted", "TooManyRequests"
+})
+
+
+class AttemptTimeout(asyncio.TimeoutError):
+    """A single provider call hit its attempt timeout; the caller falls back instead of retrying"""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Timeout and retry settings for one provider/content type"""
+    deadline: float           # seconds for the whole request, across retries and fallbacks
+    attempt_timeout: float    # seconds for a single provider call
+    max_retries: int          # retries on the same provider before falling back
+    backoff_base: float       # seconds; doubled per retry
+    backoff_cap: float        # seconds; upper bound of a single backoff
+
+    def backoff(self, retry: int) -> float:
+        """Full-jitter exponential backoff before the given retry (0-based)"""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** retry)))
+
+
+class Deadline:
+    """Absolute point in time shared by every attempt of one request"""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a provider error is transient (timeouts, connection errors, 429/5xx)"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    status_code = getattr(error, "status_code", None) or getattr(error, "code", None)
+    return isinstance(status_code, int) and status_code in RETRYABLE_STATUS_CODES
+
+
+class RetryPolicyResolver:
+    """
+    Resolve the policy for a provider and content type
+
+    Overrides are keyed by provider ("openai"), content type ("study_guide") or
+    both ("openai:study_guide"), applied in that order over the defaults. Unknown
+    policy fields are rejected here, at startup, rather than on every request.
+    """
+
+    def __init__(self, default: RetryPolicy, overrides: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.default = default
+        self.overrides = overrides or {}
+
+        policy_fields = {f.name for f in fields(RetryPolicy)}
+        for key, override in self.overrides.items():
+            unknown = sorted(set(override) - policy_fields)
+            if unknown:
+                raise ValueError(
+                    f"Unknown retry policy field(s) {unknown} in AI_TIMEOUT_OVERRIDES[{key!r}]; "
+                    f"expected {sorted(policy_fields)}"
+                )
+
+    def resolve(self, provider: Optional[str], content_type: str) -> RetryPolicy:
+        provider_name = str(getattr(provider, "value", provider)) if provider else None
+        policy = self.default
+        for key in (provider_name, content_type, f"{provider_name}:{content_type}" if provider_name else None):
+            if key and key in self.overrides:
+                policy = replace(policy, **self.overrides[key])
+        return policy
@@ -0,0 +1,254 @@
+"""
+Adaptive Provider Routing for La Factoria
+Ranks AI providers from live latency, error, throughput, load and cost metrics
+so traffic shifts away from slow or degraded providers before requests time out
+"""
+
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Rough blended cost estimates (USD per 1K tokens), used when a provider has no list price
+# below or a request has no input/output token split
+COST_PER_1K_TOKENS = {
+    "openai": 0.03,       # GPT-4 approximate cost
+    "anthropic": 0.025,   # Claude-3 approximate cost
+    "vertex_ai": 0.020    # Vertex AI approximate cost
+}
+DEFAULT_COST_PER_1K_TOKENS = 0.025
+
+# List prices of the models in use (USD per 1K input tokens, per 1K output tokens)
+TOKEN_PRICES_PER_1K = {
+    "openai": (0.03, 0.06),           # gpt-4
+    "anthropic": (0.003, 0.015),      # claude-3-5-sonnet
+    "vertex_ai": (0.000075, 0.0003)   # gemini-1.5-flash
+}
+
+# Share of a request's tokens assumed to be input when pricing expected (not yet measured) requests
+EXPECTED_INPUT_TOKEN_SHARE = 0.5
+
+# Price of prompt-cache tokens relative to the normal input rate: cache reads, and cache writes (Anthropic)
+CACHED_TOKEN_PRICE_FACTOR = {"openai": 0.5, "anthropic": 0.1}
+CACHE_WRITE_PRICE_FACTOR = {"anthropic": 1.25}
+
+# Recent latencies kept per provider and content type for percentile estimates
+LATENCY_WINDOW = 200
+
+
+def estimate_cost(
+    provider: str,
+    tokens_used: int,
+    cached_tokens: int = 0,
+    cache_creation_tokens: int = 0,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0
+) -> float:
+    """
+    USD cost of a request
+
+    With the provider-reported prompt/completion split, input and output tokens are
+    priced at their list rates (prompt tokens include cached and cache-write tokens,
+    which are priced separately). Without it, tokens_used is priced at the blended rate.
+    """
+    provider_name = str(getattr(provider, "value", provider))
+    cache_factor = CACHED_TOKEN_PRICE_FACTOR.get(provider_name, 1.0)
+    write_factor = CACHE_WRITE_PRICE_FACTOR.get(provider_name, 1.0)
+
+    if (prompt_tokens or completion_tokens) and provider_name in TOKEN_PRICES_PER_1K:
+        input_rate, output_rate = (price / 1000 for price in TOKEN_PRICES_PER_1K[provider_name])
+        uncached = max(0, prompt_tokens - cached_tokens - cache_creation_tokens)
+        return (
+            input_rate * (uncached + cached_tokens * cache_factor + cache_creation_tokens * write_factor)
+            + output_rate * completion_tokens
+        )
+
+    unit_cost = COST_PER_1K_TOKENS.get(provider_name, DEFAULT_COST_PER_1K_TOKENS) / 1000
+    uncached = max(0, tokens_used - cached_tokens - cache_creation_tokens)
+    return unit_cost * (uncached + cached_tokens * cache_factor + cache_creation_tokens * write_factor)
+
+
+@dataclass
+class ProviderMetrics:
+    """Exponentially weighted live metrics for one provider"""
+    latency: Optional[float] = None            # seconds per successful request
+    error_rate: float = 0.0                    # EWMA of 1.0 (failure) / 0.0 (success), as of error_updated_at
+    error_updated_at: float = 0.0              # time.monotonic() of the last error_rate update
+    tokens_per_second: Optional[float] = None
+    in_flight: int = 0
+    samples: int = 0
+    content_type_tokens: Dict[str, float] = field(default_factory=dict)  # EWMA tokens per content type
+    latency_samples: Dict[str, deque] = field(default_factory=dict)  # content type -> recent latencies
+
+
+class ProviderRouter:
+    """
+    Latency-aware provider ranking
+
+    Each provider is scored by its expected latency for the content type (from
+    tokens/sec when known, else EWMA latency), inflated by requests already in
+    flight, plus penalties for recent errors and expected cost. Lower is better.
+    Providers without samples score as fast as the best known provider so they
+    still receive traffic and get measured. The error rate also decays with time,
+    so a provider that failed and then lost its traffic is tried again once its
+    errors are old.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        error_penalty: float = 30.0,
+        cost_weight: float = 10.0,
+        in_flight_penalty: float = 0.25,
+        error_half_life: float = 60.0
+    ):
+        self.alpha = alpha
+        self.error_penalty = error_penalty      # seconds added at a 100% error rate
+        self.cost_weight = cost_weight          # seconds of latency traded per USD of expected cost
+        self.in_flight_penalty = in_flight_penalty  # fractional latency increase per in-flight request
+        self.error_half_life = error_half_life  # seconds for the error rate to halve without new samples
+        self.metrics: Dict[str, ProviderMetrics] = {}
+
+    def _metrics(self, provider: str) -> ProviderMetrics:
+        return self.metrics.setdefault(str(getattr(provider, "value", provider)), ProviderMetrics())
+
+    def _ewma(self, current: Optional[float], sample: float) -> float:
+        return sample if current is None else current + self.alpha * (sample - current)
+
+    def error_rate(self, provider: str) -> float:
+        """Provider error rate, decayed by the time since its last update"""
+        metrics = self._metrics(provider)
+        if not metrics.error_rate or self.error_half_life <= 0:
+            return metrics.error_rate
+        elapsed = time.monotonic() - metrics.error_updated_at
+        return metrics.error_rate * 0.5 ** (elapsed / self.error_half_life)
+
+    def _record_outcome(self, provider: str, failed: bool):
+        metrics = self._metrics(provider)
+        metrics.error_rate = self._ewma(self.error_rate(provider), 1.0 if failed else 0.0)
+        metrics.error_updated_at = time.monotonic()
+
+    @contextmanager
+    def track(self, provider: str):
+        """Count a request as in flight for the duration of the block (including cancellation)"""
+        metrics = self._metrics(provider)
+        metrics.in_flight += 1
+        try:
+            yield
+        finally:
+            metrics.in_flight = max(0, metrics.in_flight - 1)
+
+    def record_success(self, provider: str, content_type: str, latency: float, tokens: int):
+        """Fold a completed request into the provider's metrics"""
+        metrics = self._metrics(provider)
+        metrics.samples += 1
+        metrics.latency = self._ewma(metrics.latency, latency)
+        self._record_outcome(provider, failed=False)
+        metrics.latency_samples.setdefault(content_type, deque(maxlen=LATENCY_WINDOW)).append(latency)
+        if tokens and latency > 0:
+            metrics.tokens_per_second = self._ewma(metrics.tokens_per_second, tokens / latency)
+            metrics.content_type_tokens[content_type] = self._ewma(
+                metrics.content_type_tokens.get(content_type), float(tokens)
+            )
+
+    def record_censored_latency(self, provider: str, content_type: str, elapsed: float):
+        """
+        Record the elapsed time of a timed-out or cancelled request as a latency sample
+
+        The true latency is at least elapsed. Keeping these lower bounds stops the
+        percentile (and so the hedge delay) drifting low as slow calls stop finishing.
+        """
+        metrics = self._metrics(provider)
+        metrics.latency_samples.setdefault(content_type, deque(maxlen=LATENCY_WINDOW)).append(elapsed)
+
+    def record_failure(self, provider: str):
+        """Count a failed request against the provider"""
+        self._record_outcome(provider, failed=True)
+
+    def expected_latency(self, provider: str, content_type: str) -> Optional[float]:
+        """Expected seconds for a request of this content type, or None without samples"""
+        metrics = self._metrics(provider)
+        tokens = metrics.content_type_tokens.get(content_type)
+        if tokens and metrics.tokens_per_second:
+            return tokens / metrics.tokens_per_second
+        return metrics.latency
+
+    def latency_percentile(
+        self,
+        provider: str,
+        content_type: str,
+        percentile: float = 0.95,
+        min_samples: int = 1
+    ) -> Optional[float]:
+        """Latency percentile over recent requests (successes plus censored timeouts/cancellations), or None with too few samples"""
+        samples = self._metrics(provider).latency_samples.get(content_type)
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(percentile * len(ordered)))]
+
+    def expected_cost(self, provider: str, content_type: str) -> float:
+        """Expected USD cost of a request of this content type (list prices; blended rate for unknown providers)"""
+        provider_name = str(getattr(provider, "value", provider))
+        metrics = self._metrics(provider)
+        tokens = metrics.content_type_tokens.get(content_type)
+        if tokens is None:
+            # Fall back to what any provider has used for this content type
+            known = [m.content_type_tokens[content_type] for m in self.metrics.values() if content_type in m.content_type_tokens]
+            tokens = sum(known) / len(known) if known else 0.0
+        if provider_name not in TOKEN_PRICES_PER_1K:
+            return tokens / 1000 * COST_PER_1K_TOKENS.get(provider_name, DEFAULT_COST_PER_1K_TOKENS)
+        # Same list prices estimate_cost reports, with an assumed input/output split
+        input_price, output_price = TOKEN_PRICES_PER_1K[provider_name]
+        return tokens / 1000 * (
+            input_price * EXPECTED_INPUT_TOKEN_SHARE + output_price * (1 - EXPECTED_INPUT_TOKEN_SHARE)
+        )
+
+    def score(self, provider: str, content_type: str, baseline_latency: float = 0.0) -> float:
+        """Routing score in seconds (lower is better)"""
+        metrics = self._metrics(provider)
+        latency = self.expected_latency(provider, content_type)
+        if latency is None:
+            latency = baseline_latency
+        latency *= 1 + self.in_flight_penalty * metrics.in_flight
+        return (
+            latency
+            + self.error_penalty * self.error_rate(provider)
+            + self.cost_weight * self.expected_cost(provider, content_type)
+        )
+
+    def rank(self, providers: Iterable[str], content_type: str) -> List[str]:
+        """Order providers best-first; ties keep the given (configured) order"""
+        providers = list(providers)
+        known = [
+            latency for latency in (self.expected_latency(p, content_type) for p in providers)
+            if latency is not None
+        ]
+        baseline = min(known) if known else 0.0
+        return sorted(providers, key=lambda p: self.score(p, content_type, baseline))
+
+    def select(self, providers: Iterable[str], content_type: str) -> Optional[str]:
+        """Best provider for the content type, or None if there are no candidates"""
+        ranked = self.rank(providers, content_type)
+        return ranked[0] if ranked else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get live routing metrics per provider"""
+        return {
+            provider: {
+                "ewma_latency": round(m.latency, 4) if m.latency is not None else None,
+                "error_rate": round(self.error_rate(provider), 4),
+                "tokens_per_second": round(m.tokens_per_second, 2) if m.tokens_per_second is not None else None,
+                "in_flight": m.in_flight,
+                "samples": m.samples,
+                "content_type_tokens": {ct: round(t, 1) for ct, t in m.content_type_tokens.items()},
+                "p95_latency": {
+                    ct: round(self.latency_percentile(provider, ct), 4) for ct in m.latency_samples
+                }
+            }
+            for provider, m in self.metrics.items()
+        }
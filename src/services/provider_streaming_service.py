@@ -0,0 +1,138 @@
+"""
+Provider Streaming for La Factoria
+Native streaming calls for each AI provider SDK, normalized to AIStreamChunk
+"""
+
+import logging
+from typing import AsyncIterator
+
+from .ai_providers import (
+    AIProviderType, AIResponse, AIStreamChunk, EDUCATIONAL_SYSTEM_PROMPT,
+    cacheable_prompt_content, cached_token_usage, vertex_model
+)
+from .token_counting_service import vertex_token_usage
+
+logger = logging.getLogger(__name__)
+
+
+async def stream_openai(client, prompt: str, max_tokens: int) -> AsyncIterator[AIStreamChunk]:
+    """Stream content from OpenAI GPT models"""
+    stream = await client.chat.completions.create(
+        model="gpt-4",
+        messages=[
+            {"role": "system", "content": EDUCATIONAL_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.7,
+        max_tokens=max_tokens,
+        top_p=0.9,
+        stream=True,
+        stream_options={"include_usage": True}
+    )
+
+    parts = []
+    usage = None
+    finish_reason = None
+    async for event in stream:
+        # The usage-only event at the end of the stream has no choices
+        if event.usage:
+            usage = event.usage
+        if not event.choices:
+            continue
+        finish_reason = event.choices[0].finish_reason or finish_reason
+        delta = event.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            yield AIStreamChunk(text=delta)
+
+    yield AIStreamChunk(text="", done=True, response=AIResponse(
+        content="".join(parts),
+        provider=AIProviderType.OPENAI.value,
+        model="gpt-4",
+        tokens_used=usage.total_tokens if usage else 0,
+        generation_time=0.0,  # Will be set by caller
+        metadata={
+            "finish_reason": finish_reason,
+            "prompt_tokens": usage.prompt_tokens if usage else 0,
+            "completion_tokens": usage.completion_tokens if usage else 0,
+            **cached_token_usage(usage),
+            "streamed": True
+        }
+    ))
+
+
+async def stream_anthropic(client, prompt: str, max_tokens: int) -> AsyncIterator[AIStreamChunk]:
+    """Stream content from Anthropic Claude models"""
+    async with client.messages.stream(
+        model="claude-3-5-sonnet-20241022",
+        max_tokens=max_tokens,
+        temperature=0.7,
+        messages=[{"role": "user", "content": cacheable_prompt_content(prompt)}]
+    ) as stream:
+        async for delta in stream.text_stream:
+            if delta:
+                yield AIStreamChunk(text=delta)
+        message = await stream.get_final_message()
+
+    cache_usage = cached_token_usage(message.usage)
+    yield AIStreamChunk(text="", done=True, response=AIResponse(
+        content="".join(block.text for block in message.content if getattr(block, "text", None)),
+        provider=AIProviderType.ANTHROPIC.value,
+        model="claude-3-5-sonnet-20241022",
+        tokens_used=(
+            message.usage.input_tokens + message.usage.output_tokens
+            + cache_usage["cached_tokens"] + cache_usage["cache_creation_tokens"]
+        ),
+        generation_time=0.0,  # Will be set by caller
+        metadata={
+            "input_tokens": message.usage.input_tokens,
+            "output_tokens": message.usage.output_tokens,
+            "stop_reason": message.stop_reason,
+            **cache_usage,
+            "streamed": True
+        }
+    ))
+
+
+async def stream_vertex_ai(executor, prompt: str, max_tokens: int) -> AsyncIterator[AIStreamChunk]:
+    """Stream content from Google Vertex AI (the SDK stream is synchronous, so each chunk is pulled on the sync executor)"""
+    model = vertex_model(executor, "gemini-1.5-flash")
+    responses = await executor.run(
+        lambda: iter(model.generate_content(
+            prompt,
+            generation_config={
+                "temperature": 0.7,
+                "max_output_tokens": max_tokens,
+                "top_k": 40,
+                "top_p": 0.8
+            },
+            stream=True
+        ))
+    )
+
+    parts = []
+    usage_metadata = None
+    while True:
+        response = await executor.run(next, responses, None)
+        if response is None:
+            break
+        usage_metadata = getattr(response, "usage_metadata", None) or usage_metadata
+        try:
+            delta = response.text
+        except ValueError:
+            # Chunks without text parts (e.g. safety-only) raise on .text
+            continue
+        if delta:
+            parts.append(delta)
+            yield AIStreamChunk(text=delta)
+
+    content = "".join(parts)
+    usage = vertex_token_usage(usage_metadata, prompt, content)
+    yield AIStreamChunk(text="", done=True, response=AIResponse(
+        content=content,
+        provider=AIProviderType.VERTEX_AI.value,
+        model="gemini-1.5-flash",
+        tokens_used=usage["prompt_tokens"] + usage["completion_tokens"],
+        generation_time=0.0,  # Will be set by caller
+        metadata={**usage, "streamed": True}
+    ))
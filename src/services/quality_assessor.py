@@ -5,16 +5,149 @@ Following patterns from educational-content-assessment.md
 """
 
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Sequence, Union
 import asyncio
 import re
 from datetime import datetime, timezone
 
 from ..models.educational import LearningObjective
 from ..core.config import settings
+from .text_analysis_service import KeywordMatcher, TextAnalysis, count_syllables
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever scoring changes, so cached assessments of the old scoring are not served
+ASSESSMENT_VERSION = "2.0"
+
+# Keyword lists (matched as lowercase substrings)
+TECHNICAL_INDICATORS = ['algorithm', 'function', 'variable', 'equation', 'theorem', 'hypothesis']
+LEARNING_INDICATORS = [
+    'understand', 'learn', 'remember', 'apply', 'analyze', 'evaluate', 'create',
+    'example', 'practice', 'exercise', 'question', 'problem'
+]
+INTERACTIVE_INDICATORS = ['try', 'practice', 'exercise', 'activity', 'question']
+EDUCATIONAL_INDICATORS = [
+    'learn', 'understand', 'remember', 'apply', 'practice',
+    'example', 'exercise', 'question', 'concept', 'skill'
+]
+RED_FLAGS = [
+    # Scientific misconceptions
+    'the earth is flat', 'vaccines cause autism', 'evolution is just a theory',
+    'humans only use 10% of their brain', 'cracking knuckles causes arthritis',
+
+    # Mathematical errors (basic patterns)
+    '2 + 2 = 5', '1 + 1 = 3', 'pi = 3.14159265359',
+
+    # Historical inaccuracies
+    'columbus discovered america', 'napoleon was short',
+    'great wall of china visible from space',
+
+    # Common misconceptions
+    'lightning never strikes twice', 'goldfish have 3-second memory',
+    'different parts of tongue taste different flavors'
+]
+UNCERTAINTY_INDICATORS = [
+    'according to', 'research suggests', 'evidence indicates',
+    'studies show', 'it appears that', 'likely', 'possibly',
+    'scientists believe', 'current understanding'
+]
+OVERCONFIDENT_PHRASES = [
+    'always true', 'never wrong', 'absolutely certain',
+    'without doubt', 'completely proven', 'totally false'
+]
+CITATION_INDICATORS = [
+    'according to research', 'study published', 'researchers found',
+    'peer-reviewed', 'journal of', 'university study',
+    'source:', 'reference:', 'bibliography'
+]
+# Bloom's taxonomy keywords by level
+BLOOMS_KEYWORDS = {
+    'remember': [
+        'remember', 'recall', 'recognize', 'identify', 'define',
+        'describe', 'list', 'name', 'state', 'match'
+    ],
+    'understand': [
+        'understand', 'explain', 'interpret', 'summarize', 'classify',
+        'compare', 'contrast', 'demonstrate', 'illustrate'
+    ],
+    'apply': [
+        'apply', 'use', 'implement', 'execute', 'carry out',
+        'practice', 'solve', 'demonstrate', 'operate'
+    ],
+    'analyze': [
+        'analyze', 'examine', 'investigate', 'categorize', 'differentiate',
+        'distinguish', 'compare', 'contrast', 'break down'
+    ],
+    'evaluate': [
+        'evaluate', 'assess', 'judge', 'critique', 'justify',
+        'argue', 'defend', 'support', 'decide', 'recommend'
+    ],
+    'create': [
+        'create', 'design', 'develop', 'construct', 'produce',
+        'generate', 'build', 'compose', 'plan', 'formulate'
+    ]
+}
+
+# Every keyword above, found in one scan per assessment
+ASSESSMENT_KEYWORDS = KeywordMatcher(
+    TECHNICAL_INDICATORS + LEARNING_INDICATORS + INTERACTIVE_INDICATORS + EDUCATIONAL_INDICATORS
+    + RED_FLAGS + UNCERTAINTY_INDICATORS + OVERCONFIDENT_PHRASES + CITATION_INDICATORS
+    + [keyword for keywords in BLOOMS_KEYWORDS.values() for keyword in keywords]
+    + ['question', 'answer']
+)
+
+# Age-group tables (cognitive load ceilings, Flesch targets, expected Bloom's levels)
+COGNITIVE_LOAD_THRESHOLDS = {
+    "elementary": 1.5,
+    "middle_school": 2.0,
+    "high_school": 2.5,
+    "college": 3.0,
+    "adult_learning": 2.8,
+    "general": 2.3
+}
+READABILITY_THRESHOLDS = {
+    "elementary": 80,     # Very easy
+    "middle_school": 70,  # Fairly easy
+    "high_school": 60,    # Standard
+    "college": 50,        # Fairly difficult
+    "adult_learning": 55,
+    "general": 60
+}
+BLOOMS_AGE_EXPECTATIONS = {
+    'elementary': ['remember', 'understand', 'apply'],
+    'middle_school': ['remember', 'understand', 'apply', 'analyze'],
+    'high_school': ['understand', 'apply', 'analyze', 'evaluate'],
+    'college': ['apply', 'analyze', 'evaluate', 'create'],
+    'adult_learning': ['apply', 'analyze', 'evaluate', 'create'],
+    'general': ['understand', 'apply', 'analyze']
+}
+DEFAULT_BLOOMS_LEVELS = ['understand', 'apply']
+
+# Weights of the overall score according to La Factoria quality framework
+QUALITY_WEIGHTS = {
+    'educational_effectiveness': 0.30,  # Highest weight - pedagogical effectiveness
+    'factual_accuracy': 0.25,           # Critical for educational content
+    'readability': 0.15,                # Important for age appropriateness
+    'learning_alignment': 0.10,         # Learning objective alignment
+    'cognitive_load': 0.10,             # Age-appropriate cognitive complexity
+    'structural_quality': 0.05,         # Organization and clarity
+    'engagement': 0.05                  # Student engagement potential
+}
+
+HEADING_PATTERN = re.compile(r'^#{1,3}\s', re.MULTILINE)
+LIST_PATTERNS = (re.compile(r'^\s*[-*•]\s', re.MULTILINE), re.compile(r'^\s*\d+\.\s', re.MULTILINE))
+NUMBER_PATTERN = re.compile(r'\d+(?:\.\d+)?')
+
+ENGAGEMENT_PATTERNS = {
+    'questions': re.compile(r'\?'),
+    'examples': re.compile(r'\bexample\b|\bfor instance\b'),
+    'activities': re.compile(r'\bactivity\b|\bexercise\b|\bpractice\b'),
+    'real_world': re.compile(r'\bin real life\b|\bin practice\b|\bin the world\b'),
+    'interactive': re.compile(r'\btry\b|\byou can\b|\blet\'s\b')
+}
+
+TextInput = Union[str, TextAnalysis]
+
 class EducationalQualityAssessor:
     """Assess educational content quality using learning science metrics"""
 
@@ -23,6 +156,14 @@ class EducationalQualityAssessor:
         self.min_educational_threshold = settings.QUALITY_THRESHOLD_EDUCATIONAL
         self.min_factual_threshold = settings.QUALITY_THRESHOLD_FACTUAL
 
+    @property
+    def cache_version(self) -> str:
+        """Assessment version plus the thresholds behind the meets_* flags, for result cache keys"""
+        return (
+            f"{ASSESSMENT_VERSION}-{self.min_quality_threshold}-"
+            f"{self.min_educational_threshold}-{self.min_factual_threshold}"
+        )
+
     async def assess_content_quality(
         self,
         content: Dict[str, Any],
@@ -40,16 +181,19 @@ class EducationalQualityAssessor:
                 logger.warning("No text content found for quality assessment")
                 return self._default_quality_metrics()
 
+            # Tokenize once; every dimension reads from the shared analysis
+            analysis = self._analyze(content_text)
+
             # Parallel assessment of different quality dimensions
             assessments = await asyncio.gather(
-                self._assess_cognitive_load(content_text, age_group),
-                self._assess_readability(content_text, age_group),
-                self._assess_educational_effectiveness(content, content_type),
-                self._assess_learning_objective_alignment(content, learning_objectives),
-                self._assess_engagement_elements(content_text),
-                self._assess_structural_quality(content_text, content_type),
-                self._assess_factual_accuracy(content_text, content_type),
-                self._assess_blooms_taxonomy_alignment(content_text, age_group),
+                self._assess_cognitive_load(analysis, age_group),
+                self._assess_readability(analysis, age_group),
+                self._assess_educational_effectiveness(content, content_type, analysis),
+                self._assess_learning_objective_alignment(content, learning_objectives, analysis),
+                self._assess_engagement_elements(analysis),
+                self._assess_structural_quality(analysis, content_type),
+                self._assess_factual_accuracy(analysis, content_type),
+                self._assess_blooms_taxonomy_alignment(analysis, age_group),
                 return_exceptions=True
             )
 
@@ -89,7 +233,7 @@ class EducationalQualityAssessor:
                     "age_group": age_group,
                     "text_length": len(content_text),
                     "has_learning_objectives": learning_objectives is not None,
-                    "assessment_version": "2.0",
+                    "assessment_version": ASSESSMENT_VERSION,
                     "assessed_at": str(datetime.now(timezone.utc))
                 }
             }
@@ -98,8 +242,35 @@ class EducationalQualityAssessor:
             logger.error(f"Quality assessment failed: {e}")
             return self._default_quality_metrics()
 
+    def assess_many(
+        self,
+        contents: Sequence[Dict[str, Any]],
+        content_type: Union[str, Sequence[str]],
+        age_group: Union[str, Sequence[str]],
+        learning_objectives: Optional[Sequence[Optional[List[LearningObjective]]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Assess many documents at once, scoring their feature vectors with NumPy
+
+        content_type and age_group are one value for every document or one per
+        document; learning_objectives, when given, is one list (or None) per
+        document. Results match assess_content_quality for each document.
+        """
+        from .batch_quality_assessor import assess_many
+        return assess_many(self, contents, content_type, age_group, learning_objectives)
+
+    def _analyze(self, text: TextInput) -> TextAnalysis:
+        """Shared tokenization of the text (reused when already analyzed)"""
+        if isinstance(text, TextAnalysis):
+            return text
+        return TextAnalysis(text, ASSESSMENT_KEYWORDS)
+
     def _extract_text_content(self, content: Dict[str, Any]) -> str:
         """Extract all text content from structured content for analysis"""
+        return ' '.join(self._extract_text_parts(content))
+
+    def _extract_text_parts(self, content: Dict[str, Any]) -> List[str]:
+        """Text fields of structured content, in document order (joined with spaces for analysis)"""
         text_parts = []
 
         def extract_recursive(obj):
@@ -127,10 +298,11 @@ class EducationalQualityAssessor:
                 text_parts.append(obj)
 
         extract_recursive(content)
-        return ' '.join(text_parts)
+        return text_parts
 
-    async def _assess_cognitive_load(self, text: str, age_group: str) -> Dict[str, float]:
+    async def _assess_cognitive_load(self, text: TextInput, age_group: str) -> Dict[str, float]:
         """Assess cognitive load using educational psychology principles"""
+        text = self._analyze(text)
 
         # Intrinsic load: content complexity
         intrinsic_load = self._calculate_intrinsic_load(text, age_group)
@@ -152,24 +324,24 @@ class EducationalQualityAssessor:
             "appropriate_for_age": total_load <= self._get_cognitive_load_threshold(age_group)
         }
 
-    def _calculate_intrinsic_load(self, text: str, age_group: str) -> float:
+    def _calculate_intrinsic_load(self, text: TextInput, age_group: str) -> float:
         """Calculate intrinsic cognitive load based on content complexity"""
+        text = self._analyze(text)
 
         # Word complexity analysis
-        words = text.split()
+        words = text.words
         if not words:
             return 0.0
 
         # Average word length
-        avg_word_length = sum(len(word) for word in words) / len(words)
+        avg_word_length = sum(map(len, words)) / len(words)
 
         # Complex words (>6 characters)
         complex_words = sum(1 for word in words if len(word) > 6)
         complex_word_ratio = complex_words / len(words)
 
         # Technical terms (basic heuristic)
-        technical_indicators = ['algorithm', 'function', 'variable', 'equation', 'theorem', 'hypothesis']
-        technical_count = sum(1 for indicator in technical_indicators if indicator.lower() in text.lower())
+        technical_count = text.count_present(TECHNICAL_INDICATORS)
         technical_density = technical_count / len(words) * 1000  # per 1000 words
 
         # Calculate intrinsic load (0-1 scale)
@@ -181,22 +353,23 @@ class EducationalQualityAssessor:
 
         return max(0.0, min(1.0, load))
 
-    def _calculate_extraneous_load(self, text: str) -> float:
+    def _calculate_extraneous_load(self, text: TextInput) -> float:
         """Calculate extraneous cognitive load from presentation"""
+        text = self._analyze(text)
 
         # Sentence length analysis
-        sentences = [s.strip() for s in text.split('.') if s.strip()]
+        sentences = text.sentences
         if not sentences:
             return 0.0
 
-        avg_sentence_length = sum(len(s.split()) for s in sentences) / len(sentences)
+        avg_sentence_length = text.sentence_word_count / len(sentences)
 
         # Very long sentences increase extraneous load
         long_sentence_penalty = max(0, (avg_sentence_length - 20) / 30)
 
         # Lack of structure (few paragraph breaks)
-        paragraph_breaks = text.count('\n\n')
-        text_length = len(text.split())
+        paragraph_breaks = text.text.count('\n\n')
+        text_length = text.word_count
         structure_score = min(1.0, paragraph_breaks / (text_length / 100)) if text_length > 0 else 0
 
         # Calculate extraneous load
@@ -207,26 +380,15 @@ class EducationalQualityAssessor:
 
         return max(0.0, min(1.0, load))
 
-    def _calculate_germane_load(self, text: str, age_group: str) -> float:
+    def _calculate_germane_load(self, text: TextInput, age_group: str) -> float:
         """Calculate germane cognitive load (learning effort)"""
+        text = self._analyze(text)
 
         # Learning indicators
-        learning_indicators = [
-            'understand', 'learn', 'remember', 'apply', 'analyze', 'evaluate', 'create',
-            'example', 'practice', 'exercise', 'question', 'problem'
-        ]
-
-        learning_density = sum(
-            1 for indicator in learning_indicators
-            if indicator.lower() in text.lower()
-        ) / max(1, len(text.split())) * 1000  # per 1000 words
+        learning_density = text.count_present(LEARNING_INDICATORS) / max(1, text.word_count) * 1000  # per 1000 words
 
         # Interactive elements
-        interactive_indicators = ['try', 'practice', 'exercise', 'activity', 'question']
-        interactive_density = sum(
-            1 for indicator in interactive_indicators
-            if indicator.lower() in text.lower()
-        ) / max(1, len(text.split())) * 1000
+        interactive_density = text.count_present(INTERACTIVE_INDICATORS) / max(1, text.word_count) * 1000
 
         # Calculate germane load (appropriate learning effort)
         load = (
@@ -238,48 +400,32 @@ class EducationalQualityAssessor:
 
     def _get_cognitive_load_threshold(self, age_group: str) -> float:
         """Get appropriate cognitive load threshold for age group"""
-        thresholds = {
-            "elementary": 1.5,
-            "middle_school": 2.0,
-            "high_school": 2.5,
-            "college": 3.0,
-            "adult_learning": 2.8,
-            "general": 2.3
-        }
-        return thresholds.get(age_group.lower(), 2.3)
+        return COGNITIVE_LOAD_THRESHOLDS.get(age_group.lower(), 2.3)
 
-    async def _assess_readability(self, text: str, age_group: str) -> Dict[str, float]:
+    async def _assess_readability(self, text: TextInput, age_group: str) -> Dict[str, float]:
         """Assess readability using multiple metrics"""
 
         if not text:
             return {"age_appropriateness_score": 0.0}
 
         # Basic readability metrics (simplified implementation)
-        words = text.split()
-        sentences = [s for s in text.split('.') if s.strip()]
+        text = self._analyze(text)
+        words = text.words
+        sentences = text.sentences
 
         if not words or not sentences:
             return {"age_appropriateness_score": 0.5}
 
         # Simple metrics
         avg_words_per_sentence = len(words) / len(sentences)
-        avg_syllables_per_word = sum(self._count_syllables(word) for word in words) / len(words)
+        avg_syllables_per_word = text.syllable_count / len(words)
 
         # Flesch Reading Ease approximation
         flesch_score = 206.835 - (1.015 * avg_words_per_sentence) - (84.6 * avg_syllables_per_word)
         flesch_score = max(0, min(100, flesch_score))  # Clamp to 0-100
 
         # Age appropriateness thresholds
-        age_thresholds = {
-            "elementary": 80,     # Very easy
-            "middle_school": 70,  # Fairly easy
-            "high_school": 60,    # Standard
-            "college": 50,        # Fairly difficult
-            "adult_learning": 55,
-            "general": 60
-        }
-
-        threshold = age_thresholds.get(age_group.lower(), 60)
+        threshold = READABILITY_THRESHOLDS.get(age_group.lower(), 60)
         appropriateness_score = min(1.0, flesch_score / threshold)
 
         return {
@@ -291,29 +437,34 @@ class EducationalQualityAssessor:
 
     def _count_syllables(self, word: str) -> int:
         """Simple syllable counting heuristic"""
-        word = word.lower()
-        count = 0
-        vowels = "aeiouy"
-        previous_was_vowel = False
+        return count_syllables(word)
 
-        for char in word:
-            is_vowel = char in vowels
-            if is_vowel and not previous_was_vowel:
-                count += 1
-            previous_was_vowel = is_vowel
+    async def _assess_educational_effectiveness(
+        self,
+        content: Dict[str, Any],
+        content_type: str,
+        analysis: Optional[TextAnalysis] = None
+    ) -> float:
+        """Assess educational effectiveness based on pedagogical principles"""
 
-        # Handle silent e
-        if word.endswith('e'):
-            count -= 1
+        effectiveness_score = self._content_structure_score(content, content_type)
 
-        return max(1, count)  # Every word has at least 1 syllable
+        # Text content analysis
+        text_content = analysis or self._analyze(self._extract_text_content(content))
+        if text_content.text:
+            indicator_count = text_content.count_present(EDUCATIONAL_INDICATORS)
 
-    async def _assess_educational_effectiveness(self, content: Dict[str, Any], content_type: str) -> float:
-        """Assess educational effectiveness based on pedagogical principles"""
+            # Normalize based on text length
+            if text_content.word_count:
+                indicator_density = indicator_count / text_content.word_count * 100
+                effectiveness_score += min(0.4, indicator_density / 5)  # Up to 0.4 points
+
+        return max(0.0, min(1.0, effectiveness_score))
 
+    def _content_structure_score(self, content: Dict[str, Any], content_type: str) -> float:
+        """Effectiveness points for educational elements present in the content's fields"""
         effectiveness_score = 0.0
 
-        # Content structure assessment
         if isinstance(content, dict):
             # Check for educational elements
             if 'learning_objectives' in content or 'objectives' in content:
@@ -336,39 +487,31 @@ class EducationalQualityAssessor:
                 if 'faqs' in content or 'questions' in content:
                     effectiveness_score += 0.2
 
-        # Text content analysis
-        text_content = self._extract_text_content(content)
-        if text_content:
-            educational_indicators = [
-                'learn', 'understand', 'remember', 'apply', 'practice',
-                'example', 'exercise', 'question', 'concept', 'skill'
-            ]
-
-            indicator_count = sum(
-                1 for indicator in educational_indicators
-                if indicator.lower() in text_content.lower()
-            )
-
-            # Normalize based on text length
-            words = text_content.split()
-            if words:
-                indicator_density = indicator_count / len(words) * 100
-                effectiveness_score += min(0.4, indicator_density / 5)  # Up to 0.4 points
-
-        return max(0.0, min(1.0, effectiveness_score))
+        return effectiveness_score
 
     async def _assess_learning_objective_alignment(
         self,
         content: Dict[str, Any],
-        learning_objectives: Optional[List[LearningObjective]]
+        learning_objectives: Optional[List[LearningObjective]],
+        analysis: Optional[TextAnalysis] = None
     ) -> float:
         """Assess alignment with specified learning objectives"""
 
         if not learning_objectives:
             return 0.7  # Default score when no objectives specified
 
-        text_content = self._extract_text_content(content)
-        if not text_content:
+        text_content = analysis or self._analyze(self._extract_text_content(content))
+        return self._objective_alignment(text_content, learning_objectives)
+
+    def _objective_alignment(
+        self,
+        text_content: TextAnalysis,
+        learning_objectives: Optional[List[LearningObjective]]
+    ) -> float:
+        """Share of each objective's subject, skill and cognitive level mentioned in the text"""
+        if not learning_objectives:
+            return 0.7
+        if not text_content.text:
             return 0.0
 
         alignment_scores = []
@@ -383,59 +526,55 @@ class EducationalQualityAssessor:
 
             alignment_score = 0.0
             for term in objective_terms:
-                if term in text_content.lower():
+                if text_content.contains(term):
                     alignment_score += 0.33
 
             alignment_scores.append(min(1.0, alignment_score))
 
         return sum(alignment_scores) / len(alignment_scores) if alignment_scores else 0.0
 
-    async def _assess_engagement_elements(self, text: str) -> float:
+    async def _assess_engagement_elements(self, text: TextInput) -> float:
         """Assess presence of engaging elements"""
 
         if not text:
             return 0.0
-
-        engagement_indicators = {
-            'questions': r'\?',
-            'examples': r'\bexample\b|\bfor instance\b',
-            'activities': r'\bactivity\b|\bexercise\b|\bpractice\b',
-            'real_world': r'\bin real life\b|\bin practice\b|\bin the world\b',
-            'interactive': r'\btry\b|\byou can\b|\blet\'s\b'
-        }
+        text_lower = self._analyze(text).lower
 
         engagement_score = 0.0
 
-        for indicator_type, pattern in engagement_indicators.items():
-            if re.search(pattern, text, re.IGNORECASE):
+        # Lowercase patterns on the shared lowercased text (case-insensitive regex search is far slower)
+        for indicator_type, pattern in ENGAGEMENT_PATTERNS.items():
+            if pattern.search(text_lower):
                 engagement_score += 0.2
 
         return min(1.0, engagement_score)
 
-    async def _assess_structural_quality(self, text: str, content_type: str) -> float:
+    async def _assess_structural_quality(self, text: TextInput, content_type: str) -> float:
         """Assess structural quality and organization"""
 
         if not text:
             return 0.0
+        analysis = self._analyze(text)
+        text = analysis.text
 
         structure_score = 0.0
 
         # Check for headings/sections
-        if re.search(r'^#{1,3}\s', text, re.MULTILINE):
+        if HEADING_PATTERN.search(text):
             structure_score += 0.3
 
         # Check for lists or bullet points
-        if re.search(r'^\s*[-*•]\s', text, re.MULTILINE) or re.search(r'^\s*\d+\.\s', text, re.MULTILINE):
+        if any(pattern.search(text) for pattern in LIST_PATTERNS):
             structure_score += 0.2
 
         # Check for paragraph breaks
-        paragraphs = text.split('\n\n')
+        paragraphs = analysis.paragraphs
         if len(paragraphs) > 1:
             structure_score += 0.2
 
         # Content type specific structure
         if content_type == 'flashcards':
-            if 'question' in text.lower() and 'answer' in text.lower():
+            if analysis.contains('question') and analysis.contains('answer'):
                 structure_score += 0.3
         elif content_type == 'study_guide':
             if len(paragraphs) >= 3:  # Multiple sections expected
@@ -443,81 +582,46 @@ class EducationalQualityAssessor:
 
         return min(1.0, structure_score)
 
-    async def _assess_factual_accuracy(self, text: str, content_type: str) -> float:
+    async def _assess_factual_accuracy(self, text: TextInput, content_type: str) -> float:
         """Assess factual accuracy using heuristic methods and validation checks"""
 
         if not text:
             return 0.5
 
+        analysis = self._analyze(text)
+        text = analysis.text
         accuracy_score = 0.8  # Base score
-        text_lower = text.lower()
-
-        # Check for common factual red flags
-        red_flags = [
-            # Scientific misconceptions
-            'the earth is flat', 'vaccines cause autism', 'evolution is just a theory',
-            'humans only use 10% of their brain', 'cracking knuckles causes arthritis',
-
-            # Mathematical errors (basic patterns)
-            '2 + 2 = 5', '1 + 1 = 3', 'pi = 3.14159265359',
-
-            # Historical inaccuracies
-            'columbus discovered america', 'napoleon was short',
-            'great wall of china visible from space',
-
-            # Common misconceptions
-            'lightning never strikes twice', 'goldfish have 3-second memory',
-            'different parts of tongue taste different flavors'
-        ]
 
-        # Penalize for red flags
-        for flag in red_flags:
-            if flag in text_lower:
+        # Penalize for common factual red flags
+        for flag in RED_FLAGS:
+            if analysis.contains(flag):
                 accuracy_score -= 0.2
                 logger.warning(f"Potential factual inaccuracy detected: {flag}")
 
         # Check for uncertainty indicators (good for accuracy)
-        uncertainty_indicators = [
-            'according to', 'research suggests', 'evidence indicates',
-            'studies show', 'it appears that', 'likely', 'possibly',
-            'scientists believe', 'current understanding'
-        ]
-
-        uncertainty_count = sum(1 for indicator in uncertainty_indicators if indicator in text_lower)
+        uncertainty_count = analysis.count_present(UNCERTAINTY_INDICATORS)
         if uncertainty_count > 0:
             accuracy_score += min(0.1, uncertainty_count * 0.02)  # Bonus for appropriate uncertainty
 
         # Check for overly certain language (red flag)
-        overconfident_phrases = [
-            'always true', 'never wrong', 'absolutely certain',
-            'without doubt', 'completely proven', 'totally false'
-        ]
-
-        for phrase in overconfident_phrases:
-            if phrase in text_lower:
+        for phrase in OVERCONFIDENT_PHRASES:
+            if analysis.contains(phrase):
                 accuracy_score -= 0.1
 
         # Check for citation/source indicators (positive)
-        citation_indicators = [
-            'according to research', 'study published', 'researchers found',
-            'peer-reviewed', 'journal of', 'university study',
-            'source:', 'reference:', 'bibliography'
-        ]
-
-        citation_count = sum(1 for indicator in citation_indicators if indicator in text_lower)
+        citation_count = analysis.count_present(CITATION_INDICATORS)
         if citation_count > 0:
             accuracy_score += min(0.15, citation_count * 0.05)
 
         # Content type specific adjustments
         if content_type in ['flashcards', 'faq_collection']:
             # These should have higher accuracy standards
-            if 'question' in text_lower and 'answer' in text_lower:
+            if analysis.contains('question') and analysis.contains('answer'):
                 # Check for Q&A consistency patterns
                 accuracy_score += 0.05
 
         # Numerical consistency checks
-        numbers = re.findall(r'\d+(?:\.\d+)?', text)
-        if len(numbers) > 0:
+        if NUMBER_PATTERN.search(text):
             # Basic sanity check for common mathematical relationships
             try:
                 # Simple validation for basic math expressions
@@ -529,59 +633,19 @@ class EducationalQualityAssessor:
 
         return max(0.0, min(1.0, accuracy_score))
 
-    async def _assess_blooms_taxonomy_alignment(self, text: str, age_group: str) -> float:
+    async def _assess_blooms_taxonomy_alignment(self, text: TextInput, age_group: str) -> float:
         """Assess alignment with Bloom's taxonomy cognitive levels"""
 
         if not text:
             return 0.5
 
-        text_lower = text.lower()
-
-        # Bloom's taxonomy keywords by level
-        blooms_keywords = {
-            'remember': [
-                'remember', 'recall', 'recognize', 'identify', 'define',
-                'describe', 'list', 'name', 'state', 'match'
-            ],
-            'understand': [
-                'understand', 'explain', 'interpret', 'summarize', 'classify',
-                'compare', 'contrast', 'demonstrate', 'illustrate'
-            ],
-            'apply': [
-                'apply', 'use', 'implement', 'execute', 'carry out',
-                'practice', 'solve', 'demonstrate', 'operate'
-            ],
-            'analyze': [
-                'analyze', 'examine', 'investigate', 'categorize', 'differentiate',
-                'distinguish', 'compare', 'contrast', 'break down'
-            ],
-            'evaluate': [
-                'evaluate', 'assess', 'judge', 'critique', 'justify',
-                'argue', 'defend', 'support', 'decide', 'recommend'
-            ],
-            'create': [
-                'create', 'design', 'develop', 'construct', 'produce',
-                'generate', 'build', 'compose', 'plan', 'formulate'
-            ]
-        }
+        analysis = self._analyze(text)
 
         # Expected levels by age group
-        age_expectations = {
-            'elementary': ['remember', 'understand', 'apply'],
-            'middle_school': ['remember', 'understand', 'apply', 'analyze'],
-            'high_school': ['understand', 'apply', 'analyze', 'evaluate'],
-            'college': ['apply', 'analyze', 'evaluate', 'create'],
-            'adult_learning': ['apply', 'analyze', 'evaluate', 'create'],
-            'general': ['understand', 'apply', 'analyze']
-        }
-
-        expected_levels = age_expectations.get(age_group, ['understand', 'apply'])
+        expected_levels = BLOOMS_AGE_EXPECTATIONS.get(age_group, DEFAULT_BLOOMS_LEVELS)
 
         # Count keywords by level
-        level_scores = {}
-        for level, keywords in blooms_keywords.items():
-            count = sum(1 for keyword in keywords if keyword in text_lower)
-            level_scores[level] = count
+        level_scores = {level: analysis.count_present(keywords) for level, keywords in BLOOMS_KEYWORDS.items()}
 
         # Calculate alignment score
         alignment_score = 0.0
@@ -680,16 +744,7 @@ class EducationalQualityAssessor:
         cognitive_appropriate = cognitive_load.get('appropriate_for_age', True)
         readability_score = readability.get('age_appropriateness_score', 0.5)
 
-        # Weight the different components according to La Factoria quality framework
-        weights = {
-            'educational_effectiveness': 0.30,  # Highest weight - pedagogical effectiveness
-            'factual_accuracy': 0.25,           # Critical for educational content
-            'readability': 0.15,                # Important for age appropriateness
-            'learning_alignment': 0.10,         # Learning objective alignment
-            'cognitive_load': 0.10,             # Age-appropriate cognitive complexity
-            'structural_quality': 0.05,         # Organization and clarity
-            'engagement': 0.05                  # Student engagement potential
-        }
+        weights = QUALITY_WEIGHTS
 
         # Calculate weighted score
         overall_score = (
@@ -725,7 +780,7 @@ class EducationalQualityAssessor:
             ],
             "assessment_metadata": {
                 "error": "Assessment failed - using default values",
-                "assessment_version": "2.0",
+                "assessment_version": ASSESSMENT_VERSION,
                 "assessed_at": str(datetime.now(timezone.utc))
             }
         }
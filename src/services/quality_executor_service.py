@@ -0,0 +1,158 @@
+"""
+Quality Assessment Executor for La Factoria
+Runs CPU-bound quality assessment either inline on the event loop or in a
+process pool, so long assessments do not stall other requests on the worker
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+from .quality_assessor import EducationalQualityAssessor
+
+logger = logging.getLogger(__name__)
+
+# Per-process state of pool workers, created once by _init_worker
+_worker_assessor: Optional[EducationalQualityAssessor] = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _init_worker():
+    """Pool initializer: build the assessor (and its keyword tables) once per worker process"""
+    global _worker_assessor, _worker_loop
+    _worker_assessor = EducationalQualityAssessor()
+    _worker_loop = asyncio.new_event_loop()
+
+
+def _warm_worker() -> int:
+    """No-op task that forces a worker process to start and initialize"""
+    return multiprocessing.current_process().pid
+
+
+def _assess_in_worker(
+    content: Dict[str, Any],
+    content_type: str,
+    age_group: str,
+    learning_objectives: Optional[List[Any]]
+) -> Dict[str, Any]:
+    """
+    Assess in a worker process
+
+    Inputs and the returned metrics are plain dicts, strings and dataclasses,
+    so they pickle across the process boundary. The assessor's coroutines do
+    no I/O and run to completion on the worker's private loop.
+    """
+    return _worker_loop.run_until_complete(
+        _worker_assessor.assess_content_quality(content, content_type, age_group, learning_objectives)
+    )
+
+
+class QualityAssessmentExecutor:
+    """
+    Execution mode for quality assessment
+
+    "inline" awaits the assessor on the event loop (the default). "process"
+    runs it in a pool of max_workers spawned processes: the loop stays free
+    to serve other requests, and concurrent assessments run in parallel. If
+    the pool breaks (a worker was killed), the pool is rebuilt and that
+    assessment runs inline.
+    """
+
+    def __init__(self, mode: str = "inline", max_workers: int = 2):
+        if mode not in ("inline", "process"):
+            raise ValueError(f"Unknown quality assessment mode: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.stats = {
+            "inline": 0,
+            "process": 0,
+            "fallbacks": 0,
+            "pool_restarts": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0
+        }
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process that runs an event loop and thread pools is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+        return self._pool
+
+    async def warm_up(self):
+        """Start and initialize every worker process so the first assessments skip process start-up"""
+        if self.mode != "process":
+            return
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        pids = await asyncio.gather(*(loop.run_in_executor(pool, _warm_worker) for _ in range(self.max_workers)))
+        logger.info(f"Quality assessment pool warmed up ({len(set(pids))} worker processes)")
+
+    async def assess(
+        self,
+        assessor: EducationalQualityAssessor,
+        content: Dict[str, Any],
+        content_type: str,
+        age_group: str,
+        learning_objectives: Optional[List[Any]] = None
+    ) -> Dict[str, Any]:
+        """Assess content in the configured mode; assessor is used for inline runs"""
+        start_time = time.perf_counter()
+        try:
+            if self.mode == "process":
+                pool = self._get_pool()
+                try:
+                    loop = asyncio.get_running_loop()
+                    result = await loop.run_in_executor(
+                        pool, _assess_in_worker, content, content_type, age_group, learning_objectives
+                    )
+                    self.stats["process"] += 1
+                    return result
+                except BrokenProcessPool as e:
+                    logger.error(f"Quality assessment pool broken, assessing inline: {e}")
+                    self._restart_pool(pool)
+                    self.stats["fallbacks"] += 1
+
+            self.stats["inline"] += 1
+            return await assessor.assess_content_quality(
+                content=content,
+                content_type=content_type,
+                age_group=age_group,
+                learning_objectives=learning_objectives
+            )
+        finally:
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            self.stats["total_ms"] += elapsed_ms
+            self.stats["max_ms"] = max(self.stats["max_ms"], elapsed_ms)
+
+    def _restart_pool(self, broken: ProcessPoolExecutor):
+        """Drop the broken pool, unless another failed assessment already replaced it"""
+        if self._pool is broken:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self.stats["pool_restarts"] += 1
+
+    def shutdown(self, wait: bool = False):
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get execution mode, pool size and assessment timings"""
+        assessments = self.stats["inline"] + self.stats["process"]
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers if self.mode == "process" else 0,
+            "pool_started": self._pool is not None,
+            "avg_ms": round(self.stats["total_ms"] / assessments, 2) if assessments else 0.0,
+            **{k: round(v, 2) if isinstance(v, float) else v for k, v in self.stats.items()}
+        }
@@ -0,0 +1,163 @@
+"""
+Quality Re-scoring Service for La Factoria
+Re-assess stored educational content after threshold or scoring changes:
+rows are streamed from the database in primary-key order, one chunk at a
+time, and scored with the vectorized batch assessor
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import String, bindparam, type_coerce, update
+
+from ..core.config import settings
+from ..models.educational import CognitiveLevel, EducationalContentDB, LearningObjective
+from .quality_assessor import EducationalQualityAssessor
+
+logger = logging.getLogger(__name__)
+
+# Primary key as stored: pages are keyed on the raw column value, which orders
+# consistently even when rows hold differently formatted UUID strings
+_ROW_KEY = type_coerce(EducationalContentDB.id, String)
+
+
+def row_objectives(values: Any) -> Optional[List[LearningObjective]]:
+    """Learning objectives stored on a row (LearningObjective.to_dict form), None when absent or unreadable"""
+    if not values:
+        return None
+    try:
+        return [
+            LearningObjective(
+                cognitive_level=CognitiveLevel(value["cognitive_level"]),
+                subject_area=value["subject_area"],
+                specific_skill=value["specific_skill"],
+                measurable_outcome=value.get("measurable_outcome", ""),
+                difficulty_level=value.get("difficulty_level", 5)
+            )
+            for value in values
+        ]
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class QualityRescoringJob:
+    """
+    Re-score every stored content row (optionally one content type)
+
+    Rows are read with keyset pagination on the primary key, so memory stays
+    bounded by chunk_size and updates made by the job never shift later pages.
+    Rows whose score or cognitive load metrics changed are updated, one
+    transaction per chunk; dry_run only reports.
+    """
+
+    def __init__(
+        self,
+        assessor: Optional[EducationalQualityAssessor] = None,
+        session_factory: Optional[Callable[[], Any]] = None,
+        chunk_size: int = None,
+        dry_run: bool = False
+    ):
+        self.assessor = assessor or EducationalQualityAssessor()
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size or settings.QUALITY_RESCORE_CHUNK_SIZE
+        self.dry_run = dry_run
+        self.stats = {"rows": 0, "chunks": 0, "changed": 0, "unscorable": 0, "newly_below_threshold": 0}
+
+    def run(
+        self,
+        content_type: Optional[str] = None,
+        progress_callback: Optional[Callable[[Dict[str, Any]], Any]] = None
+    ) -> Dict[str, Any]:
+        """Re-score all matching rows; returns a run summary"""
+        session_factory = self.session_factory
+        if session_factory is None:
+            from ..core.database import SessionLocal
+            session_factory = SessionLocal
+
+        start_time = time.perf_counter()
+        assess_seconds = 0.0
+        last_key = None
+        db = session_factory()
+        try:
+            while True:
+                query = db.query(
+                    _ROW_KEY.label("key"),
+                    EducationalContentDB.content_type,
+                    EducationalContentDB.age_group,
+                    EducationalContentDB.learning_objectives,
+                    EducationalContentDB.generated_content,
+                    EducationalContentDB.quality_score,
+                    EducationalContentDB.cognitive_load_metrics
+                ).order_by(_ROW_KEY)
+                if content_type:
+                    query = query.filter(EducationalContentDB.content_type == content_type)
+                if last_key is not None:
+                    query = query.filter(_ROW_KEY > last_key)
+                rows = query.limit(self.chunk_size).all()
+                if not rows:
+                    break
+
+                assess_start = time.perf_counter()
+                results = self.assessor.assess_many(
+                    [row.generated_content for row in rows],
+                    [row.content_type for row in rows],
+                    [row.age_group for row in rows],
+                    [row_objectives(row.learning_objectives) for row in rows]
+                )
+                assess_seconds += time.perf_counter() - assess_start
+
+                updates = self._changed_rows(rows, results)
+                if updates and not self.dry_run:
+                    db.execute(
+                        update(EducationalContentDB.__table__)
+                        .where(_ROW_KEY == bindparam("row_key"))
+                        .values(quality_score=bindparam("new_score"), cognitive_load_metrics=bindparam("new_metrics")),
+                        updates
+                    )
+                    db.commit()
+
+                last_key = rows[-1].key
+                self.stats["chunks"] += 1
+                if progress_callback:
+                    progress_callback(dict(self.stats))
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        elapsed = time.perf_counter() - start_time
+        logger.info(f"Re-scored {self.stats['rows']} rows in {elapsed:.1f}s ({self.stats['changed']} changed)")
+        return {
+            "content_type": content_type,
+            "dry_run": self.dry_run,
+            **self.stats,
+            "elapsed_seconds": round(elapsed, 2),
+            "assessment_seconds": round(assess_seconds, 2),
+            "rows_per_second": round(self.stats["rows"] / elapsed, 1) if elapsed > 0 else 0.0
+        }
+
+    def _changed_rows(self, rows, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Update parameters for rows whose stored score or cognitive load metrics differ"""
+        updates = []
+        for row, metrics in zip(rows, results):
+            self.stats["rows"] += 1
+            if "error" in metrics["assessment_metadata"]:
+                self.stats["unscorable"] += 1
+                continue
+
+            score = round(metrics["overall_quality_score"], 2)
+            stored = float(row.quality_score) if row.quality_score is not None else None
+            if stored == score and row.cognitive_load_metrics == metrics["cognitive_load_metrics"]:
+                continue
+
+            self.stats["changed"] += 1
+            if stored is not None and stored >= self.assessor.min_quality_threshold > score:
+                self.stats["newly_below_threshold"] += 1
+            updates.append({
+                "row_key": row.key,
+                "new_score": score,
+                "new_metrics": metrics["cognitive_load_metrics"]
+            })
+        return updates
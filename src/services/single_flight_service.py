@@ -0,0 +1,205 @@
+"""
+Single-flight Request Coalescing for La Factoria
+Identical concurrent operations (e.g. content generations) share one execution,
+in-process via shared futures and optionally across workers via a Redis lock
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Dict, Any, Optional, Callable, Tuple, Awaitable
+
+logger = logging.getLogger(__name__)
+
+# Release the single-flight lock only if this worker still owns it
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Seconds a published result stays readable for followers that subscribed too late to receive it
+RESULT_TTL = 30
+
+
+class LeaderCancelled(Exception):
+    """The leader's caller was cancelled before producing a result; followers retry instead"""
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent operations into one execution
+
+    In-process duplicates await the leader's shared future. With a Redis client,
+    workers also coordinate through a lock: followers in other workers wait for
+    the leader's result on a pub/sub channel instead of generating again.
+    Results travel as JSON, so every follower decodes its own copy and never
+    shares nested objects with the leader or other followers.
+    """
+
+    def __init__(self, redis_client=None, lock_timeout: int = 120):
+        self.redis_client = redis_client
+        self.lock_timeout = lock_timeout
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"leaders": 0, "coalesced": 0, "coalesced_remote": 0, "retries_after_cancel": 0}
+
+    async def do(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        timeout: Optional[float] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Run factory once per key among concurrent callers
+
+        Args:
+            key: Identity of the operation
+            factory: Coroutine factory run by the leader
+            timeout: Longest wait for another worker's result (defaults to lock_timeout)
+
+        Returns:
+            (result, is_leader) - is_leader is False for callers that reused another's result
+        """
+        while (future := self._inflight.get(key)) is not None:
+            try:
+                encoded = await asyncio.shield(future)
+            except LeaderCancelled:
+                # The leader's client went away: retry, becoming the new leader if nobody else has
+                self.stats["retries_after_cancel"] += 1
+                continue
+            self.stats["coalesced"] += 1
+            return json.loads(encoded), False
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result, is_leader = await self._run_leader(key, factory, timeout)
+        except asyncio.CancelledError:
+            # Never cancel followers: they belong to other, still healthy requests
+            future.set_exception(LeaderCancelled(key))
+            future.exception()  # Mark retrieved when no follower is waiting
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when no follower is waiting
+            raise
+        else:
+            # Encoded once; each in-process follower decodes its own copy
+            future.set_result(json.dumps(result, default=str))
+            return result, is_leader
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _run_leader(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        timeout: Optional[float]
+    ) -> Tuple[Any, bool]:
+        """Execute for the in-process leader, coordinating with other workers when distributed"""
+        if self.redis_client is None:
+            self.stats["leaders"] += 1
+            return await factory(), True
+
+        lock_key = f"singleflight:lock:{key}"
+        channel = f"singleflight:result:{key}"
+        result_key = f"singleflight:last:{key}"
+        token = uuid.uuid4().hex
+
+        try:
+            acquired = await self.redis_client.set(lock_key, token, nx=True, ex=self.lock_timeout)
+        except Exception as e:
+            logger.warning(f"Single-flight lock unavailable, generating locally: {e}")
+            acquired = None
+            lock_key = None
+
+        if not acquired and lock_key:
+            wait = self.lock_timeout if timeout is None else min(timeout, self.lock_timeout)
+            remote_result = await self._wait_for_remote_result(lock_key, channel, result_key, wait)
+            if remote_result is not None:
+                self.stats["coalesced_remote"] += 1
+                return remote_result, False
+
+        self.stats["leaders"] += 1
+        try:
+            result = await factory()
+        except Exception as e:
+            if acquired:
+                await self._publish(channel, result_key, {"__error__": str(e)})
+            raise
+        else:
+            if acquired:
+                await self._publish(channel, result_key, result)
+            return result, True
+        finally:
+            if acquired:
+                try:
+                    await self.redis_client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                except Exception as e:
+                    logger.warning(f"Single-flight lock release failed: {e}")
+
+    async def _publish(self, channel: str, result_key: str, payload: Any):
+        """Publish the leader's outcome to followers in other workers (stored first for late subscribers)"""
+        message = json.dumps(payload, default=str)
+        try:
+            await self.redis_client.set(result_key, message, ex=RESULT_TTL)
+            await self.redis_client.publish(channel, message)
+        except Exception as e:
+            logger.warning(f"Single-flight result publish failed: {e}")
+
+    async def _wait_for_remote_result(
+        self,
+        lock_key: str,
+        channel: str,
+        result_key: str,
+        timeout: float
+    ) -> Optional[Any]:
+        """Wait for another worker's result; None means generate locally instead"""
+        pubsub = self.redis_client.pubsub()
+        try:
+            await pubsub.subscribe(channel)
+
+            deadline = time.monotonic() + timeout
+            while True:
+                # The leader may have published before our subscription went live, or died
+                # holding the lock: once the lock is gone, only the stored result can arrive
+                if not await self.redis_client.exists(lock_key):
+                    stored = await self.redis_client.get(result_key)
+                    return self._decode_result(stored) if stored else None
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=min(1.0, remaining))
+                if message is not None:
+                    return self._decode_result(message["data"])
+
+        except Exception as e:
+            logger.warning(f"Waiting for single-flight result failed: {e}")
+            return None
+        finally:
+            try:
+                await pubsub.unsubscribe(channel)
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _decode_result(data: str) -> Optional[Any]:
+        """Decode a published outcome; a leader failure decodes to None"""
+        payload = json.loads(data)
+        if isinstance(payload, dict) and "__error__" in payload:
+            return None
+        return payload
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get leader and coalesced request counters"""
+        return {
+            **self.stats,
+            "in_flight": len(self._inflight),
+            "distributed": self.redis_client is not None
+        }
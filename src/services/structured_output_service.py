@@ -0,0 +1,197 @@
+"""
+Structured Output for La Factoria
+Per-content-type JSON schemas and the provider request options that make each
+provider return them natively (OpenAI JSON mode, Anthropic forced tool input,
+Gemini JSON response mode), so generated content needs no text extraction
+"""
+
+import json
+import logging
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+from ..models.content import CONTENT_TYPE_CONFIGS
+from ..models.educational import LaFactoriaContentType
+
+logger = logging.getLogger(__name__)
+
+_STRING = {"type": "string"}
+_NUMBER = {"type": "number"}
+_STRING_LIST = {"type": "array", "items": _STRING}
+
+
+def _object_list(properties: Dict[str, Any], required: list) -> Dict[str, Any]:
+    return {
+        "type": "array",
+        "items": {"type": "object", "properties": properties, "required": required}
+    }
+
+
+# Top-level fields (and required subset) of each content type, as specified by its prompt template
+CONTENT_FIELDS: Dict[str, tuple] = {
+    "master_content_outline": ({
+        "title": _STRING,
+        "overview": _STRING,
+        "learning_objectives": _STRING_LIST,
+        "sections": _object_list({
+            "section_number": {"type": "integer"},
+            "title": _STRING,
+            "description": _STRING,
+            "estimated_duration_minutes": _NUMBER,
+            "key_points": _STRING_LIST
+        }, ["section_number", "title", "description"]),
+        "estimated_total_duration": _NUMBER,
+        "target_audience": _STRING,
+        "difficulty_level": {"type": "string", "enum": ["beginner", "intermediate", "advanced"]}
+    }, ["title", "overview", "learning_objectives", "sections"]),
+    "podcast_script": ({
+        "title": _STRING,
+        "introduction": _STRING,
+        "main_content": _STRING,
+        "conclusion": _STRING,
+        "speaker_notes": _STRING_LIST,
+        "estimated_duration_minutes": _NUMBER
+    }, ["title", "introduction", "main_content", "conclusion"]),
+    "study_guide": ({
+        "title": _STRING,
+        "learning_objectives": _STRING_LIST,
+        "target_audience": _STRING,
+        "overview": _STRING,
+        "key_concepts": _STRING_LIST,
+        "detailed_content": _STRING,
+        "practice_exercises": _STRING_LIST,
+        "assessment_questions": _STRING_LIST,
+        "summary": _STRING,
+        "recommended_reading": _STRING_LIST
+    }, ["title", "learning_objectives", "overview", "key_concepts", "detailed_content", "summary"]),
+    "one_pager_summary": ({
+        "title": _STRING,
+        "executive_summary": _STRING,
+        "key_takeaways": _STRING_LIST,
+        "main_content": _STRING
+    }, ["title", "executive_summary", "key_takeaways", "main_content"]),
+    "detailed_reading_material": ({
+        "title": _STRING,
+        "introduction": _STRING,
+        "sections": _object_list({"title": _STRING, "content": _STRING}, ["title", "content"]),
+        "conclusion": _STRING,
+        "references": _STRING_LIST
+    }, ["title", "introduction", "sections", "conclusion"]),
+    "faq_collection": ({
+        "title": _STRING,
+        "items": _object_list(
+            {"question": _STRING, "answer": _STRING, "category": _STRING},
+            ["question", "answer"]
+        )
+    }, ["title", "items"]),
+    "flashcards": ({
+        "title": _STRING,
+        "items": _object_list({
+            "term": _STRING,
+            "definition": _STRING,
+            "category": _STRING,
+            "difficulty": {"type": "string", "enum": ["easy", "medium", "hard"]}
+        }, ["term", "definition"])
+    }, ["title", "items"]),
+    "reading_guide_questions": ({
+        "title": _STRING,
+        "questions": _STRING_LIST
+    }, ["title", "questions"])
+}
+
+# OpenAI models by the JSON mode they support; others (including gpt-4) rely on the prompt alone
+OPENAI_JSON_MODES = {
+    "gpt-4o": "json_schema",
+    "gpt-4o-mini": "json_schema",
+    "gpt-4-turbo": "json_object",
+    "gpt-3.5-turbo": "json_object"
+}
+
+# JSON Schema keywords the Gemini response_schema subset does not accept
+_GEMINI_UNSUPPORTED_KEYS = {"title", "additionalProperties"}
+
+
+@lru_cache(maxsize=None)
+def _cached_schema(content_type: str) -> Optional[str]:
+    fields = CONTENT_FIELDS.get(content_type)
+    if fields is None:
+        return None
+    properties, required = fields
+    info = CONTENT_TYPE_CONFIGS[LaFactoriaContentType(content_type)]
+    return json.dumps({
+        "type": "object",
+        "title": info.display_name,
+        "description": info.description,
+        "properties": properties,
+        "required": required,
+        "additionalProperties": True
+    })
+
+
+def content_schema(content_type: Optional[str]) -> Optional[Dict[str, Any]]:
+    """JSON schema for a content type's generated output, or None for unknown types"""
+    content_type = getattr(content_type, "value", content_type)
+    schema = _cached_schema(content_type) if isinstance(content_type, str) else None
+    return json.loads(schema) if schema else None
+
+
+def _enabled_schema(content_type: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not settings.AI_STRUCTURED_OUTPUT:
+        return None
+    return content_schema(content_type)
+
+
+def openai_structured_params(content_type: Optional[str], model: str) -> Dict[str, Any]:
+    """response_format for chat.completions.create, when the model supports a JSON mode"""
+    schema = _enabled_schema(content_type)
+    mode = OPENAI_JSON_MODES.get(model)
+    if schema is None or mode is None:
+        return {}
+    if mode == "json_object":
+        return {"response_format": {"type": "json_object"}}
+    return {"response_format": {
+        "type": "json_schema",
+        "json_schema": {"name": content_type, "description": schema["description"], "schema": schema}
+    }}
+
+
+def anthropic_structured_params(content_type: Optional[str]) -> Dict[str, Any]:
+    """Forced tool call whose input schema is the content schema (messages.create tools/tool_choice)"""
+    schema = _enabled_schema(content_type)
+    if schema is None:
+        return {}
+    return {
+        "tools": [{"name": content_type, "description": schema["description"], "input_schema": schema}],
+        "tool_choice": {"type": "tool", "name": content_type}
+    }
+
+
+def anthropic_response_text(message) -> str:
+    """Generated content of an Anthropic message: the forced tool input as JSON, else the text block"""
+    for block in message.content:
+        if getattr(block, "type", None) == "tool_use" and isinstance(block.input, dict):
+            return json.dumps(block.input)
+    return message.content[0].text
+
+
+def _gemini_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    converted = {}
+    for key, value in schema.items():
+        if key in _GEMINI_UNSUPPORTED_KEYS:
+            continue
+        if key == "properties":
+            # Keys here are field names (a field may be called "title"), not schema keywords
+            value = {name: _gemini_schema(field) for name, field in value.items()}
+        elif key == "items":
+            value = _gemini_schema(value)
+        converted[key] = value
+    return converted
+
+
+def vertex_structured_config(content_type: Optional[str]) -> Dict[str, Any]:
+    """generation_config entries for Gemini JSON responses constrained to the content schema"""
+    schema = _enabled_schema(content_type)
+    if schema is None:
+        return {}
+    return {"response_mime_type": "application/json", "response_schema": _gemini_schema(schema)}
@@ -0,0 +1,91 @@
+"""
+Text Analysis for La Factoria
+Tokenize content once per quality assessment: lowercased text, words,
+sentences, paragraphs, syllable counts and keyword presence, shared by every
+assessment dimension instead of each re-splitting the text
+"""
+
+from collections import Counter
+from typing import Iterable, Optional, Set
+
+_VOWELS = frozenset("aeiouy")
+
+
+def count_syllables(word: str) -> int:
+    """Simple syllable counting heuristic"""
+    word = word.lower()
+    count = 0
+    previous_was_vowel = False
+
+    for char in word:
+        is_vowel = char in _VOWELS
+        if is_vowel and not previous_was_vowel:
+            count += 1
+        previous_was_vowel = is_vowel
+
+    # Handle silent e
+    if word.endswith('e'):
+        count -= 1
+
+    return max(1, count)  # Every word has at least 1 syllable
+
+
+class KeywordMatcher:
+    """
+    Presence of a fixed keyword set in lowercased text, found once per analysis
+
+    Keywords are matched as substrings of the shared lowercased text. A single
+    combined (trie-shaped) regex scan measured slower than CPython's substring
+    search for this vocabulary on 50 KB texts, so each keyword is tested once
+    here instead of once per assessment dimension.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = frozenset(keywords)
+
+    def find(self, text: str) -> Set[str]:
+        """Keywords occurring anywhere in text"""
+        return {keyword for keyword in self.keywords if keyword in text}
+
+
+class TextAnalysis:
+    """Tokens and keyword presence of one text, computed once and read by every assessment dimension"""
+
+    def __init__(self, text: str, matcher: Optional[KeywordMatcher] = None):
+        self.text = text
+        self.lower = text.lower()
+        self.words = text.split()
+        self.word_count = len(self.words)
+        self.sentences = [s.strip() for s in text.split('.') if s.strip()]
+        self.paragraphs = text.split('\n\n')
+        self._matcher = matcher
+        self.keywords = matcher.find(self.lower) if matcher else set()
+        self._syllables: Optional[int] = None
+        self._sentence_words: Optional[int] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.text)
+
+    @property
+    def syllable_count(self) -> int:
+        """Total syllables, counted once per distinct word"""
+        if self._syllables is None:
+            self._syllables = sum(count_syllables(word) * n for word, n in Counter(self.words).items())
+        return self._syllables
+
+    @property
+    def sentence_word_count(self) -> int:
+        """Words across sentences (split on '.'), as used for average sentence length"""
+        if self._sentence_words is None:
+            self._sentence_words = sum(len(s.split()) for s in self.sentences)
+        return self._sentence_words
+
+    def contains(self, phrase: str) -> bool:
+        """Whether the lowercased text contains phrase (matcher keywords are answered from the scan)"""
+        if self._matcher is not None and phrase in self._matcher.keywords:
+            return phrase in self.keywords
+        return phrase in self.lower
+
+    def count_present(self, keywords: Iterable[str]) -> int:
+        """Number of the given keywords present in the text"""
+        return sum(1 for keyword in keywords if self.contains(keyword))
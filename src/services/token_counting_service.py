@@ -0,0 +1,227 @@
+"""
+Token Counting Service for La Factoria
+Local tokenizer counts for prompts and responses, used to size max_tokens to
+each model's context window, reject oversize requests before they reach a
+provider, and account for the exact token usage behind each request's cost
+"""
+
+import asyncio
+import logging
+import math
+import os
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+
+# Optional local BPE tokenizer (falls back to a character/word heuristic)
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# tiktoken downloads BPE files on first use; a persistent (or build-time seeded) cache avoids the download
+if settings.TIKTOKEN_CACHE_DIR:
+    os.environ.setdefault("TIKTOKEN_CACHE_DIR", settings.TIKTOKEN_CACHE_DIR)
+
+# Model used by each provider and its context window (prompt + completion tokens)
+PROVIDER_MODELS = {
+    "openai": "gpt-4",
+    "anthropic": "claude-3-5-sonnet-20241022",
+    "vertex_ai": "gemini-1.5-flash"
+}
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-4": 8192,
+    "claude-3-5-sonnet-20241022": 200_000,
+    "gemini-1.5-flash": 1_048_576
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Tokenizer per provider. Claude and Gemini tokenizers are not available offline;
+# cl100k_base is within a few percent for English educational text.
+PROVIDER_ENCODINGS = {"openai": "cl100k_base", "anthropic": "cl100k_base", "vertex_ai": "cl100k_base"}
+
+# Tokens added per chat request for message framing (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 12
+
+_HEURISTIC_PIECE = re.compile(r"\w+|[^\w\s]")
+
+
+class PromptTooLarge(ValueError):
+    """Raised before calling a provider when the prompt leaves no room for the completion"""
+
+    def __init__(self, message: str, prompt_tokens: int, context_window: int):
+        super().__init__(message)
+        self.prompt_tokens = prompt_tokens
+        self.context_window = context_window
+
+
+class TokenCounter:
+    """
+    Count tokens with a local tokenizer
+
+    Static prompt segments (identical for every request of a template) are
+    counted once and cached, so each request only tokenizes its dynamic tail.
+    Tokenizers are loaded by warm_up(); one still missing when a request needs it
+    is loaded in a worker thread while that request counts heuristically, so the
+    event loop never waits on the download.
+    """
+
+    def __init__(self, prefix_cache_size: int = 64):
+        self._encodings: Dict[str, Any] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._prefix_counts: "OrderedDict[tuple, int]" = OrderedDict()
+        self.prefix_cache_size = prefix_cache_size
+        self.stats = {"prefix_hits": 0, "prefix_misses": 0, "max_tokens_reduced": 0, "rejected_oversize": 0}
+
+    def _encoding(self, provider: Optional[str]):
+        if not TIKTOKEN_AVAILABLE:
+            return None
+        name = PROVIDER_ENCODINGS.get(str(getattr(provider, "value", provider)), "cl100k_base")
+        encoding = self._encodings.get(name)
+        if encoding is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is None:
+                encoding = self._load_encoding(name)
+            else:
+                self._load_in_background(loop, name)
+        return encoding or None
+
+    def _load_encoding(self, name: str):
+        """Load a tokenizer (blocking: the encoding file is downloaded on first use)"""
+        try:
+            encoding = tiktoken.get_encoding(name)
+        except Exception as e:
+            # Count heuristically if the file cannot be downloaded (e.g. offline)
+            logger.warning(f"Tokenizer {name} unavailable, using heuristic counts: {e}")
+            encoding = False
+        self._encodings[name] = encoding
+        return encoding
+
+    def _load_in_background(self, loop: asyncio.AbstractEventLoop, name: str):
+        """Load a tokenizer in a worker thread; requests count heuristically meanwhile"""
+        if name in self._loading:
+            return
+        future = loop.run_in_executor(None, self._load_encoding, name)
+        # Prefix counts taken meanwhile are heuristic: drop them once real counts are available
+        future.add_done_callback(lambda _: self._prefix_counts.clear())
+        self._loading[name] = future
+
+    async def warm_up(self):
+        """Load every provider's tokenizer off the event loop, before the first request"""
+        if not TIKTOKEN_AVAILABLE:
+            return
+        for name in sorted(set(PROVIDER_ENCODINGS.values())):
+            if name not in self._encodings:
+                await asyncio.to_thread(self._load_encoding, name)
+
+    def count(self, text: str, provider: Optional[str] = None) -> int:
+        """Tokens in text for the provider's tokenizer"""
+        if not text:
+            return 0
+        encoding = self._encoding(provider)
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+        # Roughly one token per short word or punctuation mark, more for long words
+        return sum(math.ceil(len(piece) / 4) for piece in _HEURISTIC_PIECE.findall(text))
+
+    def count_prompt(self, prompt: str, provider: Optional[str] = None) -> int:
+        """Prompt tokens, reusing the cached count of a segmented prompt's static prefix"""
+        static = getattr(prompt, "static", "")
+        if not static:
+            return self.count(prompt, provider)
+
+        key = (str(getattr(provider, "value", provider)), static)
+        static_count = self._prefix_counts.get(key)
+        if static_count is None:
+            self.stats["prefix_misses"] += 1
+            static_count = self.count(static, provider)
+            self._prefix_counts[key] = static_count
+            while len(self._prefix_counts) > self.prefix_cache_size:
+                self._prefix_counts.popitem(last=False)
+        else:
+            self.stats["prefix_hits"] += 1
+            self._prefix_counts.move_to_end(key)
+        return static_count + self.count(prompt.dynamic, provider)
+
+    def fit_max_tokens(self, prompt_tokens: int, max_tokens: int, provider: Optional[str] = None) -> int:
+        """
+        Completion budget that fits the provider model's context window
+
+        Returns max_tokens, reduced if prompt plus completion would overflow the
+        context. Raises PromptTooLarge if fewer than AI_MIN_COMPLETION_TOKENS remain.
+        """
+        model = PROVIDER_MODELS.get(str(getattr(provider, "value", provider)))
+        context_window = MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+        available = context_window - prompt_tokens - MESSAGE_OVERHEAD_TOKENS
+        if available < min(max_tokens, settings.AI_MIN_COMPLETION_TOKENS):
+            self.stats["rejected_oversize"] += 1
+            raise PromptTooLarge(
+                f"Prompt of {prompt_tokens} tokens leaves {max(available, 0)} of {context_window} "
+                f"context tokens for {model or provider}",
+                prompt_tokens,
+                context_window
+            )
+        if available < max_tokens:
+            self.stats["max_tokens_reduced"] += 1
+            return available
+        return max_tokens
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tokenizer and static-prefix cache statistics"""
+        return {
+            "tokenizer": "tiktoken" if TIKTOKEN_AVAILABLE else "heuristic",
+            "cached_prefixes": len(self._prefix_counts),
+            **self.stats
+        }
+
+
+def response_token_usage(ai_response) -> Dict[str, int]:
+    """
+    Prompt, completion and prompt-cache tokens of a provider response
+
+    Normalizes OpenAI (prompt/completion), Anthropic (input/output, excluding
+    cache reads and writes) and Vertex AI usage metadata.
+    """
+    metadata = getattr(ai_response, "metadata", None)
+    metadata = metadata if isinstance(metadata, dict) else {}
+
+    def count(key) -> int:
+        value = metadata.get(key)
+        return value if isinstance(value, int) else 0
+
+    cached, created = count("cached_tokens"), count("cache_creation_tokens")
+    if "input_tokens" in metadata:
+        prompt_tokens, completion_tokens = count("input_tokens") + cached + created, count("output_tokens")
+    else:
+        prompt_tokens, completion_tokens = count("prompt_tokens"), count("completion_tokens")
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cached_tokens": cached,
+        "cache_creation_tokens": created
+    }
+
+
+def vertex_token_usage(usage_metadata, prompt: str, content: str) -> Dict[str, int]:
+    """Prompt and completion tokens from Gemini usage metadata, counted locally when it is missing"""
+    def count(name) -> int:
+        value = getattr(usage_metadata, name, None)
+        return value if isinstance(value, int) else 0
+
+    prompt_tokens, completion_tokens = count("prompt_token_count"), count("candidates_token_count")
+    if not (prompt_tokens or completion_tokens):
+        prompt_tokens = token_counter.count(prompt, "vertex_ai")
+        completion_tokens = token_counter.count(content, "vertex_ai")
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}
+
+
+# Shared counter so static-prefix counts are reused across services
+token_counter = TokenCounter()
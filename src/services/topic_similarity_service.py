@@ -0,0 +1,214 @@
+"""
+Topic Similarity Index for La Factoria
+Offline MinHash/LSH index over cached topics for near-duplicate cache lookups
+(e.g. "Photosynthesis basics" and "basics of photosynthesis")
+"""
+
+import hashlib
+import logging
+import random
+import re
+import sys
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Mersenne prime for the universal hash family used as MinHash permutations
+_MERSENNE_PRIME = (1 << 61) - 1
+
+# Words that do not change what a topic is about
+TOPIC_STOPWORDS = frozenset({
+    "a", "an", "and", "the", "of", "in", "on", "for", "to", "with", "about",
+    "into", "by", "at", "from", "its", "their", "how", "what", "why", "is", "are"
+})
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def topic_tokens(topic: str) -> FrozenSet[str]:
+    """Normalize a topic to its set of content words (lowercased, stopwords dropped, crude plural stemming)"""
+    tokens = set()
+    for token in _TOKEN_PATTERN.findall(topic.lower()):
+        if token in TOPIC_STOPWORDS:
+            continue
+        if len(token) > 4 and token.endswith("ies"):
+            token = token[:-3] + "y"
+        elif len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.add(token)
+    return frozenset(tokens)
+
+
+class TopicSimilarityIndex:
+    """
+    MinHash signatures with LSH banding, partitioned by content type/age group
+
+    Lookups only compare against topics sharing at least one LSH band, so cost is
+    independent of the number of cached topics. Candidates are verified with exact
+    Jaccard similarity of their token sets.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        max_entries: int = 100_000,
+        num_perm: int = 32,
+        bands: int = 8,
+        max_vocabulary: Optional[int] = None
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_vocabulary = max_vocabulary or max_entries
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = random.Random(2024)  # Fixed seed: signatures are stable across restarts
+        self._permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        # Signatures of indexed tokens only, LRU-bounded so evicted topics' vocabulary ages out
+        self._token_signatures: "OrderedDict[str, Tuple[int, ...]]" = OrderedDict()
+
+        # partition -> band key -> entry id, or list of ids once a bucket is shared
+        # (most buckets hold one topic; a bare int keeps large indexes compact)
+        self._buckets: Dict[str, Dict[int, Union[int, List[int]]]] = {}
+        # entry id -> (partition, topic); insertion order drives eviction
+        self._entries: "OrderedDict[int, Tuple[str, str]]" = OrderedDict()
+        self._entry_ids: Dict[Tuple[str, str], int] = {}
+        self._next_id = 0
+        self.stats = {"lookups": 0, "matches": 0, "candidates_checked": 0, "evictions": 0}
+
+    def add(self, partition: str, topic: str):
+        """Index a cached topic"""
+        tokens = topic_tokens(topic)
+        identity = (partition, self._identity(tokens))
+        if not tokens or identity in self._entry_ids:
+            return
+
+        partition = sys.intern(partition)
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (partition, topic)
+        self._entry_ids[identity] = entry_id
+
+        buckets = self._buckets.setdefault(partition, {})
+        for band_key in self._band_keys(tokens, cache=True):
+            bucket = buckets.get(band_key)
+            if bucket is None:
+                buckets[band_key] = entry_id
+            elif isinstance(bucket, list):
+                bucket.append(entry_id)
+            else:
+                buckets[band_key] = [bucket, entry_id]
+
+        while len(self._entries) > self.max_entries:
+            oldest_id = next(iter(self._entries))
+            self._remove_entry(oldest_id)
+            self.stats["evictions"] += 1
+
+    def lookup(self, partition: str, topic: str) -> Optional[Tuple[str, float]]:
+        """
+        Find the most similar indexed topic in a partition
+
+        Returns:
+            (cached_topic, jaccard_similarity) at or above the threshold, else None
+        """
+        self.stats["lookups"] += 1
+        buckets = self._buckets.get(partition)
+        tokens = topic_tokens(topic)
+        if not buckets or not tokens:
+            return None
+
+        candidates = set()
+        for band_key in self._band_keys(tokens):
+            bucket = buckets.get(band_key)
+            if bucket is None:
+                continue
+            if isinstance(bucket, list):
+                candidates.update(bucket)
+            else:
+                candidates.add(bucket)
+
+        best = None
+        for entry_id in candidates:
+            cached_topic = self._entries[entry_id][1]
+            cached_tokens = topic_tokens(cached_topic)
+            similarity = len(tokens & cached_tokens) / len(tokens | cached_tokens)
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (cached_topic, similarity)
+
+        self.stats["candidates_checked"] += len(candidates)
+        if best:
+            self.stats["matches"] += 1
+        return best
+
+    def remove(self, partition: str, topic: str):
+        """Drop a topic (e.g. when its cache entry has expired)"""
+        entry_id = self._entry_ids.get((partition, self._identity(topic_tokens(topic))))
+        if entry_id is not None:
+            self._remove_entry(entry_id)
+
+    def _remove_entry(self, entry_id: int):
+        partition, topic = self._entries.pop(entry_id)
+        tokens = topic_tokens(topic)
+        self._entry_ids.pop((partition, self._identity(tokens)), None)
+
+        buckets = self._buckets[partition]
+        for band_key in self._band_keys(tokens):
+            bucket = buckets.get(band_key)
+            if isinstance(bucket, list):
+                bucket.remove(entry_id)
+                if len(bucket) == 1:
+                    buckets[band_key] = bucket[0]
+            elif bucket == entry_id:
+                del buckets[band_key]
+
+    @staticmethod
+    def _identity(tokens: FrozenSet[str]) -> str:
+        """Order-independent string form of a token set (topics with equal tokens are duplicates)"""
+        return " ".join(sorted(tokens))
+
+    def _band_keys(self, tokens: FrozenSet[str], cache: bool = False) -> List[int]:
+        """MinHash signature of a token set, hashed per LSH band"""
+        token_signatures = [self._token_signature(token, cache) for token in tokens]
+        signature = token_signatures[0] if len(token_signatures) == 1 else tuple(map(min, *token_signatures))
+        rows = self.rows
+        return [hash((band, signature[band * rows:(band + 1) * rows])) for band in range(self.bands)]
+
+    def _token_signature(self, token: str, cache: bool = False) -> Tuple[int, ...]:
+        """
+        Permuted hashes of a single token (signature of a set is their element-wise min)
+
+        Only indexing caches new tokens; lookup topics are user input and would grow the cache without bound.
+        """
+        signature = self._token_signatures.get(token)
+        if signature is not None:
+            self._token_signatures.move_to_end(token)
+            return signature
+
+        token_hash = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "big")
+        signature = tuple((a * token_hash + b) % _MERSENNE_PRIME for a, b in self._permutations)
+        if cache:
+            self._token_signatures[token] = signature
+            if len(self._token_signatures) > self.max_vocabulary:
+                self._token_signatures.popitem(last=False)
+        return signature
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get index size and lookup counters"""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "partitions": len(self._buckets),
+            "vocabulary": len(self._token_signatures),
+            "max_vocabulary": self.max_vocabulary,
+            **self.stats
+        }
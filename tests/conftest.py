@@ -365,9 +365,13 @@ def mock_ai_providers(mock_openai_response, mock_anthropic_response, sample_gene
         prompt = ""
         for msg in messages:
             if msg.get('role') == 'user':
-                prompt = msg.get('content', '').lower()
+                content = msg.get('content', '')
+                if isinstance(content, list):
+                    # Content blocks (static prompt prefix marked for caching + dynamic tail)
+                    content = "".join(block.get('text', '') for block in content)
+                prompt = content.lower()
                 break
-        
+
         # Return high quality content to ensure tests pass quality thresholds
         if "study_guide" in prompt:
             content = json.dumps(sample_generated_content["study_guide"])
@@ -399,12 +403,19 @@ def mock_ai_providers(mock_openai_response, mock_anthropic_response, sample_gene
         mock_manager_instance.generate_content = AsyncMock(side_effect=mock_generate_content)
         mock_ai_manager.return_value = mock_manager_instance
 
+        # The app shares one content service via app.state; drop it so the next
+        # request rebuilds it with the mocked provider clients
+        previous_service = getattr(app.state, "content_service", None)
+        app.state.content_service = None
+
         yield {
             "openai": mock_openai_instance,
             "anthropic": mock_anthropic_instance,
             "manager": mock_manager_instance
         }
 
+        app.state.content_service = previous_service
+
 # === Service Fixtures ===
 
 @pytest_asyncio.fixture
@@ -23,6 +23,7 @@ import statistics
 from typing import List, Dict, Any
 from unittest.mock import patch, AsyncMock
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from types import SimpleNamespace
 
 from src.services.educational_content_service import EducationalContentService
 from src.services.quality_assessor import EducationalQualityAssessor
@@ -653,3 +654,490 @@ class TestPerformanceRegression:
         # Baseline should meet requirements (with mocked AI providers should be very fast)
         assert avg_time < 5.0, f"Baseline average: {avg_time:.3f}s"
         assert max_time < 10.0, f"Baseline max: {max_time:.3f}s"
+
+
+class TestSharedServiceOverhead:
+    """Per-request overhead removed by the process-wide content service"""
+
+    @pytest.mark.performance
+    @pytest.mark.asyncio
+    async def test_shared_service_vs_per_request_construction(self):
+        """Benchmark acquiring the content service per request vs from app.state"""
+        from src.api.routes.content_generation import get_content_service
+
+        iterations = 20
+
+        # Previous behaviour: build and initialize a new service for every request
+        services = []
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            service = EducationalContentService()
+            await service.initialize()
+            services.append(service)
+        per_request_time = (time.perf_counter() - start_time) / iterations
+
+        for service in services:
+            await service.close()
+
+        # Current behaviour: one shared service stored on app.state
+        request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace()))
+        shared_service = await get_content_service(request)
+
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            assert await get_content_service(request) is shared_service
+        shared_time = (time.perf_counter() - start_time) / iterations
+
+        await shared_service.close()
+
+        print(
+            f"Content service acquisition - per-request: {per_request_time * 1000:.3f}ms, "
+            f"shared: {shared_time * 1000:.3f}ms"
+        )
+
+        assert shared_time < per_request_time
+
+
+class TestPromptCompilationCache:
+    """Prompt rendering with and without the compiled template cache"""
+
+    @pytest.mark.performance
+    @pytest.mark.asyncio
+    async def test_cached_compile_vs_recompiling_every_request(self):
+        """Benchmark re-parsing the template per request vs reusing the compiled template"""
+        from src.services.prompt_loader import PromptTemplateLoader
+
+        loader = PromptTemplateLoader()
+        await loader.initialize()
+
+        template_content = await loader.load_template("study_guide")
+        variables = {"topic": "Photosynthesis", "age_group": "high_school"}
+        iterations = 200
+
+        # Previous behaviour: compile the template source on every render
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            uncached = loader.jinja_env.from_string(template_content).render(**variables).strip()
+        uncached_time = (time.perf_counter() - start_time) / iterations
+
+        # Current behaviour: compiled template reused from the cache
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            cached = loader.compile_template(template_content, variables)
+        cached_time = (time.perf_counter() - start_time) / iterations
+
+        print(
+            f"Prompt render - recompiled: {uncached_time * 1000:.3f}ms, "
+            f"cached: {cached_time * 1000:.3f}ms"
+        )
+
+        assert cached == uncached
+        assert loader.compile_stats["misses"] == 1
+        assert cached_time < uncached_time
+
+
+class TestTwoTierCacheLatency:
+    """Content cache lookups served in-process vs decoded from Redis"""
+
+    @pytest.mark.performance
+    @pytest.mark.asyncio
+    async def test_l1_hit_vs_l2_decode(self):
+        """Benchmark an L1 hit against an L2 hit that has to decode the JSON payload"""
+        import json
+        from src.services.cache_service import CacheService
+
+        content = {
+            "id": "bench",
+            "generated_content": {"sections": [{"title": f"Section {i}", "content": "text " * 200} for i in range(50)]},
+            "quality_metrics": {"overall_quality_score": 0.85},
+            "metadata": {}
+        }
+        cache_service = CacheService()
+        cache_service.cache_enabled = False
+        await cache_service.set_content_cache("study_guide", "Benchmark", "college", content)
+        payload = json.dumps(content)
+        iterations = 200
+
+        # L2 path: network round-trip excluded, only json.loads of the payload
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            json.loads(payload)
+        l2_time = (time.perf_counter() - start_time) / iterations
+
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            cached = await cache_service.get_content_cache("study_guide", "Benchmark", "college")
+        l1_time = (time.perf_counter() - start_time) / iterations
+
+        print(
+            f"Content cache hit ({len(payload) // 1024}KB) - L2 decode: {l2_time * 1000:.3f}ms, "
+            f"L1: {l1_time * 1000:.3f}ms"
+        )
+
+        assert cached["metadata"]["cache_tier"] == "l1"
+        assert l1_time < l2_time
+
+
+class TestTopicSimilarityLookup:
+    """Near-duplicate topic lookup latency at scale"""
+
+    @pytest.mark.performance
+    def test_similarity_lookup_latency_with_large_index(self):
+        """Benchmark LSH lookups against a large index (set LA_FACTORIA_SIMILARITY_BENCH_ENTRIES=1000000 for 1M)"""
+        import random
+        from src.services.topic_similarity_service import TopicSimilarityIndex
+
+        entries = int(os.environ.get("LA_FACTORIA_SIMILARITY_BENCH_ENTRIES", "100000"))
+        rng = random.Random(7)
+        vocabulary = [f"term{i}" for i in range(20000)]
+        partition = "study_guide:high_school:"
+
+        index = TopicSimilarityIndex(max_entries=entries)
+        sample_topics = []
+        for i in range(entries):
+            topic = " ".join(rng.sample(vocabulary, 4))
+            index.add(partition, topic)
+            if i % max(entries // 200, 1) == 0:
+                sample_topics.append(topic)
+
+        # Reworded duplicates (reversed order plus stopwords) should all hit
+        start_time = time.perf_counter()
+        matches = [index.lookup(partition, "the " + " of ".join(reversed(t.split()))) for t in sample_topics]
+        hit_time = (time.perf_counter() - start_time) / len(sample_topics)
+
+        start_time = time.perf_counter()
+        for _ in range(200):
+            index.lookup(partition, " ".join(rng.sample(vocabulary, 4)))
+        miss_time = (time.perf_counter() - start_time) / 200
+
+        print(
+            f"Topic similarity lookup ({len(index)} entries) - hit: {hit_time * 1e6:.1f}us, "
+            f"miss: {miss_time * 1e6:.1f}us"
+        )
+
+        assert all(match is not None for match in matches)
+        assert hit_time < 0.005
+
+
+class TestStreamingTimeToFirstByte:
+    """Time to first byte of streamed vs blocking generation"""
+
+    @pytest.mark.performance
+    @pytest.mark.asyncio
+    async def test_streamed_first_token_precedes_full_generation(self):
+        """With a provider emitting 20 tokens over ~200ms, streaming surfaces the first token early"""
+        from src.services.ai_providers import AIStreamChunk, AIResponse
+
+        token_delay = 0.01
+        deltas = ['{"title": "Cells", "content": "'] + ["word " for _ in range(18)] + ['"}']
+        full_text = "".join(deltas)
+        final_response = AIResponse(
+            content=full_text, provider="openai", model="gpt-4",
+            tokens_used=len(deltas), generation_time=0.0, metadata={}
+        )
+
+        async def provider_stream(**kwargs):
+            for delta in deltas:
+                await asyncio.sleep(token_delay)
+                yield AIStreamChunk(text=delta)
+            yield AIStreamChunk(text="", done=True, response=final_response)
+
+        async def blocking_generation(**kwargs):
+            await asyncio.sleep(token_delay * len(deltas))
+            return final_response
+
+        service = EducationalContentService()
+        await service.initialize()
+        service.cache_service.cache_enabled = False
+        service.ai_provider.stream_content = provider_stream
+        service.ai_provider.generate_content = AsyncMock(side_effect=blocking_generation)
+
+        start_time = time.perf_counter()
+        await service.generate_content("flashcards", "Cell Biology Blocking", "high_school")
+        blocking_ttfb = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        streamed_ttfb = None
+        async for event in service.generate_content_stream("flashcards", "Cell Biology Streamed", "high_school"):
+            if streamed_ttfb is None:
+                streamed_ttfb = time.perf_counter() - start_time
+        streamed_total = time.perf_counter() - start_time
+
+        print(
+            f"Time to first byte - blocking: {blocking_ttfb * 1000:.1f}ms, "
+            f"streamed: {streamed_ttfb * 1000:.1f}ms (stream complete: {streamed_total * 1000:.1f}ms)"
+        )
+
+        assert event["event"] == "complete"
+        assert streamed_ttfb < blocking_ttfb / 4
+
+
+class TestHedgedTailLatency:
+    """Tail latency with and without hedging against a provider with slow outliers"""
+
+    @pytest.mark.performance
+    @pytest.mark.asyncio
+    async def test_hedging_cuts_p99_latency(self):
+        """5% of primary calls take 0.2s; hedging after p95 brings p99 down to roughly p95 + hedge time"""
+        import random
+        from src.services.ai_providers import AIProviderManager, AIProviderType, AIResponse
+        from src.services.provider_routing_service import ProviderRouter
+        from src.services.provider_hedging_service import HedgingPolicy
+        from src.services.provider_circuit_breaker_service import CircuitBreaker
+        from src.services.provider_admission_service import ProviderAdmissionController
+        from src.services.provider_retry_service import RetryPolicy, RetryPolicyResolver
+
+        rng = random.Random(7)
+        response = AIResponse(content="{}", provider="openai", model="gpt-4", tokens_used=100,
+                              generation_time=0.0, metadata={})
+
+        async def primary(prompt, max_tokens, content_type=None):
+            await asyncio.sleep(0.2 if rng.random() < 0.05 else 0.01)
+            return response
+
+        async def secondary(prompt, max_tokens, content_type=None):
+            await asyncio.sleep(0.01)
+            return response
+
+        async def measure(hedging_enabled):
+            manager = AIProviderManager.__new__(AIProviderManager)
+            manager.providers = {AIProviderType.OPENAI: object(), AIProviderType.ANTHROPIC: object()}
+            manager.current_provider = AIProviderType.OPENAI
+            manager.provider_stats = {p: {"requests": 0, "successes": 0, "failures": 0, "total_tokens": 0,
+                                          "avg_response_time": 0.0} for p in manager.providers}
+            manager.router = ProviderRouter()
+            manager.hedging = HedgingPolicy(max_hedge_fraction=0.2)
+            manager.circuit_breakers = {p: CircuitBreaker(p.value) for p in manager.providers}
+            manager.admission = ProviderAdmissionController(max_concurrent=50, provider_limits={})
+            manager.retry_policies = RetryPolicyResolver(RetryPolicy(
+                deadline=10, attempt_timeout=10, max_retries=0, backoff_base=0.0, backoff_cap=0.0
+            ))
+            manager.retry_stats = {"retries": 0, "attempt_timeouts": 0, "deadline_exceeded": 0}
+            for _ in range(50):
+                manager.router.record_success(AIProviderType.OPENAI, "flashcards", 0.03, 100)
+            manager._generate_with_openai = primary
+            manager._generate_with_anthropic = secondary
+
+            async def timed():
+                start_time = time.perf_counter()
+                await manager.generate_content("prompt", "flashcards")
+                return time.perf_counter() - start_time
+
+            latencies = []
+            with patch("src.services.ai_providers.settings.AI_HEDGING_ENABLED", hedging_enabled, create=True):
+                for _ in range(20):  # 200 requests arriving 10 at a time
+                    latencies.extend(await asyncio.gather(*[timed() for _ in range(10)]))
+            latencies.sort()
+            return latencies[int(0.99 * len(latencies))], manager.hedging.get_stats()
+
+        p99_plain, _ = await measure(False)
+        p99_hedged, hedge_stats = await measure(True)
+
+        print(
+            f"p99 latency - no hedging: {p99_plain * 1000:.1f}ms, hedged: {p99_hedged * 1000:.1f}ms "
+            f"(hedge rate {hedge_stats['hedge_rate']:.1%}, hedge win rate {hedge_stats['hedge_win_rate']:.1%})"
+        )
+
+        assert p99_hedged < p99_plain / 2
+        assert hedge_stats["hedge_rate"] <= 0.2
+
+
+class TestSharedTextAnalysis:
+    """Quality assessment of long reading material with one shared tokenization"""
+
+    @pytest.mark.performance
+    @pytest.mark.asyncio
+    async def test_shared_analysis_vs_per_dimension_tokenization(self):
+        """Benchmark a 50KB assessment: each dimension re-tokenizing vs one TextAnalysis for all"""
+        import random
+
+        rng = random.Random(11)
+        sentences = [
+            "Photosynthesis converts light energy into chemical energy stored in glucose.",
+            "For example, students can measure oxygen bubbles released by pond weed under a lamp.",
+            "According to research, chlorophyll absorbs mostly red and blue wavelengths.",
+            "Try to explain why leaves change colour in autumn before reading further.",
+            "Compare the light-dependent reactions with the Calvin cycle and identify their inputs.",
+            "Scientists believe the process evolved in cyanobacteria billions of years ago.",
+            "What limits the rate of photosynthesis on a cold but bright winter day?"
+        ]
+        sections = []
+        while sum(len(section["content"]) for section in sections) < 50_000:
+            paragraphs = ["\n".join(rng.choice(sentences) for _ in range(6)) for _ in range(4)]
+            sections.append({"title": f"Section {len(sections) + 1}", "content": "\n\n".join(paragraphs)})
+        content = {"title": "Photosynthesis in Depth", "introduction": sentences[0], "sections": sections}
+
+        assessor = EducationalQualityAssessor()
+        text = assessor._extract_text_content(content)
+        iterations = 10
+
+        # Raw text to every dimension: each builds its own tokens, lowercase copy and keyword scan
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            per_dimension = await asyncio.gather(
+                assessor._assess_cognitive_load(text, "high_school"),
+                assessor._assess_readability(text, "high_school"),
+                assessor._assess_educational_effectiveness(content, "detailed_reading_material"),
+                assessor._assess_learning_objective_alignment(content, None),
+                assessor._assess_engagement_elements(text),
+                assessor._assess_structural_quality(text, "detailed_reading_material"),
+                assessor._assess_factual_accuracy(text, "detailed_reading_material"),
+                assessor._assess_blooms_taxonomy_alignment(text, "high_school")
+            )
+        per_dimension_time = (time.perf_counter() - start_time) / iterations
+
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            result = await assessor.assess_content_quality(content, "detailed_reading_material", "high_school")
+        shared_time = (time.perf_counter() - start_time) / iterations
+
+        print(
+            f"Quality assessment ({len(text) // 1024}KB) - per-dimension analysis: "
+            f"{per_dimension_time * 1000:.1f}ms, shared analysis: {shared_time * 1000:.1f}ms"
+        )
+
+        assert result["readability_score"] == per_dimension[1]
+        assert result["factual_accuracy"] == per_dimension[6]
+        assert result["blooms_taxonomy_alignment"] == per_dimension[7]
+        assert shared_time < per_dimension_time
+
+
+class TestQualityAssessmentEventLoopLag:
+    """Event-loop responsiveness while long content is assessed concurrently"""
+
+    @pytest.mark.performance
+    @pytest.mark.asyncio
+    async def test_process_pool_keeps_event_loop_responsive(self):
+        """Benchmark loop lag with 50KB assessments run inline vs in the worker pool"""
+        from src.services.event_loop_monitor_service import EventLoopLagMonitor
+        from src.services.quality_executor_service import QualityAssessmentExecutor
+
+        paragraph = (
+            "Photosynthesis converts light energy into chemical energy stored in glucose. "
+            "For example, students can measure oxygen released by pond weed under a lamp. "
+            "According to research, chlorophyll absorbs mostly red and blue wavelengths.\n\n"
+        )
+        content = {
+            "title": "Photosynthesis in Depth",
+            "sections": [{"title": f"Section {i}", "content": paragraph * 5} for i in range(50)]
+        }
+        assessor = EducationalQualityAssessor()
+
+        async def lag_under_load(executor):
+            monitor = EventLoopLagMonitor(interval=0.002)
+            monitor.start()
+            start_time = time.perf_counter()
+            results = await asyncio.gather(*[
+                executor.assess(assessor, content, "detailed_reading_material", "high_school") for _ in range(8)
+            ])
+            elapsed = time.perf_counter() - start_time
+            await monitor.stop()
+            return monitor.get_stats(), elapsed, results
+
+        inline_lag, inline_time, inline_results = await lag_under_load(QualityAssessmentExecutor(mode="inline"))
+
+        pool = QualityAssessmentExecutor(mode="process", max_workers=2)
+        try:
+            await pool.warm_up()
+            pool_lag, pool_time, pool_results = await lag_under_load(pool)
+        finally:
+            pool.shutdown(wait=True)
+
+        print(
+            f"8 concurrent 50KB assessments - inline: max lag {inline_lag['max_lag_ms']:.1f}ms "
+            f"(p99 {inline_lag['p99_lag_ms']:.1f}ms, {inline_time * 1000:.0f}ms total); "
+            f"process pool: max lag {pool_lag['max_lag_ms']:.1f}ms "
+            f"(p99 {pool_lag['p99_lag_ms']:.1f}ms, {pool_time * 1000:.0f}ms total)"
+        )
+
+        assert pool_results[0]["overall_quality_score"] == inline_results[0]["overall_quality_score"]
+        assert pool_lag["max_lag_ms"] < inline_lag["max_lag_ms"]
+
+
+class TestBatchQualityScoring:
+    """Bulk re-assessment of stored content with vectorized scoring"""
+
+    @pytest.mark.performance
+    @pytest.mark.asyncio
+    async def test_assess_many_vs_per_document_assessment(self):
+        """Benchmark re-scoring 2,000 short documents one at a time vs in one assess_many batch"""
+        import random
+
+        rng = random.Random(7)
+        sentences = [
+            "Photosynthesis converts light energy into chemical energy.",
+            "For example, measure the oxygen released by pond weed.",
+            "According to research, chlorophyll absorbs red and blue light.",
+            "Try to explain why leaves change colour in autumn.",
+            "What limits the rate of photosynthesis in winter?",
+            "Compare and contrast the two stages of the process."
+        ]
+        content_types = ["flashcards", "study_guide", "faq_collection", "one_pager_summary"]
+        age_groups = ["elementary", "middle_school", "high_school", "college"]
+        contents = [
+            {"title": f"Topic {i}", "content": " ".join(rng.choice(sentences) for _ in range(rng.randint(2, 8)))}
+            for i in range(2000)
+        ]
+        types = [rng.choice(content_types) for _ in contents]
+        ages = [rng.choice(age_groups) for _ in contents]
+        assessor = EducationalQualityAssessor()
+
+        start_time = time.perf_counter()
+        scalar = [
+            await assessor.assess_content_quality(content, content_type, age_group)
+            for content, content_type, age_group in zip(contents, types, ages)
+        ]
+        scalar_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        batch = assessor.assess_many(contents, types, ages)
+        batch_time = time.perf_counter() - start_time
+
+        print(
+            f"Quality scoring of {len(contents)} documents - per document: {scalar_time * 1000:.0f}ms, "
+            f"assess_many: {batch_time * 1000:.0f}ms ({scalar_time / batch_time:.1f}x)"
+        )
+
+        assert [r["overall_quality_score"] for r in batch] == [r["overall_quality_score"] for r in scalar]
+        assert batch_time < scalar_time
+
+
+class TestIncrementalQualityScoring:
+    """Quality scores kept current while content streams in"""
+
+    @pytest.mark.performance
+    @pytest.mark.asyncio
+    async def test_incremental_vs_full_reassessment(self):
+        """Benchmark rescoring a streamed 60 KB document after every chunk: full re-assessment vs running aggregates"""
+        from src.services.incremental_quality_assessor import IncrementalQualityAssessor
+
+        paragraph = (
+            "Photosynthesis converts light energy into chemical energy. For instance, you can cover a leaf and "
+            "observe it in real life. According to research, the process happens in chloroplasts. Why?\n\n"
+        )
+        text = paragraph * 300
+        chunks = [text[i:i + 200] for i in range(0, len(text), 200)]
+        assessor = EducationalQualityAssessor()
+
+        start_time = time.perf_counter()
+        streamed = ""
+        for chunk in chunks:
+            streamed += chunk
+            full = await assessor.assess_content_quality({"content": streamed}, "study_guide", "high_school")
+        full_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        incremental = IncrementalQualityAssessor("study_guide", "high_school")
+        for chunk in chunks:
+            incremental.append(chunk)
+            scores = incremental.scores()
+        incremental_time = time.perf_counter() - start_time
+
+        print(
+            f"Rescoring after each of {len(chunks)} chunks ({len(text) // 1000} KB) - full: {full_time * 1000:.0f}ms, "
+            f"incremental: {incremental_time * 1000:.0f}ms ({full_time / incremental_time:.1f}x)"
+        )
+
+        assert scores["cognitive_load_metrics"] == full["cognitive_load_metrics"]
+        assert scores["readability_score"] == full["readability_score"]
+        assert incremental_time * 3 < full_time
@@ -21,6 +21,7 @@ import pytest_asyncio
 import asyncio
 import json
 import time
+import threading
 from typing import Dict, Any, List
 from unittest.mock import AsyncMock, Mock, patch, MagicMock
 from datetime import datetime
@@ -52,7 +53,7 @@ class TestEducationalContentService:
 
         # Configure mock responses
         service.prompt_loader.load_template.return_value = "Test prompt template for {topic}"
-        service.prompt_loader.compile_template.return_value = "Compiled prompt for Test Topic"
+        service.prompt_loader.compile_segments.return_value = "Compiled prompt for Test Topic"
 
         service.ai_provider.generate_content.return_value = {
             "content": '{"title": "Test Content", "sections": []}',
@@ -132,8 +133,8 @@ class TestEducationalContentService:
         assert result["content_type"] == "study_guide"
 
         # Verify that learning objectives were passed to template compilation
-        content_service.prompt_loader.compile_template.assert_called_once()
-        call_args = content_service.prompt_loader.compile_template.call_args
+        content_service.prompt_loader.compile_segments.assert_called_once()
+        call_args = content_service.prompt_loader.compile_segments.call_args
         variables = call_args[0][1]  # Second argument should be variables dict
         assert "learning_objectives" in variables
 
@@ -661,3 +662,2522 @@ class TestServiceIntegration:
             # Each should have unique content
             topics = [r["topic"] for r in successful_results]
             assert len(set(topics)) == 5  # All unique topics
+
+
+class TestSharedContentService:
+    """Process-wide content service shared through app.state"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_dependency_reuses_app_state_service(self):
+        """get_content_service creates the service once and then reuses it"""
+        from types import SimpleNamespace
+        from src.api.routes.content_generation import get_content_service
+
+        request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace()))
+
+        first = await get_content_service(request)
+        second = await get_content_service(request)
+
+        assert first is second
+        assert request.app.state.content_service is first
+        assert first._initialized
+
+        await first.close()
+
+    @pytest.mark.unit
+    def test_lifespan_creates_warms_and_releases_service(self):
+        """Lifespan warms the shared service at startup and drops it on shutdown"""
+        from fastapi.testclient import TestClient
+        from src.main import app
+
+        with TestClient(app):
+            service = app.state.content_service
+            assert service is not None
+            assert service._initialized
+            assert len(service.prompt_loader.template_cache) == len(LaFactoriaContentType)
+
+        assert app.state.content_service is None
+
+
+class TestCompiledTemplateCache:
+    """Compiled prompt template caching in PromptTemplateLoader"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_ad_hoc_templates_compiled_once_and_evicted(self):
+        """Identical template source is compiled once; the LRU stays bounded"""
+        from src.services.prompt_loader import PromptTemplateLoader
+
+        loader = PromptTemplateLoader(compiled_cache_size=2)
+        await loader.initialize()
+
+        first = loader.compile_template("Topic: {$ topic $}", {"topic": "A"})
+        second = loader.compile_template("Topic: {$ topic $}", {"topic": "B"})
+
+        assert first == "Topic: A"
+        assert second == "Topic: B"
+        assert loader.compile_stats["misses"] == 1
+        assert loader.compile_stats["hits"] == 1
+
+        loader.compile_template("One {$ topic $}", {"topic": "x"})
+        loader.compile_template("Two {$ topic $}", {"topic": "x"})
+
+        assert len(loader.compiled_source_cache) == 2
+        assert loader.compile_stats["evictions"] == 1
+        assert "Topic: {$ topic $}" not in loader.compiled_source_cache
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_compiled_template_recompiled_when_file_changes(self, tmp_path):
+        """Compiled templates are reused until the file modification time changes"""
+        from src.services.prompt_loader import PromptTemplateLoader
+
+        import shutil
+        from pathlib import Path
+        for prompt_file in Path("prompts").glob("*.md"):
+            shutil.copy(prompt_file, tmp_path / prompt_file.name)
+        template_file = tmp_path / "study_guide.md"
+        template_file.write_text("Guide for {$ topic $}")
+
+        loader = PromptTemplateLoader(prompts_directory=str(tmp_path))
+        await loader.initialize()
+
+        first = await loader.get_compiled_template("study_guide")
+        assert await loader.get_compiled_template("study_guide") is first
+        assert await loader.render_template("study_guide", {"topic": "Cells"}) == "Guide for Cells"
+
+        template_file.write_text("Updated guide for {$ topic $}")
+        stat = template_file.stat()
+        os.utime(template_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert await loader.get_compiled_template("study_guide") is not first
+        assert await loader.render_template("study_guide", {"topic": "Cells"}) == "Updated guide for Cells"
+
+
+class TestPromptPrecompilation:
+    """Opt-in eager prompt warm-up"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("max_workers", [None, 4])
+    async def test_precompile_all_includes_variants_and_timings(self, max_workers):
+        """Every template and _v2/_enhanced variant is compiled with timings reported"""
+        from src.services.prompt_loader import PromptTemplateLoader
+
+        loader = PromptTemplateLoader()
+        await loader.initialize()
+
+        timings = await loader.precompile_all(max_workers=max_workers)
+
+        assert "study_guide:original" in timings
+        assert "study_guide:v2" in timings
+        assert "study_guide:enhanced" in timings
+        assert "flashcards:v2" in timings
+        assert all(t["load_ms"] >= 0 and t["compile_ms"] >= 0 for t in timings.values())
+
+        stats = loader.get_template_stats()
+        assert stats["template_timings"] == timings
+        assert stats["cached_templates"] == len(LaFactoriaContentType)
+
+        # Hot path reuses the precompiled templates without compiling again
+        misses = loader.compile_stats["misses"]
+        template_content = await loader.load_template("study_guide")
+        loader.compile_template(template_content, {"topic": "Cells", "age_group": "high_school"})
+        await loader.get_compiled_template("study_guide", "enhanced")
+        assert loader.compile_stats["misses"] == misses
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_service_warm_up_precompiles_when_enabled(self):
+        """warm_up precompiles templates only when PROMPT_PRECOMPILE_ON_STARTUP is set"""
+        service = EducationalContentService()
+
+        with patch(
+            "src.services.educational_content_service.settings.PROMPT_PRECOMPILE_ON_STARTUP",
+            True,
+            create=True
+        ):
+            await service.warm_up()
+
+        assert "study_guide:v2" in service.prompt_loader.get_template_stats()["template_timings"]
+        await service.close()
+
+
+class TestPromptHotReload:
+    """Incremental hot reload of changed prompt files"""
+
+    @staticmethod
+    async def _loader_with_copied_prompts(tmp_path):
+        import shutil
+        from pathlib import Path
+        from src.services.prompt_loader import PromptTemplateLoader
+
+        for prompt_file in Path("prompts").glob("*.md"):
+            shutil.copy(prompt_file, tmp_path / prompt_file.name)
+
+        loader = PromptTemplateLoader(prompts_directory=str(tmp_path))
+        await loader.initialize()
+        await loader.precompile_all()
+        return loader
+
+    @staticmethod
+    def _touch(path, text):
+        path.write_text(text)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_only_changed_templates_are_swapped(self, tmp_path):
+        """Changed files are recompiled; other templates and their caches are untouched"""
+        loader = await self._loader_with_copied_prompts(tmp_path)
+        loader.get_prompt_versions("study_guide")
+        loader.get_prompt_versions("flashcards")
+
+        flashcards_compiled = loader.compiled_template_cache[("flashcards", "original")]
+        old_v2 = loader.compiled_template_cache[("study_guide", "v2")]
+
+        self._touch(tmp_path / "study_guide_v2.md", "New v2 guide for {$ topic $}")
+        changes = await loader.reload_changed_templates()
+
+        assert changes == {"added": [], "modified": ["study_guide_v2.md"], "removed": []}
+        assert loader.compiled_template_cache[("flashcards", "original")] is flashcards_compiled
+        assert loader.compiled_template_cache[("study_guide", "v2")] is not old_v2
+        assert "study_guide" not in loader.version_cache
+        assert "flashcards" in loader.version_cache
+        assert await loader.render_template("study_guide", {"topic": "Cells"}, "v2") == "New v2 guide for Cells"
+
+        # Nothing changed since the last check
+        assert await loader.reload_changed_templates() == {"added": [], "modified": [], "removed": []}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_full_reload_swaps_caches_atomically(self, tmp_path):
+        """Readers never see empty caches mid-reload; a failed reload keeps the old caches"""
+        loader = await self._loader_with_copied_prompts(tmp_path)
+        self._touch(tmp_path / "flashcards.md", "Cards about {$ topic $}")
+
+        seen = []
+
+        async def reader():
+            while not reload_task.done():
+                seen.append(len(loader.template_cache))
+                await asyncio.sleep(0)
+
+        reload_task = asyncio.create_task(loader.reload_all_templates())
+        await asyncio.gather(reload_task, reader())
+
+        assert min(seen) == len(loader.template_files)
+        assert loader.template_cache["flashcards"] == "Cards about {$ topic $}"
+        assert ("study_guide", "v2") not in loader.compiled_template_cache
+        assert loader.file_mtimes["flashcards.md"] == (tmp_path / "flashcards.md").stat().st_mtime_ns
+
+        (tmp_path / "faq_collection.md").unlink()
+        with pytest.raises(FileNotFoundError):
+            await loader.reload_all_templates()
+        assert loader.template_cache["flashcards"] == "Cards about {$ topic $}"
+        assert "faq_collection" in loader.template_cache
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_polling_watcher_reloads_original_template(self, tmp_path):
+        """The background watcher picks up edits to the base template"""
+        loader = await self._loader_with_copied_prompts(tmp_path)
+
+        with patch("src.services.prompt_loader.WATCHFILES_AVAILABLE", False):
+            loader.start_watching(interval=0.01)
+            self._touch(tmp_path / "flashcards.md", "Cards about {$ topic $}")
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if loader.template_cache["flashcards"] == "Cards about {$ topic $}":
+                    break
+            await loader.stop_watching()
+
+        template_content = await loader.load_template("flashcards")
+        assert template_content == "Cards about {$ topic $}"
+        assert loader.compile_template(template_content, {"topic": "Atoms"}) == "Cards about Atoms"
+
+
+class TestSharedRedisPool:
+    """Shared redis.asyncio connection pool"""
+
+    @pytest.mark.unit
+    def test_cache_and_rate_limiter_share_one_pool(self):
+        """CacheService and EnhancedRateLimiter use the same pooled client"""
+        from src.core.redis_manager import RedisPoolManager
+        from src.services.cache_service import CacheService
+        from src.middleware.rate_limiting import EnhancedRateLimiter
+
+        pool_manager = RedisPoolManager()
+        with patch("src.services.cache_service.redis_pool", pool_manager), \
+             patch("src.middleware.rate_limiting.redis_pool", pool_manager), \
+             patch("src.services.cache_service.settings.REDIS_URL", "redis://localhost:6399/0"), \
+             patch("src.middleware.rate_limiting.settings.REDIS_URL", "redis://localhost:6399/0"):
+            cache_service = CacheService()
+            limiter = EnhancedRateLimiter()
+
+        assert cache_service.redis_client is limiter.redis_client
+        assert cache_service.redis_client.connection_pool is pool_manager.pool
+
+        stats = pool_manager.get_pool_stats()
+        assert stats["max_connections"] == pool_manager.pool.max_connections
+        assert stats["in_use_connections"] == 0
+        assert stats["utilization"] == 0.0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_reconnect_backs_off_after_failures(self):
+        """Failed reconnects are retried only after an exponential backoff"""
+        from src.core.redis_manager import RedisPoolManager
+
+        pool_manager = RedisPoolManager()
+        client = pool_manager.get_client("redis://localhost:6399/0")
+        client.ping = AsyncMock(side_effect=ConnectionError("refused"))
+
+        assert await pool_manager.reconnect() is False
+        assert await pool_manager.reconnect() is False  # Still backing off, no second ping
+        assert client.ping.await_count == 1
+        assert pool_manager.get_pool_stats()["status"] == "reconnecting"
+
+        client.ping = AsyncMock(return_value=True)
+        pool_manager._next_reconnect_at = 0.0
+        assert await pool_manager.reconnect() is True
+        assert pool_manager.reconnect_failures == 0
+
+    @pytest.mark.unit
+    def test_command_retry_is_short(self):
+        """Pool-level command retries stay well under a second so callers degrade quickly"""
+        from src.core.redis_manager import RedisPoolManager
+
+        pool_manager = RedisPoolManager()
+        pool_manager.get_client("redis://localhost:6399/0")
+        retry = pool_manager.pool.connection_kwargs["retry"]
+
+        assert retry._retries == 1
+        assert retry._backoff._cap <= 1.0
+
+    @pytest.mark.unit
+    def test_pool_disabled_without_redis_url(self):
+        """No pool is created when Redis is not configured"""
+        from src.core.redis_manager import RedisPoolManager
+
+        pool_manager = RedisPoolManager()
+        with patch("src.core.redis_manager.settings.REDIS_URL", None):
+            assert pool_manager.get_client() is None
+        assert pool_manager.get_pool_stats()["status"] == "disabled"
+
+
+class _InMemoryRedis:
+    """Minimal async Redis stand-in covering the commands CacheService uses"""
+
+    def __init__(self):
+        self.data = {}
+        self.zsets = {}
+        self.commands = []
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def scan_iter(self, match="*", count=None):
+        import fnmatch
+        for key in list(self.data):
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+    async def keys(self, pattern):
+        raise AssertionError("KEYS must not be used")
+
+    async def ttl(self, key):
+        return 3600 if key in self.data else -2
+
+    async def info(self, section=None):
+        return {"db0": {"keys": len(self.data)}}
+
+    async def ping(self):
+        return True
+
+    def pipeline(self, transaction=True):
+        return _InMemoryPipeline(self)
+
+
+class _InMemoryPipeline:
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.queued = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.queued.append((name, args, kwargs))
+
+    async def execute(self):
+        r = self.redis_client
+        results = []
+        for name, args, kwargs in self.queued:
+            r.commands.append(name)
+            if name == "set":
+                r.data[args[0]] = args[1]
+                results.append(True)
+            elif name == "unlink":
+                results.append(sum(1 for key in args if r.data.pop(key, None) is not None))
+            elif name == "zadd":
+                r.zsets.setdefault(args[0], {}).update(args[1])
+                results.append(len(args[1]))
+            elif name == "zrem":
+                results.append(sum(1 for m in args[1:] if r.zsets.get(args[0], {}).pop(m, None) is not None))
+            elif name == "zremrangebyscore":
+                zset = r.zsets.get(args[0], {})
+                expired = [m for m, score in zset.items() if score <= args[2]]
+                for member in expired:
+                    del zset[member]
+                results.append(len(expired))
+            elif name == "zcard":
+                results.append(len(r.zsets.get(args[0], {})))
+        return results
+
+
+class TestCacheKeyspaceOperations:
+    """SCAN/UNLINK clearing and index-based cache statistics"""
+
+    def _cache_service(self):
+        from src.services.cache_service import CacheService
+
+        cache_service = CacheService()
+        cache_service.redis_client = _InMemoryRedis()
+        cache_service.cache_enabled = True
+        return cache_service
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_stats_come_from_namespace_indexes(self):
+        """Key counts are read from the sorted-set indexes, skipping expired entries"""
+        cache_service = self._cache_service()
+
+        for i in range(3):
+            await cache_service.set_content_cache(
+                "flashcards", f"Topic {i}", "high_school",
+                {"metadata": {}, "quality_metrics": {"overall_quality_score": 0.8}}
+            )
+        await cache_service.set_quality_assessment_cache("abc", "flashcards", "high_school", {"score": 0.9})
+        # Re-caching the same entry does not double count
+        await cache_service.set_content_cache(
+            "flashcards", "Topic 0", "high_school",
+            {"metadata": {}, "quality_metrics": {"overall_quality_score": 0.8}}
+        )
+        # An index member whose TTL has passed is not counted
+        cache_service.redis_client.zsets["cache_index:prompt"] = {"prompt:old:vars": time.time() - 1}
+
+        stats = await cache_service.get_cache_stats()
+
+        assert stats["key_counts"]["content_cache"] == 3
+        assert stats["key_counts"]["quality_cache"] == 1
+        assert stats["key_counts"]["prompt_cache"] == 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_writes_prune_expired_index_members(self):
+        """Each write drops expired members from its index, so indexes stay bounded without stats calls"""
+        cache_service = self._cache_service()
+        cache_service.redis_client.zsets["cache_index:prompt"] = {"prompt:old:vars": time.time() - 1}
+
+        await cache_service.set_prompt_compilation_cache("t0", "vars", "compiled")
+
+        assert list(cache_service.redis_client.zsets["cache_index:prompt"]) == ["prompt:t0:vars"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_clear_unlinks_in_batches_with_progress(self):
+        """Clearing scans and unlinks keys in batches and reports progress"""
+        cache_service = self._cache_service()
+        for i in range(7):
+            await cache_service.set_prompt_compilation_cache(f"t{i}", "vars", "compiled")
+        await cache_service.set_quality_assessment_cache("abc", "flashcards", "high_school", {"score": 0.9})
+
+        progress = []
+        deleted = await cache_service.clear_content_cache(
+            "prompt:*", batch_size=3, progress_callback=progress.append
+        )
+
+        assert deleted == 7
+        assert progress == [3, 6, 7]
+        assert cache_service.redis_client.commands.count("unlink") == 3
+        assert "delete" not in cache_service.redis_client.commands
+        assert cache_service.redis_client.zsets["cache_index:prompt"] == {}
+        assert list(cache_service.redis_client.data) == ["quality:abc:flashcards:high_school:v2.0"]
+
+
+class TestTwoTierCache:
+    """In-process L1 cache in front of Redis L2"""
+
+    def _content(self, size=10):
+        return {
+            "id": "c1",
+            "generated_content": {"content": "x" * size},
+            "quality_metrics": {"overall_quality_score": 0.8},
+            "metadata": {}
+        }
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_l1_serves_hits_without_redis(self):
+        """Content is cached in-process when Redis is not configured"""
+        from src.services.cache_service import CacheService
+
+        cache_service = CacheService()
+        cache_service.cache_enabled = False
+        cache_service.redis_client = None
+
+        assert await cache_service.get_content_cache("flashcards", "Cells", "high_school") is None
+        await cache_service.set_content_cache("flashcards", "Cells", "high_school", self._content())
+
+        cached = await cache_service.get_content_cache("flashcards", "Cells", "high_school")
+        assert cached["id"] == "c1"
+        assert cached["metadata"]["from_cache"] is True
+        assert cached["metadata"]["cache_tier"] == "l1"
+
+        # Hits get their own metadata; the cached payload itself is shared and read-only
+        cached["metadata"]["extra"] = True
+        cached["id"] = "edited"
+        again = await cache_service.get_content_cache("flashcards", "Cells", "high_school")
+        assert "extra" not in again["metadata"]
+        assert again["id"] == "c1"
+        assert again["generated_content"] is cached["generated_content"]
+
+        stats = (await cache_service.get_cache_stats())["tiers"]
+        assert stats["l1"]["hits"] == 2
+        assert stats["l1"]["misses"] == 1
+        assert stats["l2"]["status"] == "disabled"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_l2_hit_populates_l1(self):
+        """A Redis hit is decoded once and then served from L1"""
+        from src.services.cache_service import CacheService
+
+        cache_service = CacheService()
+        cache_service.redis_client = _InMemoryRedis()
+        cache_service.cache_enabled = True
+
+        await cache_service.set_content_cache("study_guide", "Atoms", "college", self._content())
+        cache_service.local_cache.delete_matching("*")
+
+        first = await cache_service.get_content_cache("study_guide", "Atoms", "college")
+        second = await cache_service.get_content_cache("study_guide", "Atoms", "college")
+
+        assert first["metadata"]["cache_tier"] == "l2"
+        assert second["metadata"]["cache_tier"] == "l1"
+        assert first["generated_content"] == second["generated_content"]
+        tiers = cache_service.get_tier_stats()
+        assert tiers["l2"]["hits"] == 1
+        assert tiers["l1"]["hits"] == 1
+
+    @pytest.mark.unit
+    def test_local_cache_respects_entry_byte_and_ttl_bounds(self):
+        """LRU eviction by entry count and bytes; expired entries are dropped"""
+        from src.services.cache_service import LocalCache
+
+        cache = LocalCache(max_entries=2, max_bytes=100)
+        cache.set("a", "A", 40, 60)
+        cache.set("b", "B", 40, 60)
+        assert cache.get("a") == "A"  # "b" is now least recently used
+        cache.set("c", "C", 40, 60)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "A"
+        assert cache.total_bytes == 80
+
+        cache.set("d", "D", 90, 60)  # Byte bound forces out both older entries
+        assert cache.get("a") is None and cache.get("c") is None
+        assert cache.get_stats()["evictions"] == 3
+
+        cache.set("huge", "H", 500, 60)  # Larger than the whole cache: not stored
+        assert cache.get("huge") is None
+
+        cache.set("short", "S", 1, 0)
+        assert cache.get("short") is None
+        assert cache.get_stats()["expirations"] == 1
+
+
+class TestRequestCoalescing:
+    """Single-flight coalescing of identical concurrent generations"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicates_share_one_execution(self):
+        """Only the leader runs; duplicates await its result"""
+        from src.services.cache_service import SingleFlight
+
+        single_flight = SingleFlight()
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"value": 42}
+
+        results = await asyncio.gather(*[single_flight.do("key", factory) for _ in range(5)])
+
+        assert calls == 1
+        assert [r[0] for r in results] == [{"value": 42}] * 5
+        assert [r[1] for r in results].count(True) == 1
+        assert single_flight.get_stats()["coalesced"] == 4
+        assert single_flight.get_stats()["in_flight"] == 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_followers_get_isolated_copies(self):
+        """Editing a coalesced result never reaches the leader's or another follower's result"""
+        from src.services.cache_service import SingleFlight
+
+        single_flight = SingleFlight()
+
+        async def factory():
+            await asyncio.sleep(0.01)
+            return {"generated_content": {"title": "Cells"}, "metadata": {}}
+
+        results = [r for r, _ in await asyncio.gather(*[single_flight.do("key", factory) for _ in range(3)])]
+        results[1]["generated_content"]["title"] = "edited"
+        assert [r["generated_content"]["title"] for r in results] == ["Cells", "edited", "Cells"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_leader_failure_propagates_and_key_is_released(self):
+        """A failed generation fails its followers and does not block later calls"""
+        from src.services.cache_service import SingleFlight
+
+        single_flight = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("provider down")
+
+        results = await asyncio.gather(
+            *[single_flight.do("key", failing) for _ in range(3)], return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+        async def succeeding():
+            return "ok"
+
+        assert await single_flight.do("key", succeeding) == ("ok", True)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_cancel_followers(self):
+        """A follower whose leader is cancelled retries as the new leader instead of being cancelled"""
+        from src.services.cache_service import SingleFlight
+
+        single_flight = SingleFlight()
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return calls
+
+        leader = asyncio.create_task(single_flight.do("key", factory))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(single_flight.do("key", factory))
+        await asyncio.sleep(0.01)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        assert await follower == (2, True)
+        assert single_flight.get_stats()["retries_after_cancel"] == 1
+        assert single_flight.get_stats()["in_flight"] == 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_follower_stops_waiting_once_remote_lock_is_gone(self):
+        """A result published before subscribing is read back; a dead leader's lock ends the wait"""
+        from src.services.cache_service import SingleFlight
+
+        pubsub = Mock()
+        pubsub.subscribe = AsyncMock()
+        pubsub.unsubscribe = AsyncMock()
+        pubsub.aclose = AsyncMock()
+        pubsub.get_message = AsyncMock(return_value=None)
+
+        redis_client = Mock()
+        redis_client.set = AsyncMock(return_value=None)  # Lock held by another worker
+        redis_client.exists = AsyncMock(side_effect=[1, 0])
+        redis_client.get = AsyncMock(return_value=json.dumps({"id": "published-early"}))
+        redis_client.pubsub = Mock(return_value=pubsub)
+
+        single_flight = SingleFlight(redis_client, lock_timeout=120)
+        result, is_leader = await single_flight.do("key", AsyncMock())
+        assert result == {"id": "published-early"}
+        assert is_leader is False
+        assert pubsub.get_message.await_count == 1
+
+        # Leader died holding the lock: once it expires the follower generates locally
+        redis_client.set = AsyncMock(side_effect=[None, True])
+        redis_client.exists = AsyncMock(side_effect=[1, 0])
+        redis_client.get = AsyncMock(return_value=None)
+        redis_client.eval = AsyncMock()
+        redis_client.publish = AsyncMock()
+        result, is_leader = await single_flight.do("key", AsyncMock(return_value={"id": "local"}))
+        assert result == {"id": "local"}
+        assert is_leader is True
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_remote_wait_is_bounded_by_caller_timeout(self):
+        """Followers wait for another worker only as long as the caller's deadline allows"""
+        from src.services.cache_service import SingleFlight
+
+        pubsub = Mock()
+        pubsub.subscribe = AsyncMock()
+        pubsub.unsubscribe = AsyncMock()
+        pubsub.aclose = AsyncMock()
+        pubsub.get_message = AsyncMock(return_value=None)
+
+        redis_client = Mock()
+        redis_client.set = AsyncMock(return_value=None)
+        redis_client.exists = AsyncMock(return_value=1)
+        redis_client.pubsub = Mock(return_value=pubsub)
+
+        single_flight = SingleFlight(redis_client, lock_timeout=120)
+        started = time.monotonic()
+        result, is_leader = await single_flight.do("key", AsyncMock(return_value="local"), timeout=0.05)
+
+        assert (result, is_leader) == ("local", True)
+        assert time.monotonic() - started < 1.0
+        assert pubsub.get_message.await_args.kwargs["timeout"] <= 0.05
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_follower_uses_result_from_other_worker(self):
+        """With a Redis lock held elsewhere, the result arrives over pub/sub"""
+        from src.services.cache_service import SingleFlight
+
+        pubsub = Mock()
+        pubsub.subscribe = AsyncMock()
+        pubsub.unsubscribe = AsyncMock()
+        pubsub.aclose = AsyncMock()
+        pubsub.get_message = AsyncMock(side_effect=[None, {"data": json.dumps({"id": "remote"})}])
+
+        redis_client = Mock()
+        redis_client.set = AsyncMock(return_value=None)  # Lock held by another worker
+        redis_client.exists = AsyncMock(return_value=1)
+        redis_client.pubsub = Mock(return_value=pubsub)
+
+        single_flight = SingleFlight(redis_client, lock_timeout=5)
+        factory = AsyncMock()
+
+        result, is_leader = await single_flight.do("key", factory)
+
+        assert result == {"id": "remote"}
+        assert is_leader is False
+        factory.assert_not_awaited()
+        assert single_flight.get_stats()["coalesced_remote"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_generate_content_makes_one_ai_call_for_duplicates(self):
+        """Identical concurrent generate_content calls trigger a single AI request"""
+        from types import SimpleNamespace
+
+        service = EducationalContentService()
+        service._initialized = True
+        service.prompt_loader = Mock()
+        service.prompt_loader.load_template = AsyncMock(return_value="Template {$ topic $}")
+        service.prompt_loader.compile_segments = Mock(return_value="Compiled prompt")
+        service.quality_assessor = AsyncMock()
+        service.quality_assessor.assess_content_quality.return_value = {"overall_quality_score": 0.85}
+
+        async def slow_generation(**kwargs):
+            await asyncio.sleep(0.05)
+            return SimpleNamespace(
+                content='{"title": "Cells"}', tokens_used=100, provider="openai", model="gpt-4"
+            )
+
+        service.ai_provider = Mock()
+        service.ai_provider.generate_content = AsyncMock(side_effect=slow_generation)
+
+        results = await asyncio.gather(*[
+            service.generate_content("flashcards", "Cell Biology", "high_school") for _ in range(4)
+        ])
+
+        assert service.ai_provider.generate_content.await_count == 1
+        assert len({r["id"] for r in results}) == 1
+        assert sum(1 for r in results if r["metadata"].get("coalesced")) == 3
+        assert service.cache_service.single_flight.get_stats()["coalesced"] == 3
+
+
+class TestTopicSimilarityCache:
+    """Near-duplicate topic cache tier"""
+
+    @pytest.mark.unit
+    def test_index_matches_reworded_topics_within_partition(self):
+        """Word order, stopwords and plurals do not defeat the match; partitions are isolated"""
+        from src.services.topic_similarity_service import TopicSimilarityIndex
+
+        index = TopicSimilarityIndex(threshold=0.8)
+        index.add("flashcards:high_school:", "Photosynthesis basics")
+        index.add("flashcards:high_school:", "World War I")
+
+        assert index.lookup("flashcards:high_school:", "basics of photosynthesis") == ("Photosynthesis basics", 1.0)
+        assert index.lookup("flashcards:high_school:", "The basic of Photosynthesis") is not None
+        assert index.lookup("flashcards:high_school:", "World War II") is None
+        assert index.lookup("flashcards:college:", "basics of photosynthesis") is None
+
+        index.remove("flashcards:high_school:", "photosynthesis basics")
+        assert index.lookup("flashcards:high_school:", "basics of photosynthesis") is None
+        assert len(index) == 1
+
+    @pytest.mark.unit
+    def test_index_evicts_oldest_topics(self):
+        """The index stays within max_entries"""
+        from src.services.topic_similarity_service import TopicSimilarityIndex
+
+        index = TopicSimilarityIndex(max_entries=2)
+        for topic in ["cell biology", "plate tectonics", "french revolution"]:
+            index.add("study_guide:college:", topic)
+
+        assert len(index) == 2
+        assert index.lookup("study_guide:college:", "biology of the cell") is None
+        assert index.lookup("study_guide:college:", "revolution french") is not None
+        assert index.get_stats()["evictions"] == 1
+
+    @pytest.mark.unit
+    def test_token_signature_cache_is_bounded(self):
+        """Lookup topics never grow the token cache, and indexed vocabulary is LRU-bounded"""
+        from src.services.topic_similarity_service import TopicSimilarityIndex
+
+        index = TopicSimilarityIndex(max_entries=10, max_vocabulary=4)
+        index.add("study_guide:college:", "cell biology")
+        for i in range(50):
+            index.lookup("study_guide:college:", f"unseen topic {i}")
+        assert index.get_stats()["vocabulary"] == 2
+
+        index.add("study_guide:college:", "plate tectonics")
+        index.add("study_guide:college:", "french revolution")
+        assert index.get_stats()["vocabulary"] == 4
+        assert index.lookup("study_guide:college:", "biology of the cell") is not None
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cache_serves_near_duplicate_topic(self):
+        """get_content_cache falls back to a similar cached topic when enabled"""
+        from src.services.cache_service import CacheService
+        from src.services.topic_similarity_service import TopicSimilarityIndex
+
+        cache_service = CacheService()
+        cache_service.cache_enabled = False
+        cache_service.similarity_index = TopicSimilarityIndex(threshold=0.8)
+
+        await cache_service.set_content_cache(
+            "study_guide", "Photosynthesis basics", "high_school",
+            {"id": "p1", "metadata": {}, "quality_metrics": {"overall_quality_score": 0.8}}
+        )
+
+        cached = await cache_service.get_content_cache("study_guide", "basics of photosynthesis", "high_school")
+        assert cached["id"] == "p1"
+        assert cached["metadata"]["cache_tier"] == "similarity"
+        assert cached["metadata"]["similar_topic"] == "Photosynthesis basics"
+
+        assert await cache_service.get_content_cache("study_guide", "basics of photosynthesis", "college") is None
+        assert cache_service.get_tier_stats()["similarity"]["hits"] == 1
+
+
+def _provider_manager_with(providers):
+    """AIProviderManager over the given {provider_type: client} mapping, skipping SDK setup"""
+    from src.services.provider_routing_service import ProviderRouter
+    from src.services.provider_hedging_service import HedgingPolicy
+    from src.services.provider_circuit_breaker_service import CircuitBreaker
+    from src.services.provider_admission_service import ProviderAdmissionController
+    from src.services.provider_retry_service import RetryPolicy, RetryPolicyResolver
+    from src.services.provider_executor_service import SyncProviderExecutor
+
+    manager = AIProviderManager.__new__(AIProviderManager)
+    manager.providers = providers
+    manager.current_provider = next(iter(providers))
+    manager.router = ProviderRouter()
+    manager.hedging = HedgingPolicy()
+    manager.circuit_breakers = {p: CircuitBreaker(p.value, failure_threshold=2, cooldown=30.0) for p in providers}
+    manager._probe_tasks = set()
+    manager.admission = ProviderAdmissionController(max_concurrent=10, provider_limits={})
+    manager.retry_policies = RetryPolicyResolver(RetryPolicy(
+        deadline=120, attempt_timeout=60, max_retries=0, backoff_base=0.0, backoff_cap=0.0
+    ))
+    manager.retry_stats = {"retries": 0, "attempt_timeouts": 0, "deadline_exceeded": 0}
+    manager.sync_executor = SyncProviderExecutor(max_workers=2)
+    manager.provider_stats = {
+        p: {"requests": 0, "successes": 0, "failures": 0, "total_tokens": 0, "avg_response_time": 0.0}
+        for p in providers
+    }
+    return manager
+
+
+class TestContentStreaming:
+    """Streaming generation from provider stream APIs through the content service"""
+
+    @staticmethod
+    def _openai_delta(text):
+        """One OpenAI chat completion stream event carrying a text delta"""
+        from types import SimpleNamespace
+        return SimpleNamespace(
+            choices=[SimpleNamespace(delta=SimpleNamespace(content=text), finish_reason=None)],
+            usage=None
+        )
+
+    def _openai_stream(self, deltas, total_tokens=42):
+        """Async iterator mimicking an OpenAI chat completion stream with include_usage"""
+        from types import SimpleNamespace
+
+        async def stream():
+            for delta in deltas:
+                yield self._openai_delta(delta)
+            yield SimpleNamespace(
+                choices=[],
+                usage=SimpleNamespace(total_tokens=total_tokens, prompt_tokens=30, completion_tokens=12)
+            )
+
+        return stream()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_openai_stream_yields_deltas_then_response(self):
+        """Text deltas are forwarded as they arrive and assembled into the final AIResponse"""
+        from src.services.ai_providers import AIProviderType
+
+        client = Mock()
+        client.chat.completions.create = AsyncMock(return_value=self._openai_stream(['{"title": ', '"Cells"}']))
+        manager = _provider_manager_with({AIProviderType.OPENAI: client})
+
+        chunks = [chunk async for chunk in manager.stream_content("prompt", "flashcards")]
+
+        assert [c.text for c in chunks if not c.done] == ['{"title": ', '"Cells"}']
+        final = chunks[-1]
+        assert final.done and final.response.content == '{"title": "Cells"}'
+        assert final.response.tokens_used == 42
+        assert client.chat.completions.create.await_args.kwargs["stream"] is True
+        assert manager.provider_stats[AIProviderType.OPENAI]["successes"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_stream_falls_back_only_before_first_token(self):
+        """A provider failing before emitting text falls back; one failing mid-stream does not"""
+        from src.services.ai_providers import AIProviderType
+
+        failing = Mock()
+        failing.chat.completions.create = AsyncMock(side_effect=RuntimeError("connection reset"))
+        manager = _provider_manager_with({AIProviderType.OPENAI: failing, AIProviderType.ANTHROPIC: Mock()})
+
+        async def anthropic_stream(client, prompt, max_tokens):
+            from src.services.ai_providers import AIStreamChunk, AIResponse
+            yield AIStreamChunk(text="Hello")
+            yield AIStreamChunk(text="", done=True, response=AIResponse(
+                content="Hello", provider="anthropic", model="claude", tokens_used=5,
+                generation_time=0.0, metadata={}
+            ))
+
+        with patch("src.services.provider_streaming_service.stream_anthropic", anthropic_stream):
+            chunks = [chunk async for chunk in manager.stream_content("prompt", "flashcards")]
+        assert chunks[-1].response.provider == "anthropic"
+        assert manager.provider_stats[AIProviderType.OPENAI]["failures"] == 1
+
+        async def broken_midway():
+            yield self._openai_delta("partial")
+            raise RuntimeError("stream interrupted")
+
+        failing.chat.completions.create = AsyncMock(return_value=broken_midway())
+        with pytest.raises(RuntimeError, match="stream interrupted"):
+            async for _ in manager.stream_content("prompt", "flashcards"):
+                pass
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_service_stream_ends_with_assessed_result(self):
+        """Tokens stream first; the complete event carries parsed, assessed content and TTFT"""
+        from src.services.ai_providers import AIStreamChunk, AIResponse
+
+        service = EducationalContentService()
+        service._initialized = True
+        service.prompt_loader = Mock()
+        service.prompt_loader.load_template = AsyncMock(return_value="Template {$ topic $}")
+        service.prompt_loader.compile_segments = Mock(return_value="Compiled prompt")
+        service.quality_assessor = AsyncMock()
+        service.quality_assessor.assess_content_quality.return_value = {"overall_quality_score": 0.85}
+
+        async def provider_stream(**kwargs):
+            for delta in ['{"title": ', '"Cells"}']:
+                yield AIStreamChunk(text=delta)
+            yield AIStreamChunk(text="", done=True, response=AIResponse(
+                content='{"title": "Cells"}', provider="openai", model="gpt-4",
+                tokens_used=100, generation_time=0.1, metadata={}
+            ))
+
+        service.ai_provider = Mock()
+        service.ai_provider.stream_content = provider_stream
+
+        events = [e async for e in service.generate_content_stream("flashcards", "Cell Biology", "high_school")]
+
+        assert [e["event"] for e in events] == ["token", "token", "complete"]
+        result = events[-1]["result"]
+        assert result["generated_content"] == {"title": "Cells"}
+        assert result["quality_metrics"]["overall_quality_score"] == 0.85
+        assert result["metadata"]["streamed"] is True
+        assert result["metadata"]["time_to_first_token_ms"] is not None
+        assert service.streaming_stats["first_tokens"] == 1
+
+
+class TestAdaptiveProviderRouting:
+    """Latency-aware provider selection from live metrics"""
+
+    @pytest.mark.unit
+    def test_slow_and_failing_providers_rank_last(self):
+        """Traffic shifts to the fastest healthy provider; cold providers still get explored"""
+        from src.services.provider_routing_service import ProviderRouter
+
+        router = ProviderRouter(alpha=0.5, cost_weight=0.0)
+        for _ in range(3):
+            router.record_success("openai", "study_guide", latency=8.0, tokens=2000)
+            router.record_success("anthropic", "study_guide", latency=2.0, tokens=2000)
+
+        assert router.rank(["openai", "anthropic"], "study_guide") == ["anthropic", "openai"]
+        # An unmeasured provider scores like the best known one and keeps configured order
+        assert router.rank(["vertex_ai", "openai", "anthropic"], "study_guide")[0] in ("vertex_ai", "anthropic")
+
+        for _ in range(3):
+            router.record_failure("anthropic")
+        assert router.select(["openai", "anthropic"], "study_guide") == "openai"
+
+    @pytest.mark.unit
+    def test_error_rate_decays_without_traffic(self):
+        """A provider that failed and lost its traffic recovers its rank once the errors are old"""
+        from src.services.provider_routing_service import ProviderRouter
+
+        router = ProviderRouter(alpha=0.5, cost_weight=0.0, error_half_life=60.0)
+        with patch("src.services.provider_routing_service.time.monotonic", return_value=1000.0):
+            router.record_success("openai", "study_guide", latency=8.0, tokens=2000)
+            router.record_success("anthropic", "study_guide", latency=2.0, tokens=2000)
+            for _ in range(3):
+                router.record_failure("anthropic")
+            assert router.select(["openai", "anthropic"], "study_guide") == "openai"
+            assert router.get_stats()["anthropic"]["error_rate"] == 0.875
+
+        with patch("src.services.provider_routing_service.time.monotonic", return_value=1000.0 + 600):
+            assert router.error_rate("anthropic") < 0.001
+            assert router.select(["openai", "anthropic"], "study_guide") == "anthropic"
+
+    @pytest.mark.unit
+    def test_in_flight_load_and_cost_shift_traffic(self):
+        """Requests in flight inflate expected latency; cost breaks near-ties"""
+        from src.services.provider_routing_service import ProviderRouter
+
+        router = ProviderRouter(cost_weight=0.0, in_flight_penalty=0.5)
+        router.record_success("openai", "flashcards", latency=1.0, tokens=1000)
+        router.record_success("anthropic", "flashcards", latency=1.2, tokens=1000)
+        assert router.select(["openai", "anthropic"], "flashcards") == "openai"
+
+        with router.track("openai"):
+            assert router.get_stats()["openai"]["in_flight"] == 1
+            assert router.select(["openai", "anthropic"], "flashcards") == "anthropic"
+        assert router.get_stats()["openai"]["in_flight"] == 0
+
+        router.cost_weight = 1000.0
+        assert router.select(["openai", "anthropic"], "flashcards") == "anthropic"
+
+    @pytest.mark.unit
+    def test_expected_cost_uses_list_prices(self):
+        """Routing and hedge caps price requests like estimate_cost; unknown providers use the blended rate"""
+        from src.services.provider_routing_service import ProviderRouter, estimate_cost
+
+        router = ProviderRouter()
+        for provider in ("openai", "anthropic", "vertex_ai", "other"):
+            router.record_success(provider, "flashcards", latency=1.0, tokens=2000)
+
+        for provider in ("openai", "anthropic", "vertex_ai"):
+            listed = estimate_cost(provider, 2000, prompt_tokens=1000, completion_tokens=1000)
+            assert router.expected_cost(provider, "flashcards") == pytest.approx(listed)
+        assert router.expected_cost("vertex_ai", "flashcards") < 0.001
+        assert router.expected_cost("other", "flashcards") == pytest.approx(estimate_cost("other", 2000))
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_manager_routes_by_metrics_in_adaptive_mode(self):
+        """generate_content without an explicit provider follows the router and reports its metrics"""
+        from src.services.ai_providers import AIProviderType, AIResponse
+
+        manager = _provider_manager_with({AIProviderType.OPENAI: Mock(), AIProviderType.ANTHROPIC: Mock()})
+        manager.router.cost_weight = 0.0
+        manager.router.record_success("openai", "flashcards", latency=9.0, tokens=500)
+        manager.router.record_success("anthropic", "flashcards", latency=1.0, tokens=500)
+
+        response = AIResponse(content="{}", provider="anthropic", model="claude", tokens_used=500,
+                              generation_time=0.0, metadata={})
+        manager._generate_with_anthropic = AsyncMock(return_value=response)
+        manager._generate_with_openai = AsyncMock(side_effect=AssertionError("slow provider should not be used"))
+
+        with patch("src.services.ai_providers.settings.AI_ROUTING_STRATEGY", "adaptive", create=True):
+            result = await manager.generate_content("prompt", "flashcards")
+            stats = manager.get_provider_stats()
+
+        assert result.provider == "anthropic"
+        assert stats["routing"]["strategy"] == "adaptive"
+        assert stats["routing"]["providers"]["anthropic"]["samples"] == 2
+
+
+class TestHedgedRequests:
+    """Hedging slow provider requests to a second provider"""
+
+    @staticmethod
+    def _router_with_history(latency=0.02, samples=20):
+        from src.services.provider_routing_service import ProviderRouter
+
+        router = ProviderRouter()
+        for _ in range(samples):
+            router.record_success("openai", "flashcards", latency=latency, tokens=100)
+        return router
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_hedge_wins_when_primary_exceeds_p95(self):
+        """A primary slower than its p95 is hedged; the faster hedge wins and the primary is cancelled"""
+        from src.services.provider_hedging_service import HedgingPolicy
+
+        router = self._router_with_history()
+        policy = HedgingPolicy(max_hedge_fraction=1.0)
+        primary_cancelled = asyncio.Event()
+
+        async def slow_primary():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                primary_cancelled.set()
+                raise
+
+        async def fast_hedge():
+            return "hedge"
+
+        delay = policy.hedge_delay(router, "openai", "flashcards")
+        assert delay == pytest.approx(0.02)
+
+        result = await policy.run(router, "flashcards", slow_primary, "anthropic", fast_hedge, delay)
+        await asyncio.sleep(0)
+
+        assert result == "hedge"
+        assert primary_cancelled.is_set()
+        stats = policy.get_stats()
+        assert stats["hedged"] == 1 and stats["hedge_rate"] == 1.0 and stats["hedge_win_rate"] == 1.0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_caps_and_missing_history_prevent_hedging(self):
+        """Without latency history, beyond the hedge-rate cap or above the cost cap, only the primary runs"""
+        from src.services.provider_hedging_service import HedgingPolicy
+
+        policy = HedgingPolicy(min_samples=20, max_hedge_fraction=0.0)
+        assert policy.hedge_delay(self._router_with_history(samples=5), "openai", "flashcards") is None
+
+        hedge = AsyncMock(return_value="hedge")
+
+        async def primary():
+            await asyncio.sleep(0.05)
+            return "primary"
+
+        router = self._router_with_history()
+        assert await policy.run(router, "flashcards", primary, "anthropic", hedge, 0.01) == "primary"
+        assert policy.get_stats()["skipped_rate_cap"] == 1
+
+        policy = HedgingPolicy(max_hedge_fraction=1.0, max_extra_cost=0.0)
+        assert await policy.run(router, "flashcards", primary, "anthropic", hedge, 0.01) == "primary"
+        assert policy.get_stats()["skipped_cost_cap"] == 1
+        hedge.assert_not_awaited()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_manager_hedges_generate_content_when_enabled(self):
+        """generate_content hedges to the fallback provider and reports hedge metrics"""
+        from src.services.ai_providers import AIProviderType, AIResponse
+
+        manager = _provider_manager_with({AIProviderType.OPENAI: Mock(), AIProviderType.ANTHROPIC: Mock()})
+        manager.router = self._router_with_history()
+        manager.hedging.max_hedge_fraction = 1.0
+
+        async def slow_openai(prompt, max_tokens, content_type=None):
+            await asyncio.sleep(5)
+
+        manager._generate_with_openai = slow_openai
+        manager._generate_with_anthropic = AsyncMock(return_value=AIResponse(
+            content="{}", provider="anthropic", model="claude", tokens_used=100, generation_time=0.0, metadata={}
+        ))
+
+        with patch("src.services.ai_providers.settings.AI_HEDGING_ENABLED", True, create=True):
+            response = await manager.generate_content("prompt", "flashcards")
+            await asyncio.sleep(0.01)  # Let the cancelled primary unwind
+            stats = manager.get_provider_stats()
+
+        assert response.provider == "anthropic"
+        assert stats["hedging"]["hedge_wins"] == 1
+        assert stats["routing"]["providers"]["openai"]["in_flight"] == 0
+        # The hedged-away primary still counts as a (censored) latency sample
+        samples = manager.router.metrics["openai"].latency_samples["flashcards"]
+        assert len(samples) == 21 and samples[-1] >= 0.02
+
+    @pytest.mark.unit
+    def test_censored_latencies_raise_the_hedge_delay(self):
+        """Timeouts and cancellations keep the percentile from drifting below real tail latency"""
+        from src.services.provider_hedging_service import HedgingPolicy
+
+        router = self._router_with_history(latency=0.02, samples=20)
+        policy = HedgingPolicy()
+        for _ in range(5):
+            router.record_censored_latency("openai", "flashcards", 1.5)
+
+        assert policy.hedge_delay(router, "openai", "flashcards") == pytest.approx(1.5)
+        assert router.get_stats()["openai"]["samples"] == 20  # EWMA metrics only count successes
+
+
+class TestProviderCircuitBreakers:
+    """Per-provider circuit breakers with background half-open probes"""
+
+    @pytest.mark.unit
+    def test_breaker_state_transitions(self):
+        """closed -> open after the threshold, half-open after the cool-down, closed on a good probe"""
+        from src.services.provider_circuit_breaker_service import CircuitBreaker, CircuitState
+
+        breaker = CircuitBreaker("openai", failure_threshold=3, cooldown=10.0)
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED
+
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.allow_request() is False
+        assert breaker.should_probe() is False  # Still cooling down
+
+        with patch("src.services.provider_circuit_breaker_service.time.monotonic", return_value=breaker.opened_at + 10):
+            assert breaker.should_probe() is True
+            assert breaker.state == CircuitState.HALF_OPEN
+            assert breaker.should_probe() is False  # One probe at a time
+
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN  # Failed probe re-opens
+
+        breaker.state, breaker.probe_in_flight = CircuitState.HALF_OPEN, True
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.get_stats()["opened"] == 1 and breaker.get_stats()["closed"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_open_circuit_is_skipped_without_waiting(self):
+        """Once a provider's circuit opens, requests go straight to the fallback and never revisit it"""
+        from src.services.ai_providers import AIProviderType, AIResponse
+
+        manager = _provider_manager_with({AIProviderType.OPENAI: Mock(), AIProviderType.ANTHROPIC: Mock()})
+        manager._generate_with_openai = AsyncMock(side_effect=TimeoutError("provider timeout"))
+        manager._generate_with_anthropic = AsyncMock(return_value=AIResponse(
+            content="{}", provider="anthropic", model="claude", tokens_used=10, generation_time=0.0, metadata={}
+        ))
+
+        for _ in range(4):
+            response = await manager.generate_content("prompt", "flashcards")
+            assert response.provider == "anthropic"
+
+        # Threshold is 2: the third and fourth requests skip OpenAI entirely
+        assert manager._generate_with_openai.await_count == 2
+        states = manager.get_provider_stats()["circuit_breakers"]
+        assert states["openai"]["state"] == "open"
+        assert states["openai"]["rejected"] == 2
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_rejections_count_only_skipped_providers(self):
+        """Open fallbacks the request never reached are not rejections; all circuits open answers 503"""
+        from src.services.ai_providers import AIProviderType, AIResponse
+        from src.services.provider_admission_service import AdmissionRejected
+        from src.services.provider_circuit_breaker_service import AllCircuitsOpen
+
+        manager = _provider_manager_with({AIProviderType.OPENAI: Mock(), AIProviderType.ANTHROPIC: Mock()})
+        manager._generate_with_openai = AsyncMock(return_value=AIResponse(
+            content="{}", provider="openai", model="gpt-4", tokens_used=10, generation_time=0.0, metadata={}
+        ))
+        for _ in range(2):
+            manager.circuit_breakers[AIProviderType.ANTHROPIC].record_failure()
+
+        await manager.generate_content("prompt", "flashcards")
+        assert manager.get_circuit_states()["anthropic"]["rejected"] == 0
+
+        for _ in range(2):
+            manager.circuit_breakers[AIProviderType.OPENAI].record_failure()
+        with pytest.raises(AllCircuitsOpen) as exc_info:
+            await manager.generate_content("prompt", "flashcards")
+        assert isinstance(exc_info.value, AdmissionRejected)  # Routes answer 503 with Retry-After
+        assert exc_info.value.retry_after == 30
+        states = manager.get_circuit_states()
+        assert states["openai"]["rejected"] == 1 and states["anthropic"]["rejected"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_all_providers_failing_tries_each_once(self):
+        """Fallback visits every provider at most once instead of recursing between them"""
+        from src.services.ai_providers import AIProviderType
+
+        manager = _provider_manager_with({AIProviderType.OPENAI: Mock(), AIProviderType.ANTHROPIC: Mock()})
+        manager._generate_with_openai = AsyncMock(side_effect=RuntimeError("openai down"))
+        manager._generate_with_anthropic = AsyncMock(side_effect=RuntimeError("anthropic down"))
+
+        with pytest.raises(RuntimeError, match="anthropic down"):
+            await manager.generate_content("prompt", "flashcards")
+
+        assert manager._generate_with_openai.await_count == 1
+        assert manager._generate_with_anthropic.await_count == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_probe_closes_recovered_circuit(self):
+        """After the cool-down a lightweight probe runs in the background and closes the circuit"""
+        from src.services.ai_providers import AIProviderType, AIResponse
+
+        manager = _provider_manager_with({AIProviderType.OPENAI: Mock(), AIProviderType.ANTHROPIC: Mock()})
+        breaker = manager.circuit_breakers[AIProviderType.OPENAI]
+        breaker.cooldown = 0.0
+        for _ in range(2):
+            breaker.record_failure()
+
+        ok = AIResponse(content="OK", provider="openai", model="gpt-4", tokens_used=2, generation_time=0.0, metadata={})
+        manager._generate_with_openai = AsyncMock(return_value=ok)
+        manager._generate_with_anthropic = AsyncMock(return_value=ok)
+
+        await manager.generate_content("prompt", "flashcards")  # Served by the fallback; probe starts
+        await asyncio.gather(*manager._probe_tasks)
+
+        assert manager._generate_with_openai.await_args.args == ("Reply with OK.", 5)
+        assert manager.get_circuit_states()["openai"]["state"] == "closed"
+
+
+class TestProviderAdmissionControl:
+    """Concurrency limits, rate buckets and load shedding in front of provider calls"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_global_limit_bounds_concurrent_calls(self):
+        """No more than max_concurrent calls run at once; the rest queue and record queue time"""
+        from src.services.provider_admission_service import ProviderAdmissionController
+
+        controller = ProviderAdmissionController(max_concurrent=3, provider_limits={}, max_wait=5.0)
+        running = peak = 0
+
+        async def call():
+            nonlocal running, peak
+            async with controller.admit("openai", estimated_tokens=100):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*[call() for _ in range(12)])
+
+        stats = controller.get_stats()
+        assert peak == 3
+        assert stats["global_in_use"] == 0
+        assert stats["providers"]["openai"]["admitted"] == 12
+        assert stats["providers"]["openai"]["max_queue_ms"] > 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_full_queue_and_exhausted_quota_are_rejected(self):
+        """Beyond the wait queue, or when the token bucket cannot refill in time, calls fail fast"""
+        from src.services.provider_admission_service import ProviderAdmissionController, AdmissionRejected
+
+        controller = ProviderAdmissionController(
+            max_concurrent=1, provider_limits={"openai": {"tokens_per_minute": 6000}}, queue_size=1, max_wait=0.5
+        )
+        release = asyncio.Event()
+
+        async def holder():
+            async with controller.admit("openai", estimated_tokens=100):
+                await release.wait()
+
+        holding = asyncio.create_task(holder())
+        waiting = asyncio.create_task(holder())
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with controller.admit("openai", estimated_tokens=100):
+                pass
+        assert rejected.value.retry_after >= 1
+        release.set()
+        await asyncio.gather(holding, waiting)
+
+        # 200 tokens used of 6000/minute: 6000 more needs ~2s of refill, longer than max_wait
+        with pytest.raises(AdmissionRejected, match="rate limit"):
+            async with controller.admit("openai", estimated_tokens=6000):
+                pass
+
+        stats = controller.get_stats()["providers"]["openai"]
+        assert stats["rejected_queue_full"] == 1
+        assert stats["rejected_timeout"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_saturated_provider_does_not_block_other_providers(self):
+        """Calls queued behind a busy provider hold no global slot"""
+        from src.services.provider_admission_service import ProviderAdmissionController
+
+        controller = ProviderAdmissionController(
+            max_concurrent=2, provider_limits={"openai": {"max_concurrency": 1}}, max_wait=5.0
+        )
+        release = asyncio.Event()
+
+        async def openai_call():
+            async with controller.admit("openai", estimated_tokens=100):
+                await release.wait()
+
+        openai_calls = [asyncio.create_task(openai_call()) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert controller.get_stats()["global_in_use"] == 1
+
+        async with controller.admit("anthropic", estimated_tokens=100):
+            assert controller.get_stats()["providers"]["anthropic"]["max_queue_ms"] < 50
+
+        release.set()
+        await asyncio.gather(*openai_calls)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_rate_limited_calls_hold_no_slots(self):
+        """Waiting for token-bucket room happens before any concurrency slot is taken"""
+        from src.services.provider_admission_service import ProviderAdmissionController
+
+        controller = ProviderAdmissionController(
+            max_concurrent=1, provider_limits={"openai": {"tokens_per_minute": 600}}, max_wait=2.0
+        )
+        async with controller.admit("openai", estimated_tokens=600):
+            pass
+
+        # The bucket refills at 10 tokens/s, so this call sleeps ~0.5s for room
+        paced = asyncio.create_task(self._admit_and_exit(controller, "openai", 5))
+        await asyncio.sleep(0.05)
+        assert controller.get_stats()["global_in_use"] == 0
+
+        async with controller.admit("anthropic", estimated_tokens=100):
+            pass
+        await paced
+        assert controller.get_stats()["providers"]["openai"]["admitted"] == 2
+
+    @staticmethod
+    async def _admit_and_exit(controller, provider, estimated_tokens):
+        async with controller.admit(provider, estimated_tokens=estimated_tokens):
+            pass
+
+    @pytest.mark.unit
+    def test_rejected_generation_returns_503_with_retry_after(self):
+        """Routes translate admission rejections into 503 responses with a Retry-After header"""
+        from fastapi.testclient import TestClient
+        from src.main import app
+        from src.core.auth import verify_api_key
+        from src.api.routes.content_generation import get_content_service, limiter
+        from src.main import enhanced_limiter
+        from src.services.provider_admission_service import AdmissionRejected
+
+        service = Mock()
+        service.generate_content = AsyncMock(side_effect=AdmissionRejected("openai admission queue full", 2.4))
+        app.dependency_overrides[verify_api_key] = lambda: "test-key"
+        app.dependency_overrides[get_content_service] = lambda: service
+        try:
+            # Keep earlier tests' traffic from tripping the per-IP rate limits
+            with patch.object(limiter, "enabled", False), \
+                    patch.object(enhanced_limiter, "check_rate_limit", AsyncMock(return_value=(True, {}))):
+                response = TestClient(app).post(
+                    "/api/v1/generate/flashcards",
+                    json={"topic": "Cell Biology", "age_group": "high_school"}
+                )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3"
+
+
+class TestProviderTimeoutsAndRetries:
+    """Deadlines, attempt timeouts and retry-with-jitter for provider calls"""
+
+    @pytest.mark.unit
+    def test_retryable_errors_and_policy_overrides(self):
+        """Only transient errors are retried; overrides apply provider, content type, then both"""
+        from src.services.provider_retry_service import RetryPolicy, RetryPolicyResolver, is_retryable
+
+        class RateLimitError(Exception):
+            pass
+
+        status_error = Exception("bad gateway")
+        status_error.status_code = 502
+        client_error = Exception("bad request")
+        client_error.status_code = 400
+
+        assert is_retryable(asyncio.TimeoutError())
+        assert is_retryable(RateLimitError())
+        assert is_retryable(status_error)
+        assert not is_retryable(client_error)
+        assert not is_retryable(ValueError("invalid prompt"))
+
+        resolver = RetryPolicyResolver(
+            RetryPolicy(deadline=120, attempt_timeout=60, max_retries=2, backoff_base=0.5, backoff_cap=8),
+            overrides={
+                "anthropic": {"attempt_timeout": 45},
+                "study_guide": {"deadline": 180, "attempt_timeout": 90},
+                "anthropic:study_guide": {"max_retries": 0}
+            }
+        )
+        policy = resolver.resolve("anthropic", "study_guide")
+        assert (policy.deadline, policy.attempt_timeout, policy.max_retries) == (180, 90, 0)
+        assert resolver.resolve("openai", "flashcards") == resolver.default
+        assert all(0 <= policy.backoff(n) <= min(8, 0.5 * 2 ** n) for n in range(6))
+
+        # A misspelled field fails when the resolver is built (at startup), not per request
+        with pytest.raises(ValueError, match="attempt_timout"):
+            RetryPolicyResolver(resolver.default, overrides={"openai": {"attempt_timout": 30}})
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_hung_provider_times_out_then_falls_back_within_deadline(self):
+        """A hung call is cut at the attempt timeout and the fallback runs on the remaining deadline"""
+        from src.services.ai_providers import AIProviderType, AIResponse
+        from src.services.provider_retry_service import RetryPolicy
+
+        manager = _provider_manager_with({AIProviderType.OPENAI: Mock(), AIProviderType.ANTHROPIC: Mock()})
+        manager.retry_policies.default = RetryPolicy(
+            deadline=1.0, attempt_timeout=0.05, max_retries=0, backoff_base=0.0, backoff_cap=0.0
+        )
+
+        async def hung(prompt, max_tokens, content_type=None):
+            await asyncio.sleep(30)
+
+        manager._generate_with_openai = hung
+        manager._generate_with_anthropic = AsyncMock(return_value=AIResponse(
+            content="{}", provider="anthropic", model="claude", tokens_used=10, generation_time=0.0, metadata={}
+        ))
+
+        start_time = time.monotonic()
+        response = await manager.generate_content("prompt", "flashcards")
+
+        assert response.provider == "anthropic"
+        assert time.monotonic() - start_time < 0.5
+        assert manager.retry_stats["attempt_timeouts"] == 1
+
+        manager._generate_with_anthropic = hung
+        manager.retry_policies.default = RetryPolicy(
+            deadline=0.1, attempt_timeout=5.0, max_retries=0, backoff_base=0.0, backoff_cap=0.0
+        )
+        start_time = time.monotonic()
+        with pytest.raises(asyncio.TimeoutError):
+            await manager.generate_content("prompt", "flashcards")
+        assert time.monotonic() - start_time < 0.5
+        assert manager.retry_stats["deadline_exceeded"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_attempt_timeout_falls_back_without_retrying(self):
+        """Retries are for transient errors; a hung provider goes straight to the fallback"""
+        from src.services.ai_providers import AIProviderType, AIResponse
+        from src.services.provider_retry_service import RetryPolicy
+
+        manager = _provider_manager_with({AIProviderType.OPENAI: Mock(), AIProviderType.ANTHROPIC: Mock()})
+        manager.retry_policies.default = RetryPolicy(
+            deadline=5.0, attempt_timeout=0.05, max_retries=3, backoff_base=0.0, backoff_cap=0.0
+        )
+        calls = 0
+
+        async def hung(prompt, max_tokens, content_type=None):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(30)
+
+        manager._generate_with_openai = hung
+        manager._generate_with_anthropic = AsyncMock(return_value=AIResponse(
+            content="{}", provider="anthropic", model="claude", tokens_used=10, generation_time=0.0, metadata={}
+        ))
+
+        response = await manager.generate_content("prompt", "flashcards")
+
+        assert response.provider == "anthropic"
+        assert calls == 1
+        assert manager.retry_stats["retries"] == 0
+        assert manager.retry_stats["attempt_timeouts"] == 1
+
+    @pytest.mark.unit
+    def test_sdk_clients_do_not_retry(self):
+        """SDK-level retries are disabled so RetryPolicy alone decides, within the deadline"""
+        manager = AIProviderManager.__new__(AIProviderManager)
+        with patch("src.services.ai_providers.settings.OPENAI_API_KEY", "sk-test"), \
+                patch("src.services.ai_providers.settings.ANTHROPIC_API_KEY", "sk-ant-test"):
+            assert manager._get_openai_client().max_retries == 0
+            assert manager._get_anthropic_client().max_retries == 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_retryable_errors_are_retried_on_the_same_provider(self):
+        """429/5xx-style errors are retried with backoff; other errors fall back immediately"""
+        from src.services.ai_providers import AIProviderType, AIResponse
+        from src.services.provider_retry_service import RetryPolicy
+
+        manager = _provider_manager_with({AIProviderType.OPENAI: Mock(), AIProviderType.ANTHROPIC: Mock()})
+        manager.retry_policies.default = RetryPolicy(
+            deadline=5.0, attempt_timeout=1.0, max_retries=2, backoff_base=0.001, backoff_cap=0.01
+        )
+        overloaded = Exception("overloaded")
+        overloaded.status_code = 503
+        ok = AIResponse(content="{}", provider="openai", model="gpt-4", tokens_used=10, generation_time=0.0, metadata={})
+        manager._generate_with_openai = AsyncMock(side_effect=[overloaded, overloaded, ok])
+        manager._generate_with_anthropic = AsyncMock()
+
+        response = await manager.generate_content("prompt", "flashcards")
+
+        assert response.provider == "openai"
+        assert manager._generate_with_openai.await_count == 3
+        assert manager.retry_stats["retries"] == 2
+        manager._generate_with_anthropic.assert_not_awaited()
+
+        manager._generate_with_openai = AsyncMock(side_effect=ValueError("content policy violation"))
+        manager._generate_with_anthropic = AsyncMock(return_value=ok)
+        await manager.generate_content("prompt", "flashcards")
+        assert manager._generate_with_openai.await_count == 1
+
+
+class TestSyncProviderExecutor:
+    """Dedicated thread pool for blocking provider SDK calls"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_vertex_burst_does_not_starve_default_executor(self):
+        """Saturating the provider pool leaves the loop's default executor free and is reported"""
+        from src.services.provider_executor_service import SyncProviderExecutor
+
+        executor = SyncProviderExecutor(max_workers=2)
+        release = threading.Event()
+        burst = [asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(6)]
+        await asyncio.sleep(0.05)
+
+        start_time = time.monotonic()
+        assert await asyncio.get_running_loop().run_in_executor(None, lambda: "other work") == "other work"
+        assert time.monotonic() - start_time < 0.5
+
+        stats = executor.get_stats()
+        assert stats["active"] == 2 and stats["queued"] == 4
+        assert stats["utilization"] == 1.0
+        assert stats["saturated"] == 4
+
+        release.set()
+        assert await asyncio.gather(*burst) == [True] * 6
+        stats = executor.get_stats()
+        assert (stats["active"], stats["queued"], stats["completed"]) == (0, 0, 6)
+
+        def failing():
+            raise RuntimeError("quota exceeded")
+
+        with pytest.raises(RuntimeError):
+            await executor.run(failing)
+        stats = executor.get_stats()
+        assert (stats["active"], stats["completed"], stats["failed"]) == (0, 6, 1)
+        executor.shutdown()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_vertex_model_is_constructed_once_per_name(self):
+        """GenerativeModel objects are cached across Vertex AI calls"""
+        import types
+        from src.services.ai_providers import AIProviderType
+
+        response = types.SimpleNamespace(text='{"title": "Cells"}')
+        model_class = Mock(return_value=Mock(generate_content=Mock(return_value=response)))
+        generative_models = types.ModuleType("vertexai.generative_models")
+        generative_models.GenerativeModel = model_class
+        generative_models.GenerationConfig = dict
+        vertexai = types.ModuleType("vertexai")
+        vertexai.generative_models = generative_models
+
+        manager = _provider_manager_with({AIProviderType.VERTEX_AI: Mock()})
+        with patch.dict(sys.modules, {"vertexai": vertexai, "vertexai.generative_models": generative_models}):
+            for _ in range(3):
+                result = await manager._generate_with_vertex_ai("prompt", 100)
+
+        assert result.content == '{"title": "Cells"}'
+        model_class.assert_called_once_with("gemini-1.5-flash")
+        stats = manager.get_provider_stats()["sync_executor"]
+        assert stats["completed"] == 3
+        assert stats["cached_models"] == ["gemini-1.5-flash"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_vertex_structured_request_shape(self):
+        """The pinned SDK accepts the JSON mode and converts the response schema"""
+        import types
+        pytest.importorskip("vertexai.generative_models")
+        from src.services.ai_providers import AIProviderType
+
+        model = Mock(generate_content=Mock(return_value=types.SimpleNamespace(text='{"title": "Cells"}')))
+        manager = _provider_manager_with({AIProviderType.VERTEX_AI: Mock()})
+        with patch("src.services.ai_providers.vertex_model", return_value=model), \
+                patch("src.services.structured_output_service.settings.AI_STRUCTURED_OUTPUT", True, create=True):
+            await manager._generate_with_vertex_ai("prompt", 100, "flashcards")
+
+        config = model.generate_content.call_args.kwargs["generation_config"].to_dict()
+        assert config["max_output_tokens"] == 100
+        assert config["response_mime_type"] == "application/json"
+        schema = config["response_schema"]
+        assert schema["type"] == "OBJECT" and schema["required"] == ["title", "items"]
+        assert schema["properties"]["items"]["items"]["type"] == "OBJECT"
+
+
+class TestBatchGenerationPipeline:
+    """Offline manifest generation through provider batch backends"""
+
+    @staticmethod
+    def _service():
+        """Content service with template, assessor and cache stubbed"""
+        service = EducationalContentService()
+        service._initialized = True
+        service.prompt_loader = Mock()
+        service.prompt_loader.load_template = AsyncMock(return_value="Template {$ topic $}")
+        service.prompt_loader.compile_segments = Mock(side_effect=lambda template, variables: f"Prompt: {variables['topic']}")
+        service.quality_assessor = AsyncMock()
+        service.quality_assessor.assess_content_quality.return_value = {"overall_quality_score": 0.82}
+        service.cache_service = AsyncMock()
+        service.cache_service.generate_content_hash = Mock(return_value="content-hash")
+        service.cache_service.get_quality_assessment_cache.return_value = None
+        return service
+
+    @staticmethod
+    def _session_factory():
+        """Sessions on a fresh in-memory database with the content table"""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from sqlalchemy.pool import StaticPool
+        from src.core.database import Base
+        from src.models.educational import EducationalContentDB
+
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine, tables=[EducationalContentDB.__table__])
+        return sessionmaker(bind=engine)
+
+    @staticmethod
+    def _write_manifest(path, entries):
+        path.write_text("\n".join(json.dumps(entry) for entry in entries) + "\n")
+        return str(path)
+
+    @pytest.mark.unit
+    def test_manifest_expands_topics_and_content_types(self, tmp_path):
+        """Each line yields one item per content type; duplicates collapse; bad types are rejected"""
+        from src.services.batch_generation_service import load_manifest
+
+        manifest = self._write_manifest(tmp_path / "topics.jsonl", [
+            {"topic": "Photosynthesis", "content_types": ["flashcards", "study_guide"], "age_group": "high_school"},
+            {"topic": "Photosynthesis", "content_types": ["flashcards"], "age_group": "high_school"},
+            {"topic": "Volcanoes", "content_types": ["flashcards"]}
+        ])
+        items = load_manifest(manifest)
+
+        assert [(i.topic, i.content_type) for i in items] == [
+            ("Photosynthesis", "flashcards"), ("Photosynthesis", "study_guide"), ("Volcanoes", "flashcards")
+        ]
+        assert len({i.custom_id for i in items}) == 3
+        assert items == load_manifest(manifest)  # ids are stable across runs
+
+        bad = self._write_manifest(tmp_path / "bad.jsonl", [{"topic": "X", "content_types": ["poster"]}])
+        with pytest.raises(ValueError, match="line 1"):
+            load_manifest(bad)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_local_batch_stores_results_and_retries_failures_on_resume(self, tmp_path):
+        """Results are assessed, cached and stored; a re-run only resubmits what failed"""
+        from src.services.ai_providers import AIResponse
+        from src.services.batch_provider_service import LocalBatchBackend
+        from src.services.batch_generation_service import BatchGenerationPipeline
+        from src.models.educational import EducationalContentDB
+
+        async def generate(prompt, content_type, max_tokens):
+            if "Volcanoes" in prompt:
+                raise RuntimeError("provider unavailable")
+            return AIResponse(content='{"title": "Cells"}', provider="openai", model="gpt-4",
+                              tokens_used=100, generation_time=0.1, metadata={})
+
+        service = self._service()
+        cached_ids = []
+        service.cache_service.set_content_cache.side_effect = lambda **kwargs: cached_ids.append(kwargs["content"]["id"])
+        ai_provider = Mock(generate_content=AsyncMock(side_effect=generate))
+        session_factory = self._session_factory()
+        manifest = self._write_manifest(tmp_path / "topics.jsonl", [
+            {"topic": "Cell Biology", "content_types": ["flashcards", "study_guide"]},
+            {"topic": "Volcanoes", "content_types": ["flashcards"]}
+        ])
+        checkpoint = str(tmp_path / "topics.checkpoint.json")
+
+        def pipeline():
+            return BatchGenerationPipeline(
+                service, LocalBatchBackend(ai_provider), checkpoint,
+                chunk_size=2, poll_interval=0.01, session_factory=session_factory
+            )
+
+        report = await pipeline().run(manifest)
+
+        assert report["summary"]["successful_generations"] == 2
+        assert report["summary"]["submitted_batches"] == 2
+        assert list(report["errors"].values()) == ["provider unavailable"]
+        assert service.cache_service.set_content_cache.await_count == 2
+        with session_factory() as db:
+            rows = db.query(EducationalContentDB).all()
+            assert sorted(r.content_type for r in rows) == ["flashcards", "study_guide"]
+            assert all(r.generated_content == {"title": "Cells"} for r in rows)
+            assert float(rows[0].quality_score) == 0.82
+            # Content was cached under the same deterministic id as the stored rows
+            assert set(cached_ids) == {str(r.id) for r in rows}
+
+        async def recovered(prompt, content_type, max_tokens):
+            return await generate("recovered", content_type, max_tokens)
+
+        ai_provider.generate_content = AsyncMock(side_effect=recovered)
+        report = await pipeline().run(manifest)
+
+        assert ai_provider.generate_content.await_count == 1
+        assert report["summary"]["skipped"] == 2
+        assert report["summary"]["successful_generations"] == 3 and report["errors"] == {}
+        with session_factory() as db:
+            assert db.query(EducationalContentDB).count() == 3
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_resume_polls_submitted_batch_instead_of_resubmitting(self, tmp_path):
+        """A batch recorded in the checkpoint is polled and collected, not submitted again"""
+        from src.services.ai_providers import AIResponse
+        from src.services.batch_provider_service import BatchStatus
+        from src.services.batch_generation_service import BatchGenerationPipeline, BatchCheckpoint, load_manifest
+
+        manifest = self._write_manifest(tmp_path / "topics.jsonl", [
+            {"topic": "Cell Biology", "content_types": ["flashcards"]}
+        ])
+        custom_id = load_manifest(manifest)[0].custom_id
+        checkpoint = BatchCheckpoint(str(tmp_path / "checkpoint.json"))
+        checkpoint.batches["batch_abc"] = [custom_id]
+        checkpoint.save()
+
+        backend = Mock()
+        backend.name = "openai"
+        backend.submit = AsyncMock()
+        backend.poll = AsyncMock(side_effect=[
+            BatchStatus("batch_abc", done=False, total=1),
+            BatchStatus("batch_abc", done=True, completed=1, total=1)
+        ])
+        backend.results = AsyncMock(return_value={custom_id: AIResponse(
+            content='{"title": "Cells"}', provider="openai", model="gpt-4",
+            tokens_used=100, generation_time=0.0, metadata={"batch": True}
+        )})
+
+        pipeline = BatchGenerationPipeline(
+            self._service(), backend, str(tmp_path / "checkpoint.json"),
+            chunk_size=10, poll_interval=0.01, session_factory=self._session_factory()
+        )
+        report = await pipeline.run(manifest)
+
+        backend.submit.assert_not_awaited()
+        assert backend.poll.await_count == 2
+        assert report["summary"]["resumed_batches"] == 1
+        assert report["summary"]["successful_generations"] == 1
+        assert BatchCheckpoint(str(tmp_path / "checkpoint.json")).batches == {}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_openai_backend_submits_jsonl_and_parses_output(self):
+        """Requests are uploaded as a JSONL batch file; output and error lines map back by custom_id"""
+        import types
+        from src.services.ai_providers import AIResponse
+        from src.services.batch_provider_service import OpenAIBatchBackend, BatchRequest
+
+        client = Mock()
+        client.files.create = AsyncMock(return_value=types.SimpleNamespace(id="file_in"))
+        client.batches.create = AsyncMock(return_value=types.SimpleNamespace(id="batch_1"))
+        client.batches.retrieve = AsyncMock(return_value=types.SimpleNamespace(
+            status="completed", output_file_id="file_out", error_file_id="file_err",
+            request_counts=types.SimpleNamespace(completed=1, failed=1, total=2)
+        ))
+        output = {"custom_id": "a", "response": {"status_code": 200, "body": {
+            "model": "gpt-4", "usage": {"total_tokens": 120, "prompt_tokens": 20, "completion_tokens": 100},
+            "choices": [{"message": {"content": '{"title": "Cells"}'}, "finish_reason": "stop"}]
+        }}, "error": None}
+        errors = {"custom_id": "b", "response": None, "error": {"code": "server_error"}}
+        client.files.content = AsyncMock(side_effect=lambda file_id: types.SimpleNamespace(
+            text=json.dumps(output if file_id == "file_out" else errors)
+        ))
+
+        backend = OpenAIBatchBackend(client)
+        batch_id = await backend.submit([
+            BatchRequest("a", "prompt a", "flashcards", 2000), BatchRequest("b", "prompt b", "flashcards", 2000)
+        ])
+        uploaded = client.files.create.call_args.kwargs["file"][1].getvalue().decode().splitlines()
+
+        assert batch_id == "batch_1"
+        assert [json.loads(line)["custom_id"] for line in uploaded] == ["a", "b"]
+        assert client.batches.create.call_args.kwargs["completion_window"] == "24h"
+        assert (await backend.poll(batch_id)).done
+
+        results = await backend.results(batch_id)
+        assert isinstance(results["a"], AIResponse) and results["a"].tokens_used == 120
+        assert "server_error" in results["b"]
+
+
+class TestPromptPrefixCaching:
+    """Static/dynamic prompt segments and provider prompt-cache accounting"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_templates_compile_to_shared_static_prefix(self):
+        """Every request for a content type shares the static segment; request data lives in the tail"""
+        loader = PromptTemplateLoader()
+        await loader.initialize()
+        template = await loader.load_template("flashcards")
+
+        first = loader.compile_segments(template, {"topic": "Volcanoes", "age_group": "high_school"})
+        second = loader.compile_segments(template, {
+            "topic": "Cell Biology",
+            "age_group": "college",
+            "learning_objectives": [{"specific_skill": "Organelles", "cognitive_level": "remembering",
+                                     "measurable_outcome": "Name 5 organelles"}]
+        })
+
+        assert first.static == second.static and len(first.static) > len(first.dynamic)
+        assert first == f"{first.static}\n\n{first.dynamic}"
+        assert "Topic: Volcanoes" in first.dynamic and "Volcanoes" not in first.static
+        assert "- Organelles (remembering): Name 5 organelles" in second.dynamic
+
+        inline = loader.compile_segments("Rules\nTopic is {$ topic $}\nGo", {"topic": "Atoms", "age_group": "general"})
+        assert inline.static == "Rules" and inline.dynamic.startswith("Topic is Atoms\nGo")
+
+        # The template is split once; later requests reuse the same segment source strings
+        sources = loader.segment_source_cache[template]
+        with patch("src.services.prompt_loader.split_template") as split:
+            loader.compile_segments(template, {"topic": "Fractions", "age_group": "general"})
+        split.assert_not_called()
+        assert loader.segment_source_cache[template] is sources
+        assert loader.compile_stats["misses"] == 4  # Static and dynamic source of two templates
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_anthropic_marks_static_segment_cacheable_and_reports_cached_tokens(self):
+        """The static segment is sent as a cache breakpoint; cache reads are counted and discounted"""
+        import types
+        from src.services.ai_providers import AIProviderType
+        from src.services.prompt_loader import SegmentedPrompt
+        from src.services.provider_routing_service import estimate_cost
+
+        client = Mock()
+        client.messages.create = AsyncMock(return_value=types.SimpleNamespace(
+            content=[types.SimpleNamespace(text='{"title": "Cells"}')],
+            stop_reason="end_turn",
+            usage=types.SimpleNamespace(input_tokens=50, output_tokens=300,
+                                        cache_read_input_tokens=900, cache_creation_input_tokens=0)
+        ))
+        manager = _provider_manager_with({AIProviderType.ANTHROPIC: client})
+
+        response = await manager._generate_with_anthropic(SegmentedPrompt("Static rules", "Topic: Cells"), 500)
+
+        content = client.messages.create.call_args.kwargs["messages"][0]["content"]
+        assert content == [
+            {"type": "text", "text": "Static rules", "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": "Topic: Cells"}
+        ]
+        assert response.tokens_used == 1250
+        assert response.metadata["cached_tokens"] == 900
+        assert estimate_cost("anthropic", 1250, cached_tokens=900) < estimate_cost("anthropic", 1250)
+
+        await manager._generate_with_anthropic("plain prompt", 500)
+        assert client.messages.create.call_args.kwargs["messages"][0]["content"] == "plain prompt"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_openai_cached_tokens_reach_result_metadata_and_cost(self):
+        """OpenAI's automatic prefix-cache hits are reported in the response and the cost estimate"""
+        import types
+        from src.services.ai_providers import AIProviderType
+
+        client = Mock()
+        client.chat.completions.create = AsyncMock(return_value=types.SimpleNamespace(
+            choices=[types.SimpleNamespace(message=types.SimpleNamespace(content="{}"), finish_reason="stop")],
+            usage=types.SimpleNamespace(total_tokens=1400, prompt_tokens=1100, completion_tokens=300,
+                                        prompt_tokens_details=types.SimpleNamespace(cached_tokens=1024))
+        ))
+        manager = _provider_manager_with({AIProviderType.OPENAI: client})
+        response = await manager._generate_with_openai("prompt", 500)
+
+        assert response.metadata["cached_tokens"] == 1024
+        service = EducationalContentService()
+        uncached = response.__class__(**{**response.__dict__, "metadata": {}})
+        assert service._estimate_generation_cost(response) < service._estimate_generation_cost(uncached)
+
+
+class TestTokenAccounting:
+    """Local token counting, context-fitted max_tokens and exact cost accounting"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_static_prefix_count_is_cached_per_template(self):
+        """Repeated prompts for a template only tokenize the dynamic tail"""
+        from src.services.token_counting_service import TokenCounter
+
+        loader = PromptTemplateLoader()
+        await loader.initialize()
+        template = await loader.load_template("study_guide")
+        counter = TokenCounter()
+        await counter.warm_up()
+
+        counts = [
+            counter.count_prompt(loader.compile_segments(template, {"topic": topic, "age_group": "general"}), "openai")
+            for topic in ("Volcanoes", "Cell Biology", "Fractions")
+        ]
+
+        assert counter.stats["prefix_misses"] == 1 and counter.stats["prefix_hits"] == 2
+        prompt = loader.compile_segments(template, {"topic": "Volcanoes", "age_group": "general"})
+        assert abs(counts[0] - counter.count(str(prompt), "openai")) <= 3
+        assert counter.count(prompt.static, "openai") > 500
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_tokenizer_never_loads_on_the_event_loop(self):
+        """Encodings load in worker threads; requests before that count heuristically"""
+        import threading
+        from src.services import token_counting_service
+        from src.services.token_counting_service import TokenCounter
+
+        loop_thread = threading.get_ident()
+        load_threads = []
+        encoding = MagicMock()
+        encoding.encode.side_effect = lambda text, disallowed_special=(): [0] * 7
+
+        def get_encoding(name):
+            load_threads.append(threading.get_ident())
+            return encoding
+
+        with patch.object(token_counting_service, "TIKTOKEN_AVAILABLE", True), \
+                patch.object(token_counting_service, "tiktoken", MagicMock(get_encoding=get_encoding), create=True):
+            counter = TokenCounter()
+            heuristic = counter.count("a few words of text", "openai")
+            await asyncio.gather(*counter._loading.values())
+            assert counter.count("a few words of text", "openai") == 7
+            assert heuristic != 7
+
+            warmed = TokenCounter()
+            await warmed.warm_up()
+            assert warmed.count("a few words of text", "openai") == 7
+
+        assert len(load_threads) == 2 and loop_thread not in load_threads
+
+    @pytest.mark.unit
+    def test_max_tokens_fitted_to_context_and_oversize_rejected(self):
+        """The completion budget shrinks to fit the context; prompts leaving no room are rejected"""
+        from src.services.token_counting_service import TokenCounter, PromptTooLarge
+
+        counter = TokenCounter()
+        with patch("src.services.token_counting_service.settings.AI_MIN_COMPLETION_TOKENS", 256, create=True):
+            assert counter.fit_max_tokens(1000, 4000, "openai") == 4000
+            assert counter.fit_max_tokens(6000, 4000, "openai") == 8192 - 6000 - 12
+            assert counter.fit_max_tokens(6000, 4000, "anthropic") == 4000
+            with pytest.raises(PromptTooLarge) as exc_info:
+                counter.fit_max_tokens(8000, 4000, "openai")
+
+        assert exc_info.value.prompt_tokens == 8000 and exc_info.value.context_window == 8192
+        assert counter.stats["max_tokens_reduced"] == 1 and counter.stats["rejected_oversize"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_oversize_prompt_skips_small_context_provider_before_calling_it(self):
+        """A prompt too large for GPT-4 goes to a larger-context provider; too large for all raises"""
+        from src.services.ai_providers import AIProviderType, AIResponse
+        from src.services.token_counting_service import PromptTooLarge
+
+        openai_client = Mock()
+        openai_client.chat.completions.create = AsyncMock()
+        manager = _provider_manager_with({AIProviderType.OPENAI: openai_client, AIProviderType.ANTHROPIC: Mock()})
+        manager._generate_with_anthropic = AsyncMock(return_value=AIResponse(
+            content="{}", provider="anthropic", model="claude", tokens_used=10, generation_time=0.0, metadata={}
+        ))
+        huge_prompt = "photosynthesis " * 9000
+
+        with patch("src.services.token_counting_service.settings.AI_MIN_COMPLETION_TOKENS", 256, create=True):
+            response = await manager.generate_content(huge_prompt, "study_guide", max_tokens=4000)
+
+            assert response.provider == "anthropic"
+            openai_client.chat.completions.create.assert_not_awaited()
+            assert manager._generate_with_anthropic.call_args.args[1] == 4000
+            assert manager.provider_stats[AIProviderType.OPENAI]["failures"] == 0
+
+            manager.providers.pop(AIProviderType.ANTHROPIC)
+            with pytest.raises(PromptTooLarge):
+                await manager.generate_content(huge_prompt, "study_guide")
+            openai_client.chat.completions.create.assert_not_awaited()
+
+    @pytest.mark.unit
+    def test_cost_uses_input_output_and_cached_token_split(self):
+        """Reported usage is priced per input/output/cached token; totals alone use the blended rate"""
+        from src.services.ai_providers import AIResponse
+        from src.services.provider_routing_service import estimate_cost
+        from src.services.token_counting_service import response_token_usage
+
+        response = AIResponse(
+            content="{}", provider="anthropic", model="claude", tokens_used=1300, generation_time=0.0,
+            metadata={"input_tokens": 100, "output_tokens": 200, "cached_tokens": 1000, "cache_creation_tokens": 0}
+        )
+        usage = response_token_usage(response)
+
+        assert usage == {"prompt_tokens": 1100, "completion_tokens": 200, "cached_tokens": 1000, "cache_creation_tokens": 0}
+        expected = 0.003 / 1000 * (100 + 1000 * 0.1) + 0.015 / 1000 * 200
+        assert estimate_cost("anthropic", 1300, **usage) == pytest.approx(expected)
+        assert EducationalContentService()._estimate_generation_cost(response) == round(expected, 6)
+        assert estimate_cost("anthropic", 1300) == pytest.approx(1300 * 0.025 / 1000)
+
+
+class TestStructuredOutput:
+    """Native JSON output per content type, single-pass extraction and parse-failure metrics"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_anthropic_generation_is_forced_into_content_schema(self):
+        """Known content types request a tool call whose input schema is the content schema"""
+        import types
+        from src.models.content import CONTENT_TYPE_CONFIGS
+        from src.models.educational import LaFactoriaContentType
+        from src.services.ai_providers import AIProviderType
+
+        cards = {"title": "Cells", "items": [{"term": "Nucleus", "definition": "Holds the cell's DNA."}]}
+        client = Mock()
+        client.messages.create = AsyncMock(return_value=types.SimpleNamespace(
+            content=[types.SimpleNamespace(type="tool_use", name="flashcards", input=cards)],
+            stop_reason="tool_use",
+            usage=types.SimpleNamespace(input_tokens=50, output_tokens=80)
+        ))
+        manager = _provider_manager_with({AIProviderType.ANTHROPIC: client})
+
+        with patch("src.services.structured_output_service.settings.AI_STRUCTURED_OUTPUT", True, create=True):
+            response = await manager.generate_content("Make flashcards", "flashcards", max_tokens=500)
+
+        kwargs = client.messages.create.call_args.kwargs
+        tool = kwargs["tools"][0]
+        assert kwargs["tool_choice"] == {"type": "tool", "name": "flashcards"}
+        assert tool["input_schema"]["required"] == ["title", "items"]
+        assert tool["description"] == CONTENT_TYPE_CONFIGS[LaFactoriaContentType.FLASHCARDS].description
+        assert json.loads(response.content) == cards
+
+    @pytest.mark.unit
+    def test_every_content_type_has_provider_schemas(self):
+        """Schemas cover all content types; each provider gets options it supports"""
+        from src.models.educational import LaFactoriaContentType
+        from src.services.structured_output_service import (
+            content_schema, openai_structured_params, vertex_structured_config
+        )
+
+        with patch("src.services.structured_output_service.settings.AI_STRUCTURED_OUTPUT", True, create=True):
+            for content_type in LaFactoriaContentType:
+                schema = content_schema(content_type.value)
+                assert schema["type"] == "object" and "title" in schema["properties"]
+
+                vertex = vertex_structured_config(content_type.value)
+                assert vertex["response_mime_type"] == "application/json"
+                assert "title" not in vertex["response_schema"] and "title" in vertex["response_schema"]["properties"]
+                assert "additionalProperties" not in json.dumps(vertex["response_schema"])
+
+            assert openai_structured_params("study_guide", "gpt-4") == {}
+            json_schema = openai_structured_params("study_guide", "gpt-4o")["response_format"]
+            assert json_schema["type"] == "json_schema" and json_schema["json_schema"]["name"] == "study_guide"
+            assert vertex_structured_config("not_a_content_type") == {}
+
+        with patch("src.services.structured_output_service.settings.AI_STRUCTURED_OUTPUT", False, create=True):
+            assert vertex_structured_config("study_guide") == {}
+
+    @pytest.mark.unit
+    def test_incremental_parser_extracts_object_in_one_pass(self):
+        """Prose, stray braces and fences are skipped; braces and escapes inside strings are respected"""
+        from src.services.content_parsing_service import IncrementalJSONParser
+
+        expected = {"title": "Sets {and} \"braces\"", "items": [{"term": "a\\}", "definition": "b"}]}
+        text = (
+            "Here is the result {not json}:\n```json\n"
+            + json.dumps(expected)
+            + "\n```\nTrailing {notes}"
+        )
+
+        assert IncrementalJSONParser().feed(text) == expected
+
+        # Same result when streamed character by character (escapes split across chunks)
+        parser = IncrementalJSONParser()
+        results = [parser.feed(char) for char in text]
+        assert results[-1] == expected
+        assert results.index(expected) == text.index("\n```\nTrailing") - 1  # Available as soon as it closes
+
+        assert IncrementalJSONParser().feed("No JSON here {at all") is None
+
+    @pytest.mark.unit
+    def test_parse_failure_rate_is_tracked(self):
+        """Native, extracted and failed parses are counted, with a failure rate"""
+        from src.services import content_parsing_service
+        from src.services.content_parsing_service import get_parse_stats, parse_generated_content
+
+        with patch.dict(content_parsing_service.parse_stats, {
+            "parsed": 0, "native": 0, "extracted": 0, "failed": 0, "failed_by_type": {}
+        }):
+            assert parse_generated_content('{"title": "A"}', "flashcards") == {"title": "A"}
+            assert parse_generated_content('Sure!\n{"title": "B"}', "flashcards") == {"title": "B"}
+            fallback = parse_generated_content("Q: What?\nA: That.", "flashcards")
+            assert fallback["raw_output"] is True
+
+            stats = get_parse_stats()
+            assert (stats["native"], stats["extracted"], stats["failed"]) == (1, 1, 1)
+            assert stats["failed_by_type"] == {"flashcards": 1}
+            assert stats["failure_rate"] == pytest.approx(1 / 3, abs=1e-4)
+
+
+class TestTextAnalysis:
+    """Shared tokenization and keyword matching for quality assessment"""
+
+    @pytest.mark.unit
+    def test_analysis_matches_direct_text_operations(self):
+        """Keyword presence is plain substring containment; tokens and syllables match the per-call versions"""
+        from src.services.text_analysis_service import KeywordMatcher, TextAnalysis, count_syllables
+
+        text = "According to research, plants USE light.\n\nTry it because it works. Another line."
+        matcher = KeywordMatcher(["according to", "according to research", "use", "try", "flat earth"])
+        analysis = TextAnalysis(text, matcher)
+
+        assert analysis.keywords == {"according to", "according to research", "use", "try"}
+        assert analysis.contains("because") and not analysis.contains("flat earth")  # Outside / inside the matcher
+        assert analysis.count_present(["use", "try", "flat earth"]) == 2
+        assert analysis.words == text.split() and analysis.lower == text.lower()
+        assert analysis.sentences == [s.strip() for s in text.split('.') if s.strip()]
+        assert len(analysis.paragraphs) == 2
+        assert analysis.syllable_count == sum(count_syllables(word) for word in text.split())
+        assert not TextAnalysis("")
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_dimensions_accept_raw_text_or_shared_analysis(self):
+        """Each dimension gives the same result from raw text as from the shared analysis"""
+        from src.services.quality_assessor import EducationalQualityAssessor
+
+        assessor = EducationalQualityAssessor()
+        text = "# Cells\n\nFor example, the nucleus holds DNA. Question: what does it do? Answer: it controls the cell."
+        analysis = assessor._analyze(text)
+
+        assert await assessor._assess_readability(text, "middle_school") == \
+            await assessor._assess_readability(analysis, "middle_school")
+        assert await assessor._assess_structural_quality(text, "flashcards") == \
+            await assessor._assess_structural_quality(analysis, "flashcards")
+        assert await assessor._assess_factual_accuracy(text, "flashcards") == \
+            await assessor._assess_factual_accuracy(analysis, "flashcards")
+        assert assessor._analyze(analysis) is analysis
+
+
+class TestQualityAssessmentExecutor:
+    """Quality assessment in a worker process pool and event-loop lag metrics"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_process_mode_matches_inline_assessment(self):
+        """Worker processes return the inline result; a broken pool falls back to inline"""
+        from concurrent.futures.process import BrokenProcessPool
+        from src.models.educational import CognitiveLevel, LearningObjective
+        from src.services.quality_executor_service import QualityAssessmentExecutor
+
+        content = {"title": "Cells", "content": "For example, the nucleus holds DNA. What does it control?\n\nTry this."}
+        objectives = [LearningObjective(CognitiveLevel.UNDERSTANDING, "Biology", "nucleus", "Explain the nucleus")]
+        assessor = EducationalQualityAssessor()
+        executor = QualityAssessmentExecutor(mode="process", max_workers=1)
+        try:
+            await executor.warm_up()
+            pooled = await executor.assess(assessor, content, "study_guide", "high_school", objectives)
+        finally:
+            executor.shutdown(wait=True)
+        inline = await assessor.assess_content_quality(content, "study_guide", "high_school", objectives)
+
+        for result in (pooled, inline):
+            result["assessment_metadata"].pop("assessed_at")
+        assert pooled == inline
+        assert executor.get_stats()["process"] == 1
+
+        broken = Mock(submit=Mock(side_effect=BrokenProcessPool("worker killed")))
+        executor._pool = broken
+        recovered = await executor.assess(assessor, content, "study_guide", "high_school", objectives)
+        assert recovered["overall_quality_score"] == inline["overall_quality_score"]
+        stats = executor.get_stats()
+        assert (stats["fallbacks"], stats["pool_restarts"], stats["pool_started"]) == (1, 1, False)
+
+        # A late failure from the old pool leaves the rebuilt pool (and its in-flight work) alone
+        rebuilt = Mock()
+        executor._pool = rebuilt
+        executor._restart_pool(broken)
+        assert executor._pool is rebuilt and executor.get_stats()["pool_restarts"] == 1
+        rebuilt.shutdown.assert_not_called()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_event_loop_lag_monitor_records_blocking_work(self):
+        """A synchronous block on the loop shows up as lag"""
+        from src.services.event_loop_monitor_service import EventLoopLagMonitor
+
+        monitor = EventLoopLagMonitor(interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.1)  # Blocks the loop, as inline CPU-bound work does
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+
+        stats = monitor.get_stats()
+        assert stats["samples"] >= 3 and not stats["running"]
+        assert stats["max_lag_ms"] >= 80
+
+
+class TestQualityAssessmentCache:
+    """Quality assessment results cached by content hash and assessor version"""
+
+    def _service(self):
+        service = EducationalContentService()
+        service.cache_service.cache_enabled = False
+        service.cache_service.redis_client = None
+        return service
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_identical_content_is_assessed_once(self):
+        """Repeat assessments of the same content and objectives are served from L1"""
+        service = self._service()
+        content = {"title": "Cells", "content": "For example, the nucleus holds DNA. What does it control?"}
+        objectives = [LearningObjective(CognitiveLevel.UNDERSTANDING, "Biology", "nucleus", "Explain the nucleus")]
+
+        with patch.object(
+            service.quality_assessor, "assess_content_quality",
+            wraps=service.quality_assessor.assess_content_quality
+        ) as assess:
+            first = await service._assess_quality(content, "study_guide", "high_school", objectives)
+            second = await service._assess_quality(dict(content), "study_guide", "high_school", objectives)
+            assert assess.call_count == 1
+            assert second["overall_quality_score"] == first["overall_quality_score"]
+            assert second["assessment_metadata"]["cache_tier"] == "l1"
+            assert "cache_tier" not in first["assessment_metadata"]
+
+            # Different objectives or age group are different assessments
+            await service._assess_quality(content, "study_guide", "high_school", None)
+            await service._assess_quality(content, "study_guide", "college", objectives)
+            assert assess.call_count == 3
+
+        assert service.cache_service.quality_stats == {"hits": 1, "misses": 3}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_version_change_and_failed_assessments_are_not_served(self):
+        """A new assessor version misses the cache; default metrics of a failure are not cached"""
+        service = self._service()
+        content = {"title": "Atoms", "content": "Atoms are made of protons, neutrons and electrons."}
+
+        await service._assess_quality(content, "flashcards", "high_school", None)
+        with patch("src.services.quality_assessor.ASSESSMENT_VERSION", "99.0"), \
+             patch.object(service.quality_assessor, "assess_content_quality", new_callable=AsyncMock) as assess:
+            assess.return_value = service.quality_assessor._default_quality_metrics()
+            await service._assess_quality(content, "flashcards", "high_school", None)
+            await service._assess_quality(content, "flashcards", "high_school", None)
+            assert assess.await_count == 2
+
+        keys = list(service.cache_service.local_cache._entries)
+        assert len(keys) == 1 and keys[0].startswith("quality:") and keys[0].endswith(
+            ":v" + service.quality_assessor.cache_version
+        )
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_redis_hit_populates_l1(self):
+        """Assessments are stored in Redis under the quality namespace and promoted to L1 on read"""
+        from src.services.cache_service import CacheService
+
+        cache_service = CacheService()
+        cache_service.redis_client = _InMemoryRedis()
+        cache_service.cache_enabled = True
+        metrics = {"overall_quality_score": 0.8, "assessment_metadata": {"assessment_version": "2.0"}}
+
+        await cache_service.set_quality_assessment_cache(
+            "abc123", "study_guide", "college", metrics, assessment_version="2.0"
+        )
+        cache_service.local_cache.delete_matching("*")
+
+        assert await cache_service.get_quality_assessment_cache("abc123", "study_guide", "college", "2.1") is None
+        first = await cache_service.get_quality_assessment_cache("abc123", "study_guide", "college", "2.0")
+        second = await cache_service.get_quality_assessment_cache("abc123", "study_guide", "college", "2.0")
+
+        assert first["assessment_metadata"]["cache_tier"] == "l2"
+        assert second["assessment_metadata"]["cache_tier"] == "l1"
+        assert list(cache_service.redis_client.data) == ["quality:abc123:study_guide:college:v2.0"]
+        assert cache_service.get_tier_stats()["quality_assessment"] == {"hits": 2, "misses": 1}
+
+
+class TestBatchQualityAssessment:
+    """Vectorized assess_many and chunked re-scoring of stored content"""
+
+    DOCUMENTS = [
+        ({"title": "Cells", "content": "# Cells\n\nFor example, the nucleus holds DNA. What does it control?\n\n- Try this activity."},
+         "study_guide", "high_school"),
+        ({"question": "What is 2 + 2?", "answer": "2 + 2 = 4, according to research published in a journal of math."},
+         "flashcards", "elementary"),
+        ({"content": "Evaluate and create a design. Students analyze, compare and apply the theorem always true."},
+         "faq_collection", "elementary"),
+        ({"sections": [{"content": "The earth is flat. Vaccines cause autism. Without doubt this is completely proven."}],
+          "examples": []}, "detailed_reading_material", "College"),
+        ({"content": "..."}, "podcast_script", "unknown_group"),
+        ({"content": "A single sentence with no full stop and uncommonly multisyllabic terminology"},
+         "one_pager_summary", "adult_learning"),
+        ({}, "study_guide", "general")
+    ]
+
+    @staticmethod
+    def _without_timestamps(results):
+        for result in results:
+            result["assessment_metadata"].pop("assessed_at")
+        return results
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_assess_many_matches_scalar_assessment(self):
+        """Every field of the batch result equals assess_content_quality, including empty documents"""
+        assessor = EducationalQualityAssessor()
+        objectives = [LearningObjective(CognitiveLevel.UNDERSTANDING, "Biology", "nucleus", "Explain the nucleus")]
+        contents = [content for content, _, _ in self.DOCUMENTS]
+        content_types = [content_type for _, content_type, _ in self.DOCUMENTS]
+        age_groups = [age_group for _, _, age_group in self.DOCUMENTS]
+        per_document_objectives = [objectives if i % 2 else None for i in range(len(contents))]
+
+        scalar = [
+            await assessor.assess_content_quality(content, content_type, age_group, document_objectives)
+            for content, content_type, age_group, document_objectives
+            in zip(contents, content_types, age_groups, per_document_objectives)
+        ]
+        batch = assessor.assess_many(contents, content_types, age_groups, per_document_objectives)
+
+        assert self._without_timestamps(batch) == self._without_timestamps(scalar)
+        assert "error" in batch[-1]["assessment_metadata"]
+
+        # A single content type / age group applies to every document
+        shared = assessor.assess_many(contents[:2], "study_guide", "college")
+        assert [r["assessment_metadata"]["age_group"] for r in shared] == ["college", "college"]
+        with pytest.raises(ValueError):
+            assessor.assess_many(contents, content_types[:2], "college")
+
+    @pytest.mark.unit
+    def test_rescoring_streams_chunks_and_updates_changed_rows(self):
+        """Rows are re-scored chunk by chunk; only changed rows are written, dry runs write nothing"""
+        import uuid
+        from src.models.educational import EducationalContentDB
+        from src.services.quality_rescoring_service import QualityRescoringJob
+
+        session_factory = TestBatchGenerationPipeline._session_factory()
+        db = session_factory()
+        for i, (content, content_type, age_group) in enumerate(self.DOCUMENTS[:6]):
+            db.add(EducationalContentDB(
+                id=uuid.uuid4(), content_type=content_type, topic=f"Topic {i}", age_group=age_group,
+                learning_objectives=[], cognitive_load_metrics={}, generated_content=content, quality_score=0.5
+            ))
+        db.commit()
+        db.close()
+
+        dry_run = QualityRescoringJob(session_factory=session_factory, chunk_size=4, dry_run=True).run()
+        assert (dry_run["rows"], dry_run["chunks"], dry_run["changed"]) == (6, 2, 6)
+
+        progress = []
+        report = QualityRescoringJob(session_factory=session_factory, chunk_size=4).run(progress_callback=progress.append)
+        assert [stats["rows"] for stats in progress] == [4, 6]
+        assert report["changed"] == 6
+
+        db = session_factory()
+        stored = {row.topic: row for row in db.query(EducationalContentDB).all()}
+        db.close()
+        content, content_type, age_group = self.DOCUMENTS[0]
+        expected = EducationalQualityAssessor().assess_many([content], content_type, age_group)
+        assert float(stored["Topic 0"].quality_score) == round(expected[0]["overall_quality_score"], 2)
+        assert stored["Topic 0"].cognitive_load_metrics == expected[0]["cognitive_load_metrics"]
+
+        assert QualityRescoringJob(session_factory=session_factory, chunk_size=4).run()["changed"] == 0
+        only_flashcards = QualityRescoringJob(session_factory=session_factory, chunk_size=4).run(content_type="flashcards")
+        assert only_flashcards["rows"] == 1
+
+
+class TestIncrementalQualityAssessment:
+    """Running-aggregate quality scores for streamed and edited content"""
+
+    SCORE_KEYS = ("cognitive_load_metrics", "readability_score", "engagement_score", "structural_quality")
+
+    @classmethod
+    async def _expected(cls, assessor, content, content_type, age_group):
+        result = await assessor.assess_content_quality(content, content_type, age_group)
+        return {key: result[key] for key in cls.SCORE_KEYS}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_streamed_chunks_match_full_assessment(self):
+        """Chunks that split words, keywords, sentences and paragraph breaks score as the whole text does"""
+        import itertools
+        from src.services.incremental_quality_assessor import IncrementalQualityAssessor
+
+        assessor = EducationalQualityAssessor()
+        text = (
+            "# Photosynthesis\n\nFor instance, plants convert light into chemical energy. According to research, "
+            "chlorophyll absorbs red light.\n\n- Try this activity in real life\n1. Measure oxygen. What changes?\n\n"
+            "Evaluate the examples and create a hypothesis.\n"
+        )
+        chunks, position = [], 0
+        for size in itertools.cycle([7, 1, 13, 3]):
+            if position >= len(text):
+                break
+            chunks.append(text[position:position + size])
+            position += size
+
+        incremental = IncrementalQualityAssessor("study_guide", "high_school")
+        streamed = ""
+        for chunk in chunks:
+            incremental.append(chunk)
+            streamed += chunk
+            assert incremental.scores() == await self._expected(
+                assessor, {"content": streamed}, "study_guide", "high_school"
+            ), repr(streamed)
+
+        assert incremental.text == text
+        stats = incremental.get_stats()
+        assert stats["appends"] == len(chunks) and stats["text_length"] == len(text)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_section_edits_rescan_only_the_changed_section(self):
+        """Replacing or adding a section rescores the document while re-reading only nearby text"""
+        from src.services.incremental_quality_assessor import WINDOW, IncrementalQualityAssessor
+
+        assessor = EducationalQualityAssessor()
+        content = {
+            "title": "The Water Cycle",
+            "sections": [
+                {"content": f"Section {i}. Water evaporates, condenses and falls as rain. " * 20} for i in range(10)
+            ],
+            "summary": "In real life"
+        }
+        incremental = IncrementalQualityAssessor.from_content(content, "study_guide", "elementary", assessor)
+        assert incremental.section_count == 12
+        assert incremental.scores() == await self._expected(assessor, content, "study_guide", "elementary")
+
+        scanned = incremental.get_stats()["scanned_characters"]
+        edit = "For example, try this: what happens to a puddle? Is it\n\n- an exercise in practice?"
+        incremental.replace_section(5, edit)
+        content["sections"][4]["content"] = edit
+        assert incremental.section_text(5) == edit
+        assert incremental.scores() == await self._expected(assessor, content, "study_guide", "elementary")
+        rescanned = incremental.get_stats()["scanned_characters"] - scanned
+        assert rescanned < 4 * (len(edit) + 2 * WINDOW) < len(incremental.text)
+
+        # Phrases spanning sections are found through the join windows
+        incremental.replace_section(-1, "in")
+        incremental.append("the world", new_section=True)
+        content["summary"] = "in"
+        content["conclusion"] = "the world"
+        assert incremental.scores() == await self._expected(assessor, content, "study_guide", "elementary")
+
+        empty = IncrementalQualityAssessor("flashcards")
+        assert empty.scores()["readability_score"] == {}
+        with pytest.raises(IndexError):
+            empty.replace_section(0, "text")